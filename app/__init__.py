@@ -25,13 +25,26 @@ def create_app(config_name=None):
     from config.config import config
     app.config.from_object(config[config_name])
     
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     db.init_app(app)
     jwt.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
     migrate.init_app(app, db)
     limiter.init_app(app)
     
+    from app.audit import audit_writer
+    audit_writer.init_app(app)
+    
     from app.models import User, ReliefRequest, DisasterType, Region
+    from app import rollups  # noqa: F401 - registers the rollup flush hook
+    from app import security_versions
+    security_versions.init_app(app)
+    from app import revocation
+    revocation.init_app(app)
+    from app import reference_data
+    reference_data.init_app(app)
     
     from app.auth import auth_bp
     from app.routes import api_bp
@@ -0,0 +1,42 @@
+"""
+Aggregations behind the analytics endpoints
+"""
+from sqlalchemy import func
+from app import db
+from app.models import RequestRollup, RequestStatus, DisasterSeverity
+
+
+def request_breakdown(region_id=None):
+    """
+    Count requests by status, severity and region from request_rollups.
+
+    One GROUP BY (status, severity, region_id) over the rollup table, so the
+    cost tracks the number of groups rather than the number of requests. Each
+    marginal is then summed in Python, which gives the same answer as
+    GROUPING SETS on every backend we run on (SQLite has no GROUPING SETS).
+    """
+    query = (db.session
+             .query(RequestRollup.status, RequestRollup.severity, RequestRollup.region_id,
+                    func.sum(RequestRollup.request_count))
+             .group_by(RequestRollup.status, RequestRollup.severity, RequestRollup.region_id))
+    if region_id is not None:
+        query = query.filter(RequestRollup.region_id == region_id)
+
+    status_counts = {status.value: 0 for status in RequestStatus}
+    severity_counts = {severity.value: 0 for severity in DisasterSeverity}
+    region_counts = {}
+    total = 0
+
+    for status, severity, row_region_id, count in query.all():
+        count = int(count or 0)
+        status_counts[status.value] += count
+        severity_counts[severity.value] += count
+        region_counts[row_region_id] = region_counts.get(row_region_id, 0) + count
+        total += count
+
+    return {
+        'status_counts': status_counts,
+        'severity_counts': severity_counts,
+        'region_counts': region_counts,
+        'total': total
+    }
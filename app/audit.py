@@ -0,0 +1,169 @@
+"""
+Buffered audit log writer.
+
+In async mode audit entries go onto an in-process queue and a background
+thread writes them with multi-row INSERTs, flushing when a batch fills up or
+the flush interval elapses. The queue is drained at interpreter shutdown. In
+sync mode (used by the tests) each entry is committed on the request session
+as soon as it is recorded.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from app import db
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Records AuditLog rows either synchronously or through a batching thread"""
+
+    def __init__(self):
+        self.app = None
+        self.async_mode = False
+        self.batch_size = 100
+        self.flush_interval = 1.0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        self.app = app
+        self.async_mode = app.config.get('AUDIT_ASYNC', False)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 100)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 1.0)
+        self._queue = queue.Queue(maxsize=app.config.get('AUDIT_QUEUE_SIZE', 10000))
+        app.extensions['audit_writer'] = self
+
+        if self.async_mode and not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def record(self, entry):
+        """Record one audit entry (a dict of AuditLog column values)"""
+        self.record_many([entry])
+
+    def record_many(self, entries):
+        """Record several audit entries at once"""
+        if not entries:
+            return
+
+        if not self.async_mode:
+            self._write_sync(entries)
+            return
+
+        self._ensure_thread()
+        for entry in entries:
+            try:
+                self._queue.put(entry, timeout=self.flush_interval)
+            except queue.Full:
+                # Never drop an entry: write it inline when the writer falls behind
+                logger.warning("Audit queue full, writing entry synchronously")
+                self._write_batch([entry])
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        if self.async_mode and self._thread is not None:
+            self._queue.join()
+
+    def shutdown(self, timeout=10):
+        """Stop the background thread after draining the queue"""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            logger.error(f"Audit writer did not drain within {timeout}s; "
+                         f"{self._queue.qsize()} entries left unwritten")
+        self._thread = None
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            done = 1
+            if first is _STOP:
+                stopping = True
+            else:
+                batch.append(first)
+
+            deadline = time.monotonic() + self.flush_interval
+            # On shutdown keep pulling until the queue is empty
+            while len(batch) < self.batch_size and (stopping or time.monotonic() < deadline):
+                try:
+                    item = self._queue.get(timeout=0 if stopping else max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                done += 1
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+            finally:
+                for _ in range(done):
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        from app.models import AuditLog
+
+        table = AuditLog.__table__
+        with self.app.app_context():
+            engine = db.engine
+            try:
+                with engine.begin() as connection:
+                    connection.execute(table.insert(), batch)
+                return
+            except Exception as e:
+                logger.warning(f"Batched audit insert of {len(batch)} entries failed ({e}); "
+                               f"retrying individually")
+
+            # Isolate the bad rows so one invalid entry cannot sink the batch
+            for entry in batch:
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(table.insert(), entry)
+                except Exception as e:
+                    logger.error(f"Error logging audit action {entry!r}: {e}")
+
+    def _write_sync(self, entries):
+        from app.models import AuditLog
+
+        db.session.add_all([AuditLog(**entry) for entry in entries])
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error logging audit action: {e}")
+
+
+audit_writer = AuditWriter()
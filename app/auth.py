@@ -5,7 +5,7 @@ from flask_jwt_extended import (
 )
 from werkzeug.security import check_password_hash
 from datetime import timedelta
-from app import db
+from app import db, jwt
 from app.models import User, UserRole
 from app.validators import (
     UserRegistrationSchema, UserLoginSchema, 
@@ -13,12 +13,11 @@ from app.validators import (
     validate_request_data, validate_email_format
 )
 from app.permissions import log_audit_action, get_current_user
+from app.security_versions import identity_claims
+from app.revocation import get_revocation_store
 
 auth_bp = Blueprint('auth', __name__)
 
-# In-memory blacklist for demo - use Redis in production
-blacklisted_tokens = set()
-
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -76,10 +75,10 @@ def login():
     if not user.is_active:
         return jsonify({'message': 'Account is deactivated'}), 401
     
-    access_token = create_access_token(identity=str(user.id))
+    access_token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
     refresh_token = create_refresh_token(identity=str(user.id))
     
-    log_audit_action('LOGIN', 'USER', user.id, f'User {user.username} logged in')
+    log_audit_action('LOGIN', 'USER', user.id, f'User {user.username} logged in', user_id=user.id)
     
     return jsonify({
         'message': 'Login successful',
@@ -98,7 +97,7 @@ def refresh():
     if not user or not user.is_active:
         return jsonify({'message': 'User not found or inactive'}), 404
     
-    new_token = create_access_token(identity=str(current_user_id))
+    new_token = create_access_token(identity=str(current_user_id), additional_claims=identity_claims(user))
     
     return jsonify({
         'access_token': new_token
@@ -108,8 +107,8 @@ def refresh():
 @auth_bp.route('/logout', methods=['DELETE'])
 @jwt_required()
 def logout():
-    jti = get_jwt()['jti']
-    blacklisted_tokens.add(jti)
+    claims = get_jwt()
+    get_revocation_store().revoke(claims['jti'], claims['exp'])
     
     user = get_current_user()
     if user:
@@ -212,16 +211,12 @@ def forgot_password():
     return jsonify({'message': 'If the email exists, a password reset link has been sent'}), 200
 
 
-# JWT token blacklist checker
-@auth_bp.before_app_request
-def check_if_token_revoked():
-    from flask_jwt_extended import verify_jwt_in_request, get_jwt
-    from flask import g
-    
-    try:
-        verify_jwt_in_request(optional=True)
-        jti = get_jwt().get('jti') if get_jwt() else None
-        if jti and jti in blacklisted_tokens:
-            return jsonify({'message': 'Token has been revoked'}), 401
-    except Exception:
-        pass
\ No newline at end of file
+# JWT token blacklist checker, run by flask-jwt-extended while it verifies the token
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    return get_revocation_store().is_revoked(jwt_payload['jti'], jwt_payload['exp'])
+
+
+@jwt.revoked_token_loader
+def revoked_token_response(jwt_header, jwt_payload):
+    return jsonify({'message': 'Token has been revoked'}), 401
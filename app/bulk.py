@@ -0,0 +1,221 @@
+"""
+Set-based writes for batches of relief requests
+
+Bulk creation validates every item, resolves disaster types and regions from
+the reference cache, and inserts all valid items in one transaction. Invalid
+items are reported without sinking the rest. An item's idempotency_key is
+unique per creator, so a retried upload returns the requests created the
+first time instead of duplicating them.
+
+Bulk updates apply one status, assignment and/or region change to every
+matching row with a single UPDATE carrying the filter's WHERE clause. Its
+RETURNING rows give the ids and before/after values the rollup deltas and
+audit entries are computed from, without loading ORM instances.
+"""
+from datetime import datetime, timezone
+from marshmallow import ValidationError
+from sqlalchemy import case, insert, or_, select, update
+from app import db
+from app.models import ReliefRequest, DisasterSeverity, RequestStatus, UserRole
+from app.validators import BulkReliefRequestItemSchema
+from app.reference_data import get_reference_cache
+from app.rollups import TRACKED_ATTRIBUTES, new_deltas, add_contribution, apply_deltas
+
+CREATE_FIELDS = (
+    'title', 'description', 'location', 'coordinates', 'disaster_type_id', 'region_id',
+    'affected_population', 'estimated_damage', 'required_resources',
+    'contact_person', 'contact_phone', 'contact_email', 'idempotency_key'
+)
+
+
+def insert_relief_requests(rows, return_ids=False):
+    """
+    Insert relief request column dicts with one executemany INSERT.
+    Timestamps default to now. The caller commits.
+
+    With return_ids, the new ids are returned in the order of rows. Ordered
+    RETURNING costs one statement per row on backends that cannot batch it
+    (SQLite), so only callers that need the ids should ask for them.
+    """
+    now = datetime.now(timezone.utc)
+    deltas = new_deltas()
+    for values in rows:
+        values.setdefault('created_at', now)
+        values.setdefault('updated_at', now)
+        add_contribution(deltas, values)
+
+    # The ORM leaves None values out of the INSERT unless told to render them,
+    # splitting the batch wherever a nullable column (e.g. coordinates) varies
+    statement = insert(ReliefRequest).execution_options(render_nulls=True)
+    ids = None
+    if return_ids:
+        ids = db.session.scalars(
+            statement.returning(ReliefRequest.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+    else:
+        db.session.execute(statement, rows)
+    # Core inserts bypass the rollup flush hook, so apply the deltas here
+    apply_deltas(db.session.connection(), deltas)
+    return ids
+
+
+def _validate_item(item, user, schema, reference):
+    """Column values for one item, or its validation errors"""
+    try:
+        data = schema.load(item)
+    except ValidationError as err:
+        return None, err.messages
+
+    disaster_type = reference.disaster_type(data['disaster_type_id'])
+    if not disaster_type or not disaster_type.is_active:
+        return None, {'disaster_type_id': ['Invalid disaster type']}
+    region = reference.region(data['region_id'])
+    if not region or not region.is_active:
+        return None, {'region_id': ['Invalid region']}
+    if user.role != UserRole.ADMIN and user.region_id != data['region_id']:
+        return None, {'region_id': ['Access denied to this region']}
+
+    values = {field: data.get(field) for field in CREATE_FIELDS}
+    values['severity'] = DisasterSeverity(data['severity'])
+    return values, None
+
+
+def create_relief_requests(user, items):
+    """
+    Create every valid item in one transaction.
+
+    Returns (results, created) where results has one entry per item, in
+    order, with a status of created, existing or invalid, and created lists
+    the (id, values) of the inserted rows.
+    """
+    schema = BulkReliefRequestItemSchema()
+    reference = get_reference_cache()
+    results = [None] * len(items)
+    pending = {}
+    keys = {}
+
+    for index, item in enumerate(items):
+        values, errors = _validate_item(item, user, schema, reference)
+        key = values and values['idempotency_key']
+        if key is not None and key in keys:
+            errors = {'idempotency_key': ['Repeated within this upload']}
+        if errors:
+            results[index] = {'index': index, 'status': 'invalid', 'errors': errors}
+            continue
+        pending[index] = values
+        if key is not None:
+            keys[key] = index
+
+    # Items whose key was already used by this user were created by an earlier attempt
+    if keys:
+        existing = db.session.execute(
+            select(ReliefRequest.idempotency_key, ReliefRequest.id)
+            .where(ReliefRequest.created_by == user.id, ReliefRequest.idempotency_key.in_(keys))
+        ).all()
+        for key, request_id in existing:
+            index = keys[key]
+            del pending[index]
+            results[index] = {'index': index, 'status': 'existing', 'id': request_id,
+                              'idempotency_key': key}
+
+    created = []
+    if pending:
+        for values in pending.values():
+            values.update(status=RequestStatus.PENDING, created_by=user.id, predicted_by_ml=False)
+        try:
+            ids = insert_relief_requests(list(pending.values()), return_ids=True)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for (index, values), request_id in zip(pending.items(), ids):
+            results[index] = {'index': index, 'status': 'created', 'id': request_id,
+                              'idempotency_key': values['idempotency_key']}
+            created.append((request_id, values))
+
+    return results, created
+
+
+RESOLVED_STATUSES = (RequestStatus.COMPLETED, RequestStatus.REJECTED)
+# Columns a bulk update may change
+CHANGEABLE_COLUMNS = ('status', 'assigned_to', 'region_id')
+
+
+def update_relief_requests(query, changes):
+    """
+    Apply `changes` (status, assigned_to and/or region_id) to the rows of a
+    relief request select in one UPDATE.
+
+    Only rows that actually change are touched. As in update_relief_request,
+    moving a request to a resolved status sets its resolved_at. Returns a
+    list of (id, description of the change) for each updated row.
+    """
+    table = ReliefRequest.__table__
+    differs = []
+    if 'status' in changes:
+        differs.append(table.c.status != changes['status'])
+    if 'assigned_to' in changes:
+        differs.append(table.c.assigned_to.is_distinct_from(changes['assigned_to']))
+    if 'region_id' in changes:
+        differs.append(table.c.region_id != changes['region_id'])
+    matching = query.where(or_(*differs))
+    changed = [name for name in CHANGEABLE_COLUMNS if name in changes]
+
+    now = datetime.now(timezone.utc)
+    values = dict(changes, updated_at=now)
+    if changes.get('status') in RESOLVED_STATUSES:
+        values['resolved_at'] = case((table.c.status != changes['status'], now),
+                                     else_=table.c.resolved_at)
+    returned = [table.c[name] for name in ('id', 'assigned_to') + TRACKED_ATTRIBUTES]
+
+    try:
+        connection = db.session.connection()
+        if connection.dialect.name == 'postgresql':
+            # Join the UPDATE to a locked snapshot of the matching rows so
+            # RETURNING can report the values they had before it
+            old = matching.with_only_columns(table.c.id, *[table.c[name] for name in changed]) \
+                .with_for_update().subquery('old')
+            rows = db.session.execute(
+                update(table).where(table.c.id == old.c.id).values(values)
+                .returning(*returned, *[old.c[name].label(f'old_{name}') for name in changed])
+            ).all()
+            before = {row.id: {name: row._mapping[f'old_{name}'] for name in changed} for row in rows}
+        else:
+            # Elsewhere (SQLite) RETURNING only sees the updated row, so the
+            # old values are read first; the UPDATE repeats the same WHERE
+            # clause rather than listing every id
+            before = {row.id: row._asdict() for row in db.session.execute(
+                matching.with_only_columns(table.c.id, *[table.c[name] for name in changed])
+            )}
+            rows = db.session.execute(
+                update(table).where(matching.whereclause).values(values).returning(*returned)
+            ).all() if before else []
+        if not rows:
+            db.session.rollback()
+            return []
+
+        deltas = new_deltas()
+        updated = []
+        for row in sorted(rows, key=lambda row: row.id):
+            new = {name: row._mapping[name] for name in ('assigned_to',) + TRACKED_ATTRIBUTES}
+            old = dict(new, **{name: before[row.id][name] for name in changed})
+            add_contribution(deltas, old, sign=-1)
+            add_contribution(deltas, new)
+
+            described = []
+            if 'status' in changes and old['status'] != new['status']:
+                described.append(f"status: {old['status'].value} -> {new['status'].value}")
+            if 'assigned_to' in changes and old['assigned_to'] != new['assigned_to']:
+                described.append(f"assigned_to: {new['assigned_to']}")
+            if 'region_id' in changes and old['region_id'] != new['region_id']:
+                described.append(f"region_id: {old['region_id']} -> {new['region_id']}")
+            updated.append((row.id, ', '.join(described)))
+
+        apply_deltas(connection, deltas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return updated
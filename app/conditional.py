@@ -0,0 +1,52 @@
+"""
+Conditional GET helpers.
+
+Views compute their validators (a weak ETag and optionally a Last-Modified
+time) from cheap key-column queries, check them against If-None-Match /
+If-Modified-Since, and only load and serialize full rows when the client's
+copy is out of date.
+"""
+import hashlib
+from datetime import timezone
+from flask import request, Response
+
+
+def make_etag(*parts):
+    """Stable opaque tag for the given validator values"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def _as_utc(value):
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(etag=None, last_modified=None):
+    """
+    True when the client's cached copy is still current.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the request carries no entity tags (RFC 9110 section 13.2.2).
+    """
+    if request.if_none_match:
+        return etag is not None and request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return _as_utc(last_modified).replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Attach the ETag / Last-Modified headers clients need to revalidate"""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag=None, last_modified=None):
+    """An empty 304 response carrying the current validators"""
+    return set_validators(Response(status=304), etag, last_modified)
@@ -0,0 +1,47 @@
+"""
+Streaming exports of relief requests
+
+Rows are read from a server-side cursor (yield_per) and each partition is
+encoded and handed to the response as soon as it arrives, so memory stays
+bounded by one partition however many rows match and the first bytes are
+sent before the query has finished.
+"""
+import csv
+import io
+from flask import current_app
+from app import db
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def stream_rows(query, yield_per=None):
+    """Yield lists of rows for a Core select, one cursor partition at a time"""
+    yield_per = yield_per or current_app.config['EXPORT_YIELD_PER']
+    result = db.session.execute(query.execution_options(yield_per=yield_per))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def ndjson_chunks(partitions, converter):
+    """One JSON document per line; converter should be a native one"""
+    dumps = current_app.json.dumps_bytes
+    for rows in partitions:
+        yield b''.join(dumps(converter(row)) + b'\n' for row in rows)
+
+
+def csv_chunks(partitions, converter):
+    """A header line, then one CSV record per row; converter should convert enums and datetimes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(converter.fields)
+    yield buffer.getvalue()
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(converter(row).values() for row in rows)
+        yield buffer.getvalue()
@@ -1,282 +1,609 @@
 """
 External API integrations for real-time disaster data
+
+Each source keeps one keep-alive requests.Session per process, so repeated
+polls reuse pooled connections instead of a new TCP and TLS handshake per
+call. Sources, and NOAA areas, are fetched concurrently on threads; only the
+HTTP work runs there, the database writes stay on the calling thread.
+
+Polls only ask for what changed. Earthquake imports keep a watermark - the
+newest USGS `updated` time seen - in import_watermarks and request events
+updated after it. NOAA alert polls are conditional on the previous response's
+ETag/Last-Modified, so an unchanged feed costs one 304 and no database work.
+
+Feeds are parsed as they stream in: with ijson installed, each GeoJSON
+feature is decoded from the response body on its own and turned into a
+relief request row, and rows are inserted IMPORT_BATCH_SIZE at a time, so a
+large feed never sits in memory whole. Without ijson the body is decoded at
+once with response.json().
 """
+import os
+import queue
+import threading
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
-from app.models import ReliefRequest, DisasterType, Region, DisasterSeverity, RequestStatus
+from typing import List, Dict, Iterable, Iterator, Optional
+from sqlalchemy import select
+from app.models import ReliefRequest, DisasterSeverity, RequestStatus, ImportWatermark
 from app import db
+from app.reference_data import get_reference_cache
+from app.bulk import insert_relief_requests
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Most concurrent HTTP requests made by one fetch
+MAX_FETCH_WORKERS = 8
+# Bytes read from a feed response at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+# Feed items looked up and inserted per statement
+IMPORT_BATCH_SIZE = 1000
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_for(api) -> requests.Session:
+    """The pooled keep-alive session of a feed API class, per process"""
+    key = (api, os.getpid())
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(api.HEADERS)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_FETCH_WORKERS)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _sessions[key] = session
+    return session
+
+
+class _Prefetch:
+    """
+    Iterates `produce()` on a pool thread, at most `size` items ahead of the
+    consumer. The producer's error is raised to the consumer; close() stops
+    the producer, whether or not the items were read.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, pool: ThreadPoolExecutor, produce, size: int):
+        self._buffer = queue.Queue(maxsize=size)
+        self._stopped = threading.Event()
+        pool.submit(self._fill, produce)
+    
+    def _put(self, item, error=None) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._buffer.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def _fill(self, produce):
+        try:
+            for item in produce():
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(self._DONE, e)
+        else:
+            self._put(self._DONE)
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        if self._stopped.is_set():
+            raise StopIteration
+        item, error = self._buffer.get()
+        if item is self._DONE:
+            self._stopped.set()
+            if error is not None:
+                raise error
+            raise StopIteration
+        return item
+    
+    def close(self):
+        self._stopped.set()
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    """Lists of up to `size` consecutive items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _ChunkReader:
+    """File-like reads over a streamed response's decoded content"""
+    
+    def __init__(self, response):
+        self._chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        self._buffer = b''
+    
+    def read(self, size: int = -1) -> bytes:
+        """Up to `size` bytes (all that is left if negative); b'' only at the end"""
+        if size < 0:
+            data, self._buffer = self._buffer + b''.join(self._chunks), b''
+            return data
+        # ijson probes with read(0); that must not consume a chunk
+        while size and not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b''
+            self._buffer = chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _iter_features(response) -> Iterator[Dict]:
+    """The GeoJSON features of a response, parsed one at a time when ijson is installed"""
+    if ijson is None:
+        yield from response.json().get('features', [])
+        return
+    yield from ijson.items(_ChunkReader(response), 'features.item', use_float=True)
+
 
 class USGSEarthquakeAPI:
     """USGS Earthquake API integration"""
     
     BASE_URL = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+    SOURCE = 'usgs'
+    HEADERS = {'User-Agent': 'CDRP-API/1.0 (disaster-relief@example.com)'}
     
     @classmethod
-    def fetch_recent_earthquakes(cls, hours: int = 24, min_magnitude: float = 4.0) -> List[Dict]:
-        """Fetch recent earthquakes from USGS API"""
+    def fetch_recent_earthquakes(cls, hours: int = 24, min_magnitude: float = 4.0,
+                                 updated_after: Optional[datetime] = None) -> List[Dict]:
+        """
+        Fetch recent earthquakes from USGS API
+
+        With `updated_after`, only events of the window added or revised since
+        then are returned. The window itself is kept: events can be reviewed
+        or published hours after they happen.
+        """
+        try:
+            earthquakes = list(cls.stream_recent_earthquakes(hours, min_magnitude, updated_after))
+        except Exception as e:
+            logger.error(f"Error fetching USGS earthquake data: {e}")
+            return []
+        logger.info(f"Fetched {len(earthquakes)} earthquakes from USGS API")
+        return earthquakes
+    
+    @classmethod
+    def stream_recent_earthquakes(cls, hours: int = 24, min_magnitude: float = 4.0,
+                                  updated_after: Optional[datetime] = None) -> Iterator[Dict]:
+        """
+        Like fetch_recent_earthquakes, but yield each earthquake as it is read
+        from the response. The request is sent on the first next() and errors
+        are raised to the consumer.
+        """
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=hours)
         
         params = {
             'format': 'geojson',
-            'starttime': start_time.isoformat(),
-            'endtime': end_time.isoformat(),
             'minmagnitude': min_magnitude,
             'orderby': 'time-asc'
         }
+        if updated_after is not None:
+            updated_after = updated_after.replace(tzinfo=updated_after.tzinfo or timezone.utc)
+            params['updatedafter'] = updated_after.isoformat()
+        params['starttime'] = start_time.isoformat()
+        params['endtime'] = end_time.isoformat()
         
-        try:
-            response = requests.get(cls.BASE_URL, params=params, timeout=30)
+        with _session_for(cls).get(cls.BASE_URL, params=params, stream=True, timeout=30) as response:
             response.raise_for_status()
-            data = response.json()
-            
-            earthquakes = []
-            for feature in data.get('features', []):
-                props = feature.get('properties', {})
-                coords = feature.get('geometry', {}).get('coordinates', [])
-                
-                if len(coords) >= 2:
-                    earthquakes.append({
-                        'id': feature.get('id'),
-                        'title': props.get('title', 'Earthquake'),
-                        'magnitude': props.get('mag'),
-                        'location': props.get('place', 'Unknown location'),
-                        'latitude': coords[1],
-                        'longitude': coords[0],
-                        'depth': coords[2] if len(coords) > 2 else None,
-                        'time': datetime.fromtimestamp(props.get('time', 0) / 1000, tz=timezone.utc),
-                        'url': props.get('url'),
-                        'significance': props.get('sig', 0)
-                    })
-            
-            logger.info(f"Fetched {len(earthquakes)} earthquakes from USGS API")
-            return earthquakes
+            yield from cls.parse_feed(response)
+    
+    @classmethod
+    def parse_feed(cls, response) -> Iterator[Dict]:
+        """Earthquakes of a GeoJSON response, one at a time"""
+        for feature in _iter_features(response):
+            props = feature.get('properties') or {}
+            coords = (feature.get('geometry') or {}).get('coordinates', [])
             
-        except Exception as e:
-            logger.error(f"Error fetching USGS earthquake data: {e}")
-            return []
+            if len(coords) >= 2:
+                yield {
+                    'id': feature.get('id'),
+                    'title': props.get('title', 'Earthquake'),
+                    'magnitude': props.get('mag'),
+                    'location': props.get('place', 'Unknown location'),
+                    'latitude': coords[1],
+                    'longitude': coords[0],
+                    'depth': coords[2] if len(coords) > 2 else None,
+                    'time': datetime.fromtimestamp(props.get('time', 0) / 1000, tz=timezone.utc),
+                    'updated': datetime.fromtimestamp((props.get('updated') or props.get('time', 0)) / 1000,
+                                                      tz=timezone.utc),
+                    'url': props.get('url'),
+                    'significance': props.get('sig', 0)
+                }
 
 
 class NOAAWeatherAPI:
     """NOAA Weather Alerts API integration"""
     
     BASE_URL = "https://api.weather.gov"
+    SOURCE = 'noaa'
     HEADERS = {'User-Agent': 'CDRP-API/1.0 (disaster-relief@example.com)'}
     
+    # Conditional request headers from the last response, per area, per process
+    _validators = {}
+    
+    @classmethod
+    def reset_validators(cls):
+        """Make the next poll of every area fetch the full feed"""
+        cls._validators.clear()
+    
     @classmethod
     def fetch_active_alerts(cls, area: Optional[str] = None) -> List[Dict]:
-        """Fetch active weather alerts from NOAA API"""
+        """
+        Fetch active weather alerts from NOAA API
+
+        `area` may list several comma-separated area codes; each is fetched
+        concurrently and alerts covering more than one are returned once.
+        """
+        try:
+            alerts = list(cls.stream_active_alerts(area))
+        except Exception as e:
+            logger.error(f"Error fetching NOAA weather alerts: {e}")
+            return []
+        logger.info(f"Fetched {len(alerts)} weather alerts from NOAA API")
+        return alerts
+    
+    @classmethod
+    def stream_active_alerts(cls, area: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Like fetch_active_alerts, but a single area's alerts are yielded as
+        they are read from the response. Several areas are still fetched
+        concurrently and merged first. Errors are raised to the consumer.
+        """
+        areas = [code.strip() for code in (area or '').split(',') if code.strip()]
+        if len(areas) <= 1:
+            yield from cls._stream_area(areas[0] if areas else None)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(len(areas), MAX_FETCH_WORKERS)) as pool:
+            batches = list(pool.map(cls._fetch_area, areas))
+        alerts = {}
+        for batch in batches:
+            for alert in batch:
+                alerts.setdefault(alert['id'], alert)
+        yield from alerts.values()
+    
+    @classmethod
+    def _fetch_area(cls, area: Optional[str] = None) -> List[Dict]:
+        try:
+            return list(cls._stream_area(area))
+        except Exception as e:
+            logger.error(f"Error fetching NOAA weather alerts (area: {area}): {e}")
+            return []
+    
+    @classmethod
+    def _stream_area(cls, area: Optional[str] = None) -> Iterator[Dict]:
         url = f"{cls.BASE_URL}/alerts/active"
         params = {}
         if area:
             params['area'] = area
-            
-        try:
-            response = requests.get(url, params=params, headers=cls.HEADERS, timeout=30)
+        
+        with _session_for(cls).get(url, params=params, headers=cls._validators.get(area),
+                                   stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                logger.info(f"NOAA weather alerts unchanged (area: {area or 'all'})")
+                return
             response.raise_for_status()
-            data = response.json()
-            
-            alerts = []
-            for feature in data.get('features', []):
-                props = feature.get('properties', {})
-                geometry = feature.get('geometry')
-                
-                # Extract coordinates if available
-                coordinates = None
-                if geometry and geometry.get('type') == 'Polygon':
-                    coords = geometry.get('coordinates', [[]])
-                    if coords and len(coords[0]) > 0:
-                        # Get center point of polygon
-                        lats = [point[1] for point in coords[0]]
-                        lons = [point[0] for point in coords[0]]
-                        coordinates = f"{sum(lats)/len(lats)},{sum(lons)/len(lons)}"
-                
-                alerts.append({
-                    'id': props.get('id'),
-                    'title': props.get('headline', 'Weather Alert'),
-                    'description': props.get('description', ''),
-                    'event': props.get('event', 'Unknown'),
-                    'severity': props.get('severity', 'Unknown'),
-                    'urgency': props.get('urgency', 'Unknown'),
-                    'areas': props.get('areaDesc', ''),
-                    'coordinates': coordinates,
-                    'onset': props.get('onset'),
-                    'expires': props.get('expires'),
-                    'instruction': props.get('instruction', ''),
-                    'web_url': props.get('web')
-                })
+            validators = {
+                header: response.headers[source]
+                for header, source in (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified'))
+                if source in response.headers
+            }
+            yield from cls.parse_feed(response)
+        # Only a feed that was read to the end may be answered with a 304 next time
+        cls._validators[area] = validators
+    
+    @classmethod
+    def parse_feed(cls, response) -> Iterator[Dict]:
+        """Weather alerts of a GeoJSON response, one at a time"""
+        for feature in _iter_features(response):
+            props = feature.get('properties') or {}
+            geometry = feature.get('geometry')
             
-            logger.info(f"Fetched {len(alerts)} weather alerts from NOAA API")
-            return alerts
+            # Extract coordinates if available
+            coordinates = None
+            if geometry and geometry.get('type') == 'Polygon':
+                coords = geometry.get('coordinates', [[]])
+                if coords and len(coords[0]) > 0:
+                    # Get center point of polygon
+                    lats = [point[1] for point in coords[0]]
+                    lons = [point[0] for point in coords[0]]
+                    coordinates = f"{sum(lats)/len(lats)},{sum(lons)/len(lons)}"
             
-        except Exception as e:
-            logger.error(f"Error fetching NOAA weather alerts: {e}")
-            return []
+            yield {
+                'id': props.get('id'),
+                'title': props.get('headline', 'Weather Alert'),
+                'description': props.get('description', ''),
+                'event': props.get('event', 'Unknown'),
+                'severity': props.get('severity', 'Unknown'),
+                'urgency': props.get('urgency', 'Unknown'),
+                'areas': props.get('areaDesc', ''),
+                'coordinates': coordinates,
+                'onset': props.get('onset'),
+                'expires': props.get('expires'),
+                'instruction': props.get('instruction', ''),
+                'web_url': props.get('web')
+            }
 
 
 class DisasterDataIntegrator:
-    """Integrates external disaster data into CDRP system"""
+    """
+    Integrates external disaster data into CDRP system
+
+    Each import is a batch pipeline: reference data and the system user are
+    resolved once, and the feed is consumed IMPORT_BATCH_SIZE items at a time.
+    Per batch, items that were already imported are found with one query and
+    the rest are written with one multi-row INSERT, all in one transaction.
+    The number of statements grows with the number of batches, not items.
+    """
     
     @classmethod
     def import_earthquake_data(cls, min_magnitude: float = 4.0) -> int:
         """Import earthquake data and create relief requests"""
-        earthquakes = USGSEarthquakeAPI.fetch_recent_earthquakes(
+        watermark_key, updated_after = cls._earthquake_watermark(min_magnitude)
+        earthquakes = USGSEarthquakeAPI.stream_recent_earthquakes(
             hours=24, 
-            min_magnitude=min_magnitude
+            min_magnitude=min_magnitude,
+            updated_after=updated_after
         )
-        
-        if not earthquakes:
-            return 0
-        
+        return cls.import_earthquakes(earthquakes, watermark_key)
+    
+    @classmethod
+    def import_earthquakes(cls, earthquakes: Iterable[Dict], watermark_key: Optional[str] = None) -> int:
+        """
+        Create relief requests for fetched earthquakes not imported before
+
+        With `watermark_key`, the newest update time in the feed is stored in
+        the same transaction as the new requests.
+        """
         # Get earthquake disaster type
-        earthquake_type = DisasterType.query.filter_by(code='EQ').first()
+        earthquake_type = get_reference_cache().disaster_type_by_code('EQ')
         if not earthquake_type:
             logger.error("Earthquake disaster type not found in database")
             return 0
         
-        imported_count = 0
+        newest = {}
         
-        for quake in earthquakes:
-            # Check if already imported
-            existing = ReliefRequest.query.filter(
-                ReliefRequest.title.contains(f"Magnitude {quake['magnitude']}")
-            ).filter(
-                ReliefRequest.location.contains(quake['location'])
-            ).first()
-            
-            if existing:
-                continue
-            
-            # Determine severity based on magnitude
-            severity = cls._earthquake_magnitude_to_severity(quake['magnitude'])
-            
-            # Find appropriate region (simplified - assign to Central for now)
-            region = Region.query.filter_by(code='CR').first()
-            if not region:
-                continue
-            
-            # Get system user for automated imports
-            system_user = cls._get_system_user()
-            if not system_user:
-                continue
-            
-            # Create relief request
-            request = ReliefRequest(
-                title=f"Earthquake Alert - Magnitude {quake['magnitude']}",
-                description=f"Earthquake detected: {quake['title']}\n\n"
-                           f"Magnitude: {quake['magnitude']}\n"
-                           f"Depth: {quake['depth']} km\n"
-                           f"Time: {quake['time']}\n"
-                           f"Significance: {quake['significance']}\n\n"
-                           f"More info: {quake['url']}",
-                location=quake['location'],
-                coordinates=f"{quake['latitude']},{quake['longitude']}",
-                severity=severity,
-                status=RequestStatus.PENDING,
-                disaster_type_id=earthquake_type.id,
-                region_id=region.id,
-                created_by=system_user.id,
-                predicted_by_ml=True,
-                ml_confidence=0.95,
-                priority_score=cls._calculate_earthquake_priority(quake),
-                affected_population=cls._estimate_affected_population(quake),
-                required_resources="Emergency response team, medical supplies, search and rescue equipment"
-            )
-            
-            db.session.add(request)
-            imported_count += 1
+        def rows():
+            for quake in earthquakes:
+                if 'updated' not in newest or quake['updated'] > newest['updated']:
+                    newest['updated'] = quake['updated']
+                yield cls._earthquake_row(quake, earthquake_type.id)
         
-        try:
-            db.session.commit()
-            logger.info(f"Successfully imported {imported_count} earthquake alerts")
-            return imported_count
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error saving earthquake data: {e}")
-            return 0
+        watermark = None
+        if watermark_key:
+            watermark = (watermark_key, lambda: newest.get('updated'))
+        return cls._import_rows(USGSEarthquakeAPI.SOURCE, rows(), 'earthquake alerts', watermark=watermark)
     
     @classmethod
     def import_weather_alerts(cls, area: Optional[str] = None) -> int:
         """Import weather alerts and create relief requests"""
-        alerts = NOAAWeatherAPI.fetch_active_alerts(area)
+        alerts = NOAAWeatherAPI.stream_active_alerts(area)
+        return cls.import_alerts(alerts)
+    
+    @classmethod
+    def import_alerts(cls, alerts: Iterable[Dict]) -> int:
+        """Create relief requests for fetched weather alerts not imported before"""
+        # Many alerts share an event name; map each name once
+        disaster_types = {}
         
-        if not alerts:
-            return 0
+        def rows():
+            for alert in alerts:
+                # Skip non-emergency events
+                if alert['severity'].lower() not in ['severe', 'extreme', 'moderate']:
+                    continue
+                
+                event = alert['event']
+                if event not in disaster_types:
+                    disaster_types[event] = cls._map_weather_event_to_disaster_type(event)
+                disaster_type = disaster_types[event]
+                if not disaster_type:
+                    continue
+                
+                yield cls._weather_alert_row(alert, disaster_type.id)
         
-        imported_count = 0
+        # Alerts that fail to import must be fetched again, not answered with a 304
+        return cls._import_rows(NOAAWeatherAPI.SOURCE, rows(), 'weather alerts',
+                                on_failure=NOAAWeatherAPI.reset_validators)
+    
+    @classmethod
+    def import_all_data(cls, min_magnitude: float = 4.0, area: Optional[str] = None) -> Dict:
+        """
+        Import every source at once: weather alerts start streaming on a
+        thread while the earthquake feed is streamed into the database, then
+        the alerts are imported as they arrive. At most IMPORT_BATCH_SIZE
+        alerts are read ahead, so neither feed is held in memory whole.
+
+        Returns the number imported per source and the error of each source
+        whose fetch or import failed.
+        """
+        watermark_key, updated_after = cls._earthquake_watermark(min_magnitude)
+        results = {
+            'earthquakes': 0,
+            'weather_alerts': 0,
+            'errors': []
+        }
         
-        for alert in alerts:
-            # Skip non-emergency events
-            if alert['severity'].lower() not in ['severe', 'extreme', 'moderate']:
-                continue
-            
-            # Get appropriate disaster type
-            disaster_type = cls._map_weather_event_to_disaster_type(alert['event'])
-            if not disaster_type:
-                continue
-            
-            # Check if already imported
-            existing = ReliefRequest.query.filter(
-                ReliefRequest.title.contains(alert['event'])
-            ).filter(
-                ReliefRequest.description.contains(alert['id'])
-            ).first()
-            
-            if existing:
-                continue
-            
-            # Find appropriate region
-            region = Region.query.filter_by(code='CR').first()
-            if not region:
-                continue
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            alerts = _Prefetch(pool, lambda: NOAAWeatherAPI.stream_active_alerts(area), IMPORT_BATCH_SIZE)
+            try:
+                earthquakes = USGSEarthquakeAPI.stream_recent_earthquakes(
+                    hours=24, min_magnitude=min_magnitude, updated_after=updated_after)
+                results['earthquakes'] = cls.import_earthquakes(earthquakes, watermark_key)
+            except Exception as e:
+                db.session.rollback()
+                results['errors'].append(f'Earthquake import failed: {str(e)}')
             
-            # Get system user
-            system_user = cls._get_system_user()
-            if not system_user:
-                continue
-            
-            # Determine severity
-            severity = cls._weather_severity_to_disaster_severity(alert['severity'])
-            
-            # Create relief request
-            request = ReliefRequest(
-                title=f"{alert['event']} - {alert['areas'][:100]}",
-                description=f"Weather Alert ID: {alert['id']}\n\n"
+            try:
+                results['weather_alerts'] = cls.import_alerts(alerts)
+            except Exception as e:
+                db.session.rollback()
+                results['errors'].append(f'Weather alerts import failed: {str(e)}')
+            finally:
+                alerts.close()
+        
+        return results
+    
+    @classmethod
+    def _earthquake_row(cls, quake: Dict, disaster_type_id: int) -> Dict:
+        """Relief request column values for one earthquake"""
+        return {
+            'external_id': quake['id'],
+            'title': f"Earthquake Alert - Magnitude {quake['magnitude']}",
+            'description': f"Earthquake detected: {quake['title']}\n\n"
+                           f"Magnitude: {quake['magnitude']}\n"
+                           f"Depth: {quake['depth']} km\n"
+                           f"Time: {quake['time']}\n"
+                           f"Significance: {quake['significance']}\n\n"
+                           f"More info: {quake['url']}",
+            'location': quake['location'],
+            'coordinates': f"{quake['latitude']},{quake['longitude']}",
+            'severity': cls._earthquake_magnitude_to_severity(quake['magnitude']),
+            'disaster_type_id': disaster_type_id,
+            'ml_confidence': 0.95,
+            'priority_score': cls._calculate_earthquake_priority(quake),
+            'affected_population': cls._estimate_affected_population(quake),
+            'estimated_damage': None,
+            'required_resources': "Emergency response team, medical supplies, search and rescue equipment"
+        }
+    
+    @classmethod
+    def _weather_alert_row(cls, alert: Dict, disaster_type_id: int) -> Dict:
+        """Relief request column values for one weather alert"""
+        return {
+            'external_id': alert['id'],
+            'title': f"{alert['event']} - {alert['areas'][:100]}",
+            'description': f"Weather Alert ID: {alert['id']}\n\n"
                            f"{alert['description']}\n\n"
                            f"Severity: {alert['severity']}\n"
                            f"Urgency: {alert['urgency']}\n"
                            f"Areas: {alert['areas']}\n\n"
                            f"Instructions: {alert['instruction']}\n\n"
                            f"More info: {alert['web_url']}",
-                location=alert['areas'][:255],
-                coordinates=alert['coordinates'],
-                severity=severity,
-                status=RequestStatus.PENDING,
-                disaster_type_id=disaster_type.id,
-                region_id=region.id,
-                created_by=system_user.id,
-                predicted_by_ml=True,
-                ml_confidence=0.90,
-                priority_score=cls._calculate_weather_priority(alert),
-                required_resources="Weather monitoring, evacuation support, emergency shelters"
-            )
-            
-            db.session.add(request)
-            imported_count += 1
-        
+            'location': alert['areas'][:255],
+            'coordinates': alert['coordinates'],
+            'severity': cls._weather_severity_to_disaster_severity(alert['severity']),
+            'disaster_type_id': disaster_type_id,
+            'ml_confidence': 0.90,
+            'priority_score': cls._calculate_weather_priority(alert),
+            'affected_population': None,
+            'estimated_damage': None,
+            'required_resources': "Weather monitoring, evacuation support, emergency shelters"
+        }
+    
+    @staticmethod
+    def _earthquake_watermark(min_magnitude: float):
+        """Watermark key and value of earthquake imports at a magnitude threshold"""
+        key = f'{USGSEarthquakeAPI.SOURCE}:M{min_magnitude}'
+        mark = db.session.get(ImportWatermark, key)
+        return key, mark.watermark if mark else None
+    
+    @staticmethod
+    def _advance_watermark(key: str, value: datetime):
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        mark = db.session.get(ImportWatermark, key)
+        if mark is None:
+            mark = ImportWatermark(key=key, watermark=value)
+            db.session.add(mark)
+        mark.watermark = max(mark.watermark, value)
+        mark.updated_at = datetime.now(timezone.utc)
+    
+    @classmethod
+    def _import_rows(cls, source: str, rows: Iterable[Dict], label: str, watermark=None, on_failure=None) -> int:
+        """
+        Insert the rows of one feed that have not been imported before
+
+        `watermark` is an optional (key, function returning the value once the
+        rows are consumed) advanced in the same transaction. If the feed cannot
+        be read or saved, the transaction is rolled back, `on_failure` is
+        called and the error is raised.
+        """
+        imported = 0
         try:
+            batches = _batches(rows, IMPORT_BATCH_SIZE)
+            batch = next(batches, None)
+            if batch is None:
+                return 0
+            
+            # Find appropriate region (simplified - assign to Central for now)
+            region = get_reference_cache().region_by_code('CR')
+            if not region:
+                return 0
+            
+            # Get system user for automated imports
+            system_user = cls._get_system_user()
+            if not system_user:
+                return 0
+            
+            while batch is not None:
+                # Earlier batches are already inserted in this transaction, so
+                # one lookup per batch also catches repeats across batches
+                seen = cls._imported_ids(source, [row['external_id'] for row in batch])
+                new_rows = []
+                for row in batch:
+                    if not row['external_id'] or row['external_id'] in seen:
+                        continue
+                    seen.add(row['external_id'])
+                    row.update(
+                        source=source,
+                        status=RequestStatus.PENDING,
+                        region_id=region.id,
+                        created_by=system_user.id,
+                        predicted_by_ml=True
+                    )
+                    new_rows.append(row)
+                
+                if new_rows:
+                    insert_relief_requests(new_rows)
+                    imported += len(new_rows)
+                batch = next(batches, None)
+            
+            if watermark is not None:
+                key, newest = watermark
+                if newest() is not None:
+                    cls._advance_watermark(key, newest())
             db.session.commit()
-            logger.info(f"Successfully imported {imported_count} weather alerts")
-            return imported_count
+            logger.info(f"Successfully imported {imported} {label}")
+            return imported
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Error saving weather alert data: {e}")
-            return 0
+            logger.error(f"Error importing {label}: {e}")
+            if on_failure:
+                on_failure()
+            raise
+    
+    @staticmethod
+    def _imported_ids(source: str, external_ids: List[str]) -> set:
+        """The subset of a feed's item ids that already have a relief request"""
+        external_ids = [external_id for external_id in set(external_ids) if external_id]
+        if not external_ids:
+            return set()
+        return set(db.session.scalars(
+            select(ReliefRequest.external_id)
+            .where(ReliefRequest.source == source, ReliefRequest.external_id.in_(external_ids))
+        ))
     
     @staticmethod
     def _earthquake_magnitude_to_severity(magnitude: float) -> DisasterSeverity:
@@ -357,7 +684,7 @@ class DisasterDataIntegrator:
             return 1000
     
     @staticmethod
-    def _map_weather_event_to_disaster_type(event: str) -> Optional[DisasterType]:
+    def _map_weather_event_to_disaster_type(event: str):
         """Map weather event type to disaster type in database"""
         event_lower = event.lower()
         
@@ -375,11 +702,11 @@ class DisasterDataIntegrator:
         
         for keyword, code in event_mappings.items():
             if keyword in event_lower:
-                return DisasterType.query.filter_by(code=code).first()
+                return get_reference_cache().disaster_type_by_code(code)
         
         # Default to flood for other water-related events
         if any(word in event_lower for word in ['rain', 'storm', 'water']):
-            return DisasterType.query.filter_by(code='FL').first()
+            return get_reference_cache().disaster_type_by_code('FL')
         
         return None
     
@@ -391,7 +718,7 @@ class DisasterDataIntegrator:
         system_user = User.query.filter_by(username='system').first()
         if not system_user:
             # Create system user if it doesn't exist
-            central_region = Region.query.filter_by(code='CR').first()
+            central_region = get_reference_cache().region_by_code('CR')
             system_user = User(
                 username='system',
                 email='system@cdrp.org',
@@ -0,0 +1,122 @@
+"""
+JSON provider used for every response.
+
+Encodes with orjson when it is installed (JSON_BACKEND=auto, the default)
+and with the standard library otherwise; both backends produce the same
+documents. Datetimes are written as ISO 8601 strings (what the models'
+to_dict() methods produce), enums as their value and Decimals as strings,
+so row dicts can carry native column values. RawJSON wraps bytes that are
+already JSON - cached fragments - and splices them into the output without
+decoding or re-encoding them.
+"""
+import dataclasses
+import decimal
+import enum
+import json
+import re
+import uuid
+from datetime import date, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    if not hasattr(orjson, 'Fragment'):  # added in orjson 3.10
+        orjson = None
+except ImportError:
+    orjson = None
+
+
+class RawJSON:
+    """Pre-encoded JSON that is spliced into the output verbatim"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data.encode() if isinstance(data, str) else bytes(data)
+
+
+def _default(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_default(value):
+    if isinstance(value, RawJSON):
+        return orjson.Fragment(value.data)
+    return _default(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        if backend not in ('auto', 'orjson', 'stdlib'):
+            raise ValueError(f"Unknown JSON_BACKEND {backend!r}")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_BACKEND is 'orjson' but orjson>=3.10 is not installed")
+        self.backend = 'orjson' if backend != 'stdlib' and orjson is not None else 'stdlib'
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize obj to UTF-8 JSON bytes, splicing in any RawJSON fragments"""
+        if self.backend == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_orjson_default, option=option)
+        return self._stdlib_dumps(obj, indent).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n',
+                                        mimetype=self.mimetype)
+
+    def _stdlib_dumps(self, obj, indent):
+        # json has no raw-value hook: encode each fragment as a unique
+        # placeholder string, then substitute the fragment text for it
+        fragments = []
+        marker = uuid.uuid4().hex
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                fragments.append(value.data.decode())
+                return f'{marker}:{len(fragments) - 1}'
+            return _default(value)
+
+        text = json.dumps(
+            obj,
+            default=default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (',', ':')
+        )
+        if fragments:
+            text = re.sub(f'"{marker}:(\\d+)"', lambda m: fragments[int(m.group(1))], text)
+        return text
@@ -39,6 +39,7 @@ class User(db.Model):
     role = db.Column(db.Enum(UserRole), nullable=False, default=UserRole.VIEWER)
     region_id = db.Column(db.Integer, db.ForeignKey('regions.id'), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
+    security_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
@@ -116,6 +117,28 @@ class DisasterType(db.Model):
 
 class ReliefRequest(db.Model):
     __tablename__ = 'relief_requests'
+    __table_args__ = (
+        # Composite indexes shaped to the SearchSchema filter + created_at sort
+        db.Index('ix_relief_requests_region_status_created', 'region_id', 'status', 'created_at'),
+        db.Index('ix_relief_requests_region_severity_created', 'region_id', 'severity', 'created_at'),
+        db.Index('ix_relief_requests_region_created', 'region_id', 'created_at'),
+        db.Index('ix_relief_requests_status_created', 'status', 'created_at'),
+        db.Index('ix_relief_requests_severity_created', 'severity', 'created_at'),
+        db.Index('ix_relief_requests_disaster_type_created', 'disaster_type_id', 'created_at'),
+        db.Index('ix_relief_requests_created_by_created', 'created_by', 'created_at'),
+        db.Index('ix_relief_requests_assigned_to_created', 'assigned_to', 'created_at'),
+        # The same filters under the updated_at sort
+        db.Index('ix_relief_requests_region_updated', 'region_id', 'updated_at'),
+        db.Index('ix_relief_requests_status_updated', 'status', 'updated_at'),
+        db.Index('ix_relief_requests_severity_updated', 'severity', 'updated_at'),
+        db.Index('ix_relief_requests_disaster_type_updated', 'disaster_type_id', 'updated_at'),
+        db.Index('ix_relief_requests_created_at', 'created_at', 'id'),
+        db.Index('ix_relief_requests_updated_at', 'updated_at', 'id'),
+        # Lets a retried bulk upload find the requests it already created
+        db.Index('uq_relief_requests_created_by_idempotency_key', 'created_by', 'idempotency_key', unique=True),
+        # One request per item of an external feed (USGS event id, NOAA alert id)
+        db.Index('uq_relief_requests_source_external_id', 'source', 'external_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -143,43 +166,44 @@ class ReliefRequest(db.Model):
     
     documents = db.Column(db.Text)
     
+    idempotency_key = db.Column(db.String(64))
+    source = db.Column(db.String(20))
+    external_id = db.Column(db.String(255))
+    
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     resolved_at = db.Column(db.DateTime)
     
     assigned_user = db.relationship('User', foreign_keys=[assigned_to], backref='assigned_requests')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'location': self.location,
-            'coordinates': self.coordinates,
-            'severity': self.severity.value,
-            'status': self.status.value,
-            'disaster_type_id': self.disaster_type_id,
-            'region_id': self.region_id,
-            'created_by': self.created_by,
-            'assigned_to': self.assigned_to,
-            'affected_population': self.affected_population,
-            'estimated_damage': self.estimated_damage,
-            'required_resources': self.required_resources,
-            'contact_person': self.contact_person,
-            'contact_phone': self.contact_phone,
-            'contact_email': self.contact_email,
-            'priority_score': self.priority_score,
-            'predicted_by_ml': self.predicted_by_ml,
-            'ml_confidence': self.ml_confidence,
-            'documents': self.documents,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
-        }
+    # Attributes emitted by to_dict(), in output order
+    SERIALIZABLE_FIELDS = (
+        'id', 'title', 'description', 'location', 'coordinates', 'severity', 'status',
+        'disaster_type_id', 'region_id', 'created_by', 'assigned_to',
+        'affected_population', 'estimated_damage', 'required_resources',
+        'contact_person', 'contact_phone', 'contact_email',
+        'priority_score', 'predicted_by_ml', 'ml_confidence', 'documents',
+        'created_at', 'updated_at', 'resolved_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Serialize every field, or just `fields` for a sparse fieldset"""
+        data = {}
+        for name in fields or self.SERIALIZABLE_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, enum.Enum):
+                value = value.value
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            data[name] = value
+        return data
 
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
+    __table_args__ = (
+        db.Index('ix_audit_logs_timestamp', 'timestamp', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -204,4 +228,57 @@ class AuditLog(db.Model):
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
             'timestamp': self.timestamp.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+class RequestRollup(db.Model):
+    """Pre-aggregated relief request counts, maintained by app.rollups"""
+    __tablename__ = 'request_rollups'
+    
+    region_id = db.Column(db.Integer, db.ForeignKey('regions.id'), primary_key=True)
+    disaster_type_id = db.Column(db.Integer, db.ForeignKey('disaster_types.id'), primary_key=True)
+    status = db.Column(db.Enum(RequestStatus), primary_key=True)
+    severity = db.Column(db.Enum(DisasterSeverity), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    affected_population = db.Column(db.BigInteger, nullable=False, default=0)
+    estimated_damage = db.Column(db.Float, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'region_id': self.region_id,
+            'disaster_type_id': self.disaster_type_id,
+            'status': self.status.value,
+            'severity': self.severity.value,
+            'day': self.day.isoformat(),
+            'request_count': self.request_count,
+            'affected_population': self.affected_population,
+            'estimated_damage': self.estimated_damage
+        }
+
+
+class DataVersion(db.Model):
+    """Generation counters that let each process detect changes to cached data"""
+    __tablename__ = 'data_versions'
+    
+    key = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SnapshotWatermark(db.Model):
+    """How far each table has been written to columnar snapshots"""
+    __tablename__ = 'snapshot_watermarks'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)
+    exported_at = db.Column(db.DateTime, nullable=False)
+
+
+class ImportWatermark(db.Model):
+    """Newest feed update seen by each external data import"""
+    __tablename__ = 'import_watermarks'
+    
+    key = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
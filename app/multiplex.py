@@ -0,0 +1,110 @@
+"""
+Dispatch of the sub-requests of a POST /api/batch call
+
+Each sub-request runs through the app's normal request handling in its own
+application and request context, so it gets its own database session,
+decorators, rate limits and error handlers exactly as if it had been sent on
+its own. Every sub-request carries the batch's bearer token, and the caller's
+Identity - resolved once for the batch - is seeded into each context so the
+user is not looked up again.
+
+Consecutive GET sub-requests have no side effects and run concurrently on a
+small thread pool; any other method waits for the reads before it and runs
+alone, so writes keep the order they were given in.
+
+A sub-request may not be a batch itself. Its path is resolved through the URL
+map as the request would be (percent-decoded, slashes merged) and refused if
+it reaches the batch endpoint; the batch view also refuses to run inside a
+sub-request.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+from flask import current_app, g, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth handing back to the client for each sub-request
+FORWARDED_RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Location')
+
+
+BATCH_ENDPOINT = 'api.batch'
+
+
+def _endpoint(app, path, method):
+    """The endpoint a sub-request path is routed to, or None if none matches"""
+    try:
+        return app.url_map.bind('').match(unquote(urlsplit(path).path), method=method)[0]
+    except RequestRedirect as redirect:
+        # e.g. /api//batch, which the map redirects to /api/batch
+        return _endpoint(app, redirect.new_url, method)
+    except HTTPException:
+        return None
+
+
+def _dispatch(app, sub_request, environ, identity):
+    if _endpoint(app, sub_request['path'], sub_request['method']) == BATCH_ENDPOINT:
+        return {'id': sub_request.get('id'), 'status': 400,
+                'body': {'message': 'Batches cannot be nested'}}
+
+    headers = dict(sub_request.get('headers') or {})
+    headers['Authorization'] = environ['HTTP_AUTHORIZATION']
+
+    with app.app_context():
+        g._current_identity = identity
+        g._in_batch = True
+        with app.test_request_context(
+            sub_request['path'],
+            method=sub_request['method'],
+            headers=headers,
+            json=sub_request.get('body'),
+            environ_base={'REMOTE_ADDR': environ.get('REMOTE_ADDR')}
+        ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception:
+                logger.exception(f"Batched {sub_request['method']} {sub_request['path']} failed")
+                return {'id': sub_request.get('id'), 'status': 500,
+                        'body': {'message': 'Internal server error'}}
+
+            result = {
+                'id': sub_request.get('id'),
+                'status': response.status_code,
+                'headers': {name: response.headers[name]
+                            for name in FORWARDED_RESPONSE_HEADERS if name in response.headers},
+            }
+            if response.is_json:
+                result['body'] = response.get_json()
+            else:
+                result['body'] = response.get_data(as_text=True) or None
+            return result
+
+
+def dispatch_batch(sub_requests, identity):
+    """Run validated sub-requests and return their results in the same order"""
+    app = current_app._get_current_object()
+    environ = {'HTTP_AUTHORIZATION': request.headers['Authorization'],
+               'REMOTE_ADDR': request.remote_addr}
+    workers = app.config['BATCH_MAX_WORKERS']
+
+    results = []
+    reads = []
+
+    def run_reads():
+        if len(reads) == 1 or workers <= 1:
+            results.extend(_dispatch(app, sub, environ, identity) for sub in reads)
+        elif reads:
+            with ThreadPoolExecutor(max_workers=min(workers, len(reads))) as pool:
+                results.extend(pool.map(lambda sub: _dispatch(app, sub, environ, identity), reads))
+        reads.clear()
+
+    for sub_request in sub_requests:
+        if sub_request['method'] == 'GET':
+            reads.append(sub_request)
+            continue
+        run_reads()
+        results.append(_dispatch(app, sub_request, environ, identity))
+    run_reads()
+    return results
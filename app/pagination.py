@@ -0,0 +1,156 @@
+"""
+Keyset (cursor) and offset pagination for list endpoints
+
+Both work on either an ORM Query or a Core Select; a Select is executed on
+the request session and yields Row tuples instead of model instances.
+"""
+import base64
+import binascii
+import enum
+import json
+import math
+from datetime import datetime
+from sqlalchemy import tuple_, asc, desc, bindparam, func, select, Select
+from app import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def _load_value(column, value):
+    enum_class = getattr(column.type, 'enum_class', None)
+    if enum_class is not None:
+        return enum_class[value]
+    if column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return value
+
+
+def encode_cursor(sort_key, values):
+    """Encode the last row's (sort value, id) as an opaque URL-safe token"""
+    payload = json.dumps([sort_key] + [_dump_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, sort_key, columns):
+    """Decode a token produced by encode_cursor for the same sort_key"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        token_sort_key, *raw_values = payload
+        if token_sort_key != sort_key or len(raw_values) != len(columns):
+            raise InvalidCursor('Cursor does not match the requested sort order')
+        return [_load_value(column, value) for column, value in zip(columns, raw_values)]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query"""
+
+    def __init__(self, items, has_next, next_cursor, total=None):
+        self.items = items
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+        self.total = total
+
+    def pagination_dict(self, per_page):
+        pagination = {
+            'per_page': per_page,
+            'has_next': self.has_next,
+            'next_cursor': self.next_cursor
+        }
+        if self.total is not None:
+            pagination['total'] = self.total
+        return pagination
+
+
+def _fetch(query):
+    if isinstance(query, Select):
+        return db.session.execute(query).all()
+    return query.all()
+
+
+def count_rows(query):
+    """Number of rows an ORM Query or Core Select matches"""
+    if isinstance(query, Select):
+        return db.session.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).scalar()
+    return query.order_by(None).count()
+
+
+def offset_paginate(query, page, per_page, total=None):
+    """
+    Fetch one OFFSET page of an already ordered query.
+
+    Returns (items, pagination dict). Pass `total` when the caller has
+    already counted the rows to skip the COUNT query.
+    """
+    if total is None:
+        total = count_rows(query)
+    items = _fetch(query.limit(per_page).offset((page - 1) * per_page))
+    return items, offset_pagination(page, per_page, total)
+
+
+def offset_pagination(page, per_page, total):
+    """Pagination dict of one OFFSET page"""
+    pages = math.ceil(total / per_page) if per_page else 0
+    return {
+        'page': page,
+        'pages': pages,
+        'per_page': per_page,
+        'total': total,
+        'has_next': page < pages,
+        'has_prev': page > 1
+    }
+
+
+def keyset_paginate(query, sort_column, id_column, descending, per_page,
+                    cursor=None, include_total=False):
+    """
+    Fetch the page after `cursor` ordered by (sort_column, id_column).
+
+    Seeks with a row-value comparison instead of OFFSET, so every page costs
+    the same index range scan. The total count is only computed on request.
+    """
+    sort_key = f"{sort_column.key}:{'desc' if descending else 'asc'}"
+    columns = [sort_column, id_column]
+
+    total = count_rows(query) if include_total else None
+
+    if cursor:
+        last_values = decode_cursor(cursor, sort_key, columns)
+        row_value = tuple_(*columns)
+        last_row = tuple_(*[bindparam(None, value, type_=column.type)
+                            for column, value in zip(columns, last_values)])
+        if descending:
+            query = query.filter(row_value < last_row)
+        else:
+            query = query.filter(row_value > last_row)
+
+    direction = desc if descending else asc
+    rows = _fetch(query
+                  .order_by(None)
+                  .order_by(direction(sort_column), direction(id_column))
+                  .limit(per_page + 1))
+
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_key, [getattr(last, c.key) for c in columns])
+
+    return KeysetPage(items, has_next, next_cursor, total)
@@ -1,7 +1,74 @@
 from functools import wraps
-from flask import jsonify, request
+from datetime import datetime, timezone
+from flask import jsonify, request, g, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import db
 from app.models import User, UserRole
+from app.security_versions import get_cache as get_security_versions
+
+_MISSING = object()
+
+
+class Identity:
+    """Authorization facts about the caller, resolved once per request"""
+    __slots__ = ('id', 'role', 'region_id', 'is_active')
+    
+    def __init__(self, id, role, region_id, is_active):
+        self.id = id
+        self.role = role
+        self.region_id = region_id
+        self.is_active = is_active
+    
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.role, user.region_id, user.is_active)
+
+
+def _token_identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No JWT has been verified for this request
+        return None
+
+
+def get_current_user():
+    """The authenticated User row, loaded at most once per request"""
+    user = g.get('_current_user', _MISSING)
+    if user is _MISSING:
+        current_user_id = _token_identity()
+        user = db.session.get(User, int(current_user_id)) if current_user_id else None
+        g._current_user = user
+    return user
+
+
+def _identity_from_claims():
+    """Identity from the access token claims, or None if they cannot be trusted"""
+    if not current_app.config.get('JWT_STATELESS_AUTHZ'):
+        return None
+    
+    claims = get_jwt()
+    if 'role' not in claims or 'sv' not in claims:
+        return None
+    
+    user_id = int(claims['sub'])
+    # A missing or different version means the user was deactivated or changed
+    if get_security_versions().get(user_id) != claims['sv']:
+        return None
+    
+    return Identity(user_id, UserRole(claims['role']), claims.get('region_id'), True)
+
+
+def get_current_identity():
+    """The caller's Identity, or None when there is no valid user"""
+    identity = g.get('_current_identity', _MISSING)
+    if identity is _MISSING:
+        identity = _identity_from_claims() if _token_identity() else None
+        if identity is None:
+            user = get_current_user()
+            identity = Identity.from_user(user) if user else None
+        g._current_identity = identity
+    return identity
 
 
 def require_role(*allowed_roles):
@@ -9,13 +76,12 @@ def require_role(*allowed_roles):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(int(current_user_id))
+            identity = get_current_identity()
             
-            if not user or not user.is_active:
+            if not identity or not identity.is_active:
                 return jsonify({'message': 'User not found or inactive'}), 404
             
-            if user.role not in allowed_roles:
+            if identity.role not in allowed_roles:
                 return jsonify({'message': 'Insufficient permissions'}), 403
             
             return f(*args, **kwargs)
@@ -28,18 +94,17 @@ def require_region_access(allow_admin=True):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(int(current_user_id))
+            identity = get_current_identity()
             
-            if not user or not user.is_active:
+            if not identity or not identity.is_active:
                 return jsonify({'message': 'User not found or inactive'}), 404
             
-            if allow_admin and user.role == UserRole.ADMIN:
+            if allow_admin and identity.role == UserRole.ADMIN:
                 return f(*args, **kwargs)
             
             region_id = request.view_args.get('region_id') or request.json.get('region_id') if request.json else None
             
-            if region_id and user.region_id != region_id:
+            if region_id and identity.region_id != region_id:
                 return jsonify({'message': 'Access denied to this region'}), 403
             
             return f(*args, **kwargs)
@@ -59,31 +124,29 @@ def field_agent_required(f):
     return require_role(UserRole.ADMIN, UserRole.REGIONAL_COORDINATOR, UserRole.FIELD_AGENT)(f)
 
 
-def get_current_user():
-    current_user_id = get_jwt_identity()
-    if current_user_id:
-        return User.query.get(int(current_user_id))
-    return None
+def log_audit_action(action, resource_type, resource_id=None, details=None, user_id=None):
+    log_audit_actions(action, resource_type, [(resource_id, details)], user_id)
 
 
-def log_audit_action(action, resource_type, resource_id=None, details=None):
-    from app.models import AuditLog
-    from app import db
+def log_audit_actions(action, resource_type, items, user_id=None):
+    """Record one audit entry per (resource_id, details) pair in a single batch"""
+    from app.audit import audit_writer
+    
+    # The token identity is enough; no need to load the user row again
+    if user_id is None:
+        current_user_id = _token_identity()
+        if not current_user_id:
+            return
+        user_id = int(current_user_id)
     
-    user = get_current_user()
-    if user:
-        audit_log = AuditLog(
-            user_id=user.id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=details,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent')
-        )
-        db.session.add(audit_log)
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error logging audit action: {e}")
\ No newline at end of file
+    timestamp = datetime.now(timezone.utc)
+    audit_writer.record_many([{
+        'user_id': user_id,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'details': details,
+        'ip_address': request.remote_addr,
+        'user_agent': request.headers.get('User-Agent'),
+        'timestamp': timestamp
+    } for resource_id, details in items])
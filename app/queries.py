@@ -0,0 +1,66 @@
+"""
+Shared query builders for relief request listings
+"""
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only
+from app.models import ReliefRequest, RequestStatus, DisasterSeverity, UserRole
+
+
+def visible_region_id(user):
+    """The single region a user is confined to, or None if they see every region"""
+    if user.role != UserRole.ADMIN and user.region_id:
+        return user.region_id
+    return None
+
+
+def scope_to_user(query, user):
+    """Restrict a relief request query to the regions the user may see"""
+    region_id = visible_region_id(user)
+    if region_id is not None:
+        query = query.filter(ReliefRequest.region_id == region_id)
+    return query
+
+
+def apply_search_filters(query, validated_data):
+    """Apply the SearchSchema filters (everything except sorting and paging)"""
+    if validated_data.get('query'):
+        search_term = f"%{validated_data['query']}%"
+        query = query.filter(or_(
+            ReliefRequest.title.ilike(search_term),
+            ReliefRequest.description.ilike(search_term),
+            ReliefRequest.location.ilike(search_term)
+        ))
+
+    if validated_data.get('region_id'):
+        query = query.filter(ReliefRequest.region_id == validated_data['region_id'])
+
+    if validated_data.get('disaster_type_id'):
+        query = query.filter(ReliefRequest.disaster_type_id == validated_data['disaster_type_id'])
+
+    if validated_data.get('severity'):
+        query = query.filter(ReliefRequest.severity == DisasterSeverity(validated_data['severity']))
+
+    if validated_data.get('status'):
+        query = query.filter(ReliefRequest.status == RequestStatus(validated_data['status']))
+
+    if validated_data.get('created_by'):
+        query = query.filter(ReliefRequest.created_by == validated_data['created_by'])
+
+    if validated_data.get('assigned_to'):
+        query = query.filter(ReliefRequest.assigned_to == validated_data['assigned_to'])
+
+    if validated_data.get('date_from'):
+        query = query.filter(ReliefRequest.created_at >= validated_data['date_from'])
+
+    if validated_data.get('date_to'):
+        query = query.filter(ReliefRequest.created_at <= validated_data['date_to'])
+
+    return query
+
+
+def project_fields(query, field_set, *extra_columns):
+    """Load only the columns a sparse fieldset needs, plus any the caller relies on"""
+    if not field_set:
+        return query
+    columns = [getattr(ReliefRequest, name) for name in field_set]
+    return query.options(load_only(*columns, *extra_columns))
@@ -0,0 +1,147 @@
+"""
+Process-local cache of regions and disaster types.
+
+Reference data changes rarely but is read on almost every request, so each
+process keeps every region and disaster type in memory, keyed by id and by
+code, together with the serialized bodies of the /regions and
+/disaster-types listings. Any flush that touches a Region or DisasterType
+bumps the 'reference_data' row in data_versions in the same transaction.
+The writing process drops its cache on commit; other workers compare their
+cached version with that row at most once per REFERENCE_CACHE_CHECK_INTERVAL
+seconds and reload when it has moved.
+"""
+import threading
+import time
+from types import SimpleNamespace
+from flask import current_app
+from sqlalchemy import event, update, select
+from app import db
+from app.json_provider import RawJSON
+from app.models import Region, DisasterType, DataVersion
+
+VERSION_KEY = 'reference_data'
+
+
+def current_version(session=None):
+    """The persisted reference data generation (0 if never bumped)"""
+    session = session or db.session
+    version = session.execute(
+        select(DataVersion.version).where(DataVersion.key == VERSION_KEY)
+    ).scalar()
+    return version or 0
+
+
+def bump_version(connection):
+    """Increment the reference data generation on the given connection"""
+    table = DataVersion.__table__
+    result = connection.execute(
+        update(table)
+        .where(table.c.key == VERSION_KEY)
+        .values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(key=VERSION_KEY, version=1))
+
+
+class ReferenceSnapshot:
+    """One immutable generation of the cached reference data"""
+
+    def __init__(self, version, regions, disaster_types):
+        self.version = version
+        self.regions_by_id = {r.id: r for r in regions}
+        self.regions_by_code = {r.code: r for r in regions}
+        self.disaster_types_by_id = {dt.id: dt for dt in disaster_types}
+        self.disaster_types_by_code = {dt.code: dt for dt in disaster_types}
+
+        dumps = current_app.json.dumps_bytes
+        # Encoded once per generation and spliced into responses as-is
+        self.regions_fragment = RawJSON(dumps([vars(r) for r in regions if r.is_active]))
+        self.disaster_types_fragment = RawJSON(dumps([vars(dt) for dt in disaster_types if dt.is_active]))
+        self.regions_json = dumps({'regions': self.regions_fragment})
+        self.disaster_types_json = dumps({'disaster_types': self.disaster_types_fragment})
+        self.etag = f'ref-{version}'
+
+
+class ReferenceDataCache:
+    """Regions and disaster types by id and code, reloaded when the generation moves"""
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at <= self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is not None and now - self._checked_at <= self.check_interval:
+                return snapshot
+            version = current_version()
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+            self._checked_at = now
+            return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def region(self, region_id):
+        return self.snapshot().regions_by_id.get(region_id)
+
+    def region_by_code(self, code):
+        return self.snapshot().regions_by_code.get(code)
+
+    def disaster_type(self, disaster_type_id):
+        return self.snapshot().disaster_types_by_id.get(disaster_type_id)
+
+    def disaster_type_by_code(self, code):
+        return self.snapshot().disaster_types_by_code.get(code)
+
+    def active_regions(self):
+        return [r for r in self.snapshot().regions_by_id.values() if r.is_active]
+
+    @staticmethod
+    def _load(version):
+        regions = [SimpleNamespace(**region.to_dict())
+                   for region in Region.query.order_by(Region.id).all()]
+        disaster_types = [SimpleNamespace(**dt.to_dict())
+                          for dt in DisasterType.query.order_by(DisasterType.id).all()]
+        return ReferenceSnapshot(version, regions, disaster_types)
+
+
+def init_app(app):
+    app.extensions['reference_data'] = ReferenceDataCache(
+        check_interval=app.config.get('REFERENCE_CACHE_CHECK_INTERVAL', 5)
+    )
+
+
+def get_reference_cache():
+    return current_app.extensions['reference_data']
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_on_reference_change(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Region, DisasterType)):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            bump_version(session.connection())
+            session.info['reference_data_changed'] = True
+            return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('reference_data_changed', False):
+        get_reference_cache().invalidate()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('reference_data_changed', None)
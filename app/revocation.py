@@ -0,0 +1,169 @@
+"""
+Token revocation stores.
+
+Revoked JWT ids are kept only until the token's own `exp`, after which the
+signature check rejects the token anyway. MemoryRevocationStore is
+per-process and meant for development and tests; RedisRevocationStore is
+shared by every worker. The Redis store also mirrors each revocation into a
+per-hour bloom filter bitmap, and every worker keeps a local copy of that
+bitmap (refreshed at most every REVOCATION_BLOOM_REFRESH seconds), so the
+common "not revoked" answer needs no Redis round trip.
+"""
+import hashlib
+import heapq
+import logging
+import threading
+import time
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter using Redis SETBIT bit ordering"""
+
+    def __init__(self, size_bits=1 << 18, hashes=4, data=None):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bytearray(size_bits // 8)
+        if data:
+            self.bits[:len(data)] = data[:len(self.bits)]
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=8 * self.hashes).digest()
+        return [int.from_bytes(digest[i * 8:(i + 1) * 8], 'big') % self.size_bits
+                for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (0x80 >> (position & 7))
+                   for position in self.positions(item))
+
+
+class MemoryRevocationStore:
+    """In-process store; revocations are not shared between workers"""
+
+    def __init__(self):
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._expiry[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+            self._evict(time.time())
+
+    def is_revoked(self, jti, expires_at=None):
+        expiry = self._expiry.get(jti)
+        return expiry is not None and expiry > time.time()
+
+    def _evict(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expiry.get(jti) == expires_at:
+                del self._expiry[jti]
+
+    def __len__(self):
+        return len(self._expiry)
+
+
+class RedisRevocationStore:
+    """Redis-backed store shared by all workers, fronted by a local bloom filter"""
+
+    BUCKET_SECONDS = 3600
+
+    def __init__(self, client, prefix='cdrp:revoked', bloom_bits=1 << 18, bloom_hashes=4,
+                 refresh_interval=1.0):
+        self.client = client
+        self.prefix = prefix
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self.refresh_interval = refresh_interval
+        self._blooms = {}
+        self._lock = threading.Lock()
+
+    def _token_key(self, jti):
+        return f'{self.prefix}:jti:{jti}'
+
+    def _bloom_key(self, bucket):
+        return f'{self.prefix}:bloom:{bucket}'
+
+    def revoke(self, jti, expires_at):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        bucket = int(expires_at) // self.BUCKET_SECONDS
+        bloom_key = self._bloom_key(bucket)
+        bloom = BloomFilter(self.bloom_bits, self.bloom_hashes)
+
+        pipe = self.client.pipeline()
+        pipe.set(self._token_key(jti), 1, ex=ttl)
+        for position in bloom.positions(jti):
+            pipe.setbit(bloom_key, position, 1)
+        # The bitmap outlives every token whose exp falls in its bucket
+        pipe.expireat(bloom_key, (bucket + 1) * self.BUCKET_SECONDS + 60)
+        pipe.execute()
+
+        with self._lock:
+            cached = self._blooms.get(bucket)
+            if cached is not None:
+                cached[1].add(jti)
+
+    def is_revoked(self, jti, expires_at):
+        bucket = int(expires_at) // self.BUCKET_SECONDS
+        if jti not in self._local_bloom(bucket):
+            return False
+        # Possible hit (or false positive): ask Redis, failing closed if it is down
+        try:
+            return bool(self.client.exists(self._token_key(jti)))
+        except Exception as e:
+            logger.error(f"Revocation store lookup failed, treating token as revoked: {e}")
+            return True
+
+    def _local_bloom(self, bucket):
+        now = time.monotonic()
+        cached = self._blooms.get(bucket)
+        if cached is not None and now - cached[0] < self.refresh_interval:
+            return cached[1]
+
+        with self._lock:
+            cached = self._blooms.get(bucket)
+            if cached is not None and now - cached[0] < self.refresh_interval:
+                return cached[1]
+            try:
+                data = self.client.get(self._bloom_key(bucket))
+                bloom = BloomFilter(self.bloom_bits, self.bloom_hashes, data)
+            except Exception as e:
+                if cached is None:
+                    logger.error(f"Could not load revocation bloom filter: {e}")
+                    # Nothing to answer from; make every lookup go to Redis
+                    bloom = BloomFilter(8, 1, b'\xff')
+                else:
+                    logger.warning(f"Could not refresh revocation bloom filter: {e}")
+                    bloom = cached[1]
+            self._blooms[bucket] = (now, bloom)
+            current_bucket = int(time.time()) // self.BUCKET_SECONDS
+            for stale in [b for b in self._blooms if b < current_bucket]:
+                del self._blooms[stale]
+            return bloom
+
+
+def create_revocation_store(app):
+    url = app.config.get('REVOCATION_STORE_URL')
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+        client = redis.Redis.from_url(url, socket_timeout=2)
+        return RedisRevocationStore(client, refresh_interval=app.config.get('REVOCATION_BLOOM_REFRESH', 1.0))
+    return MemoryRevocationStore()
+
+
+def init_app(app):
+    app.extensions['revocation_store'] = create_revocation_store(app)
+
+
+def get_revocation_store():
+    return current_app.extensions['revocation_store']
@@ -0,0 +1,169 @@
+"""
+Incremental maintenance of the request_rollups table.
+
+Every ORM flush that adds, changes or deletes a ReliefRequest applies the
+matching +/- deltas to request_rollups on the same connection, so the
+rollups commit or roll back together with the requests themselves. Code that
+writes relief_requests with Core statements must call apply_deltas itself.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import event, func, inspect, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import ReliefRequest, RequestRollup, RequestStatus
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ('region_id', 'disaster_type_id', 'status', 'severity', 'day')
+VALUE_COLUMNS = ('request_count', 'affected_population', 'estimated_damage')
+TRACKED_ATTRIBUTES = ('region_id', 'disaster_type_id', 'status', 'severity', 'created_at',
+                      'affected_population', 'estimated_damage')
+
+
+def contribution(values):
+    """Rollup key and (count, population, damage) for one relief request's values"""
+    key = (
+        values['region_id'],
+        values['disaster_type_id'],
+        values['status'],
+        values['severity'],
+        values['created_at'].date()
+    )
+    return key, (1, values['affected_population'] or 0, values['estimated_damage'] or 0.0)
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0, 0.0])
+
+
+def add_contribution(deltas, values, sign=1):
+    key, (count, population, damage) = contribution(values)
+    delta = deltas[key]
+    delta[0] += sign * count
+    delta[1] += sign * population
+    delta[2] += sign * damage
+
+
+def apply_deltas(connection, deltas):
+    """Upsert accumulated deltas into request_rollups"""
+    rows = [
+        dict(zip(KEY_COLUMNS, key), **dict(zip(VALUE_COLUMNS, values)))
+        for key, values in sorted(deltas.items(), key=lambda item: _sort_key(item[0]))
+        if any(values)
+    ]
+    if not rows:
+        return
+
+    table = RequestRollup.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={column: table.c[column] + stmt.excluded[column] for column in VALUE_COLUMNS}
+        )
+        connection.execute(stmt, rows)
+        return
+
+    # Generic fallback: UPDATE, then INSERT the groups that did not exist yet
+    for row in rows:
+        match = [table.c[column] == row[column] for column in KEY_COLUMNS]
+        result = connection.execute(
+            table.update()
+            .where(*match)
+            .values({column: table.c[column] + row[column] for column in VALUE_COLUMNS})
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert(), row)
+
+
+def _sort_key(key):
+    # Upsert in a stable order so concurrent transactions lock groups consistently
+    return tuple(getattr(part, 'name', part) for part in key)
+
+
+def _current_values(obj):
+    return {attr: getattr(obj, attr) for attr in TRACKED_ATTRIBUTES}
+
+
+def _previous_values(session, obj):
+    state = inspect(obj)
+    values = {}
+    for attr in TRACKED_ATTRIBUTES:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.unchanged:
+            values[attr] = history.unchanged[0]
+        else:
+            # Attribute was expired before being overwritten; read the stored row
+            row = session.execute(
+                select(*[getattr(ReliefRequest, a) for a in TRACKED_ATTRIBUTES])
+                .where(ReliefRequest.id == obj.id)
+            ).one()
+            return dict(zip(TRACKED_ATTRIBUTES, row))
+    return values
+
+
+@event.listens_for(db.session, 'before_flush')
+def _track_relief_request_changes(session, flush_context, instances):
+    deltas = new_deltas()
+
+    for obj in session.new:
+        if isinstance(obj, ReliefRequest):
+            # Fill the column defaults now so the rollup day/status are known
+            if obj.created_at is None:
+                obj.created_at = datetime.now(timezone.utc)
+            if obj.status is None:
+                obj.status = RequestStatus.PENDING
+            add_contribution(deltas, _current_values(obj))
+
+    for obj in session.deleted:
+        if isinstance(obj, ReliefRequest):
+            add_contribution(deltas, _previous_values(session, obj), sign=-1)
+
+    for obj in session.dirty:
+        if isinstance(obj, ReliefRequest) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRIBUTES):
+                add_contribution(deltas, _previous_values(session, obj), sign=-1)
+                add_contribution(deltas, _current_values(obj))
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def rebuild_rollups():
+    """Recompute request_rollups from relief_requests, repairing any drift"""
+    table = RequestRollup.__table__
+    day = func.date(ReliefRequest.created_at)
+    source = (
+        select(
+            ReliefRequest.region_id,
+            ReliefRequest.disaster_type_id,
+            ReliefRequest.status,
+            ReliefRequest.severity,
+            day,
+            func.count(ReliefRequest.id),
+            func.coalesce(func.sum(ReliefRequest.affected_population), 0),
+            func.coalesce(func.sum(ReliefRequest.estimated_damage), 0.0)
+        )
+        .group_by(ReliefRequest.region_id, ReliefRequest.disaster_type_id,
+                  ReliefRequest.status, ReliefRequest.severity, day)
+    )
+
+    try:
+        db.session.execute(delete(table))
+        db.session.execute(table.insert().from_select(list(KEY_COLUMNS + VALUE_COLUMNS), source))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    groups = db.session.query(func.count()).select_from(table).scalar()
+    logger.info(f"Rebuilt request rollups: {groups} groups")
+    return groups
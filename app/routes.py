@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, abort, stream_with_context, current_app, g
 from flask_jwt_extended import jwt_required
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy import and_, desc, asc, select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 from app import db, limiter
 from app.models import (
@@ -9,13 +10,24 @@ from app.models import (
 )
 from app.validators import (
     ReliefRequestSchema, ReliefRequestUpdateSchema,
-    RegionSchema, DisasterTypeSchema, SearchSchema,
+    RegionSchema, DisasterTypeSchema, SearchSchema, FieldSetSchema, ExportSchema,
+    SnapshotSchema, BulkUpdateSchema, BatchGetSchema, BatchSchema,
     validate_request_data
 )
 from app.permissions import (
     admin_required, coordinator_required, field_agent_required,
-    require_region_access, get_current_user, log_audit_action
+    require_region_access, get_current_identity, log_audit_action, log_audit_actions
 )
+from app.queries import scope_to_user, visible_region_id, apply_search_filters, project_fields
+from app.pagination import keyset_paginate, offset_paginate, offset_pagination, count_rows, InvalidCursor
+from app.rows import converter_for
+from app.bulk import create_relief_requests, update_relief_requests
+from app.multiplex import dispatch_batch
+from app.export import EXPORT_FORMATS, stream_rows, ndjson_chunks, csv_chunks
+from app.snapshots import write_snapshot, SnapshotUnavailable
+from app.analytics import request_breakdown
+from app.reference_data import get_reference_cache
+from app.conditional import make_etag, is_not_modified, set_validators, not_modified
 from app.external_apis import DisasterDataIntegrator
 
 api_bp = Blueprint('api', __name__)
@@ -27,12 +39,53 @@ def api_health_check():
     return {'status': 'healthy', 'message': 'CDRP API is running', 'version': '1.0.0'}, 200
 
 
+@api_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    # Backstop for a nested batch whose path got past dispatch_batch
+    if g.get('_in_batch'):
+        return jsonify({'message': 'Batches cannot be nested'}), 400
+    
+    identity = get_current_identity()
+    if not identity:
+        return jsonify({'message': 'User not found'}), 404
+    
+    validated_data, errors = validate_request_data(BatchSchema, request.get_json(silent=True) or {})
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
+    
+    return jsonify({'responses': dispatch_batch(validated_data['requests'], identity)}), 200
+
+
+def _listing_etag(user, validated_data, keys, *pagination):
+    """
+    ETag of one listing page: the filters, the id and updated_at of every row
+    on it and whether another page follows. A page changes exactly when a row
+    on it is added, edited or removed, or that next page appears or goes.
+    """
+    versions = [(key.id, key.updated_at.isoformat() if key.updated_at else None) for key in keys]
+    return make_etag('requests', visible_region_id(user), sorted(validated_data.items()),
+                     versions, *pagination)
+
+
+def _page_rows(query, converter, keys):
+    """The converter's columns for the rows of a page's keys, in the keys' order"""
+    if not keys:
+        return []
+    rows = db.session.execute(
+        query.with_only_columns(*converter.columns).where(ReliefRequest.id.in_([key.id for key in keys]))
+    ).all()
+    id_index = [column.key for column in converter.columns].index('id')
+    by_id = {row[id_index]: row for row in rows}
+    return [by_id[key.id] for key in keys if key.id in by_id]
+
+
 # Relief Request endpoints
 @api_bp.route('/requests', methods=['GET'])
 @jwt_required()
 @limiter.limit("50 per minute")
 def get_relief_requests():
-    user = get_current_user()
+    user = get_current_identity()
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
@@ -42,71 +95,104 @@ def get_relief_requests():
     if errors:
         return jsonify({'message': 'Validation failed', 'errors': errors}), 400
     
-    query = ReliefRequest.query
+    # Core select: rows go straight to dicts without becoming ORM instances
+    query = select(ReliefRequest)
     
     # Apply filters based on user role and region
-    if user.role not in [UserRole.ADMIN]:
-        if user.region_id:
-            query = query.filter(ReliefRequest.region_id == user.region_id)
+    query = scope_to_user(query, user)
     
     # Apply search filters
-    if validated_data.get('query'):
-        search_term = f"%{validated_data['query']}%"
-        query = query.filter(or_(
-            ReliefRequest.title.ilike(search_term),
-            ReliefRequest.description.ilike(search_term),
-            ReliefRequest.location.ilike(search_term)
-        ))
+    query = apply_search_filters(query, validated_data)
     
-    if validated_data.get('region_id'):
-        query = query.filter(ReliefRequest.region_id == validated_data['region_id'])
+    field_set = validated_data.get('field_set')
+    sort_column = getattr(ReliefRequest, validated_data['sort_by'])
+    converter = converter_for(ReliefRequest, tuple(field_set) if field_set else None,
+                              extra=('id',), native=True)
+    # The page is first found by its key columns alone; they version the ETag,
+    # and the full rows and the count are only read when it does not match
+    table = ReliefRequest.__table__
+    keys_query = query.with_only_columns(
+        *[table.c[name] for name in dict.fromkeys(('id', 'updated_at', sort_column.key))]
+    )
+    per_page = validated_data['per_page']
     
-    if validated_data.get('disaster_type_id'):
-        query = query.filter(ReliefRequest.disaster_type_id == validated_data['disaster_type_id'])
+    # Keyset pagination when a cursor (possibly empty for the first page) is given
+    if 'cursor' in validated_data:
+        try:
+            page = keyset_paginate(
+                keys_query,
+                sort_column,
+                ReliefRequest.id,
+                validated_data['sort_order'] == 'desc',
+                per_page,
+                cursor=validated_data['cursor']
+            )
+        except InvalidCursor as e:
+            return jsonify({'message': 'Validation failed', 'errors': {'cursor': [str(e)]}}), 400
+        
+        etag = _listing_etag(user, validated_data, page.items, page.next_cursor)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        if validated_data['include_total']:
+            page.total = count_rows(query)
+        return set_validators(jsonify({
+            'requests': converter.convert_all(_page_rows(query, converter, page.items)),
+            'pagination': page.pagination_dict(per_page)
+        }), etag), 200
     
-    if validated_data.get('severity'):
-        query = query.filter(ReliefRequest.severity == DisasterSeverity(validated_data['severity']))
+    # Apply sorting
+    if validated_data['sort_order'] == 'desc':
+        keys_query = keys_query.order_by(desc(sort_column))
+    else:
+        keys_query = keys_query.order_by(asc(sort_column))
     
-    if validated_data.get('status'):
-        query = query.filter(ReliefRequest.status == RequestStatus(validated_data['status']))
+    # One key past the page tells whether another page follows
+    keys = db.session.execute(
+        keys_query.limit(per_page + 1).offset((validated_data['page'] - 1) * per_page)
+    ).all()
+    has_next = len(keys) > per_page
+    keys = keys[:per_page]
     
-    if validated_data.get('created_by'):
-        query = query.filter(ReliefRequest.created_by == validated_data['created_by'])
+    etag = _listing_etag(user, validated_data, keys, has_next)
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return set_validators(jsonify({
+        'requests': converter.convert_all(_page_rows(query, converter, keys)),
+        'pagination': offset_pagination(validated_data['page'], per_page, count_rows(query))
+    }), etag), 200
+
+
+@api_bp.route('/requests/export', methods=['GET'])
+@jwt_required()
+@coordinator_required
+@limiter.limit("10 per hour")
+def export_relief_requests():
+    user = get_current_identity()
     
-    if validated_data.get('assigned_to'):
-        query = query.filter(ReliefRequest.assigned_to == validated_data['assigned_to'])
+    validated_data, errors = validate_request_data(ExportSchema, request.args.to_dict())
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
     
-    if validated_data.get('date_from'):
-        query = query.filter(ReliefRequest.created_at >= validated_data['date_from'])
+    query = scope_to_user(select(ReliefRequest), user)
+    query = apply_search_filters(query, validated_data)
     
-    if validated_data.get('date_to'):
-        query = query.filter(ReliefRequest.created_at <= validated_data['date_to'])
+    export_format = validated_data['format']
+    field_set = validated_data.get('field_set')
+    converter = converter_for(ReliefRequest, tuple(field_set) if field_set else None,
+                              native=export_format == 'ndjson')
     
-    # Apply sorting
+    # id breaks ties so the order is stable across the cursor's partitions
     sort_column = getattr(ReliefRequest, validated_data['sort_by'])
-    if validated_data['sort_order'] == 'desc':
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
-    
-    # Paginate results
-    page = validated_data['page']
-    per_page = validated_data['per_page']
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    order = desc if validated_data['sort_order'] == 'desc' else asc
+    query = query.with_only_columns(*converter.columns).order_by(order(sort_column), order(ReliefRequest.id))
     
-    requests = [req.to_dict() for req in pagination.items]
+    log_audit_action('EXPORT', 'RELIEF_REQUEST', details=f'Exported relief requests as {export_format}')
     
-    return jsonify({
-        'requests': requests,
-        'pagination': {
-            'page': page,
-            'pages': pagination.pages,
-            'per_page': per_page,
-            'total': pagination.total,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        }
-    }), 200
+    encode = ndjson_chunks if export_format == 'ndjson' else csv_chunks
+    response = Response(stream_with_context(encode(stream_rows(query), converter)),
+                        mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename=relief_requests.{export_format}'
+    return response
 
 
 @api_bp.route('/requests', methods=['POST'])
@@ -114,20 +200,22 @@ def get_relief_requests():
 @field_agent_required
 @limiter.limit("10 per minute")
 def create_relief_request():
-    user = get_current_user()
+    user = get_current_identity()
     data = request.get_json()
     
     validated_data, errors = validate_request_data(ReliefRequestSchema, data)
     if errors:
         return jsonify({'message': 'Validation failed', 'errors': errors}), 400
     
+    reference = get_reference_cache()
+    
     # Check if disaster type exists
-    disaster_type = DisasterType.query.get(validated_data['disaster_type_id'])
+    disaster_type = reference.disaster_type(validated_data['disaster_type_id'])
     if not disaster_type or not disaster_type.is_active:
         return jsonify({'message': 'Invalid disaster type'}), 400
     
     # Check if region exists
-    region = Region.query.get(validated_data['region_id'])
+    region = reference.region(validated_data['region_id'])
     if not region or not region.is_active:
         return jsonify({'message': 'Invalid region'}), 400
     
@@ -168,24 +256,172 @@ def create_relief_request():
         return jsonify({'message': 'Creation failed', 'error': str(e)}), 500
 
 
+@api_bp.route('/requests/bulk', methods=['POST'])
+@jwt_required()
+@field_agent_required
+@limiter.limit("10 per minute")
+def bulk_create_relief_requests():
+    user = get_current_identity()
+    data = request.get_json(silent=True) or {}
+    
+    items = data.get('requests')
+    limit = current_app.config['BULK_CREATE_MAX']
+    if not isinstance(items, list) or not 1 <= len(items) <= limit:
+        return jsonify({'message': 'Validation failed',
+                        'errors': {'requests': [f'Must be a list of 1 to {limit} relief requests.']}}), 400
+    
+    try:
+        results, created = create_relief_requests(user, items)
+    except IntegrityError:
+        # A concurrent retry inserted one of the idempotency keys first
+        return jsonify({'message': 'Conflicting upload in progress, retry the request'}), 409
+    except Exception as e:
+        return jsonify({'message': 'Creation failed', 'error': str(e)}), 500
+    
+    log_audit_actions('CREATE', 'RELIEF_REQUEST', [
+        (request_id, f"Created relief request: {values['title']}") for request_id, values in created
+    ])
+    
+    failed = any(result['status'] == 'invalid' for result in results)
+    return jsonify({
+        'results': results,
+        'created': len(created)
+    }), 207 if failed else 201
+
+
+@api_bp.route('/requests/bulk', methods=['PATCH'])
+@jwt_required()
+@coordinator_required
+@limiter.limit("10 per minute")
+def bulk_update_relief_requests():
+    user = get_current_identity()
+    
+    validated_data, errors = validate_request_data(BulkUpdateSchema, request.get_json(silent=True) or {})
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
+    
+    changes = {}
+    if 'status' in validated_data:
+        changes['status'] = RequestStatus(validated_data['status'])
+    if 'assigned_to' in validated_data:
+        changes['assigned_to'] = validated_data['assigned_to']
+    if 'region_id' in validated_data:
+        region = get_reference_cache().region(validated_data['region_id'])
+        if not region or not region.is_active:
+            return jsonify({'message': 'Invalid region'}), 400
+        if user.role != UserRole.ADMIN and user.region_id != region.id:
+            return jsonify({'message': 'Access denied to this region'}), 403
+        changes['region_id'] = region.id
+    
+    # Rows outside the caller's region are never matched
+    query = scope_to_user(select(ReliefRequest), user)
+    if 'ids' in validated_data:
+        query = query.where(ReliefRequest.id.in_(validated_data['ids']))
+    else:
+        query = apply_search_filters(query, validated_data['filter'])
+    
+    try:
+        updated = update_relief_requests(query, changes)
+    except Exception as e:
+        return jsonify({'message': 'Update failed', 'error': str(e)}), 500
+    
+    log_audit_actions('UPDATE', 'RELIEF_REQUEST', [
+        (request_id, f'Bulk updated relief request: {description}') for request_id, description in updated
+    ])
+    
+    return jsonify({
+        'message': f'{len(updated)} relief requests updated',
+        'updated': len(updated),
+        'ids': [request_id for request_id, _ in updated]
+    }), 200
+
+
+@api_bp.route('/requests/batch-get', methods=['POST'])
+@jwt_required()
+def batch_get_relief_requests():
+    user = get_current_identity()
+    
+    validated_data, errors = validate_request_data(BatchGetSchema, request.get_json(silent=True) or {})
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
+    ids = list(dict.fromkeys(validated_data['ids']))
+    field_set = validated_data.get('field_set')
+    
+    converter = converter_for(ReliefRequest, tuple(field_set) if field_set else None,
+                              extra=('id',), native=True)
+    query = scope_to_user(converter.select(), user).where(ReliefRequest.id.in_(ids))
+    id_index = [column.key for column in converter.columns].index('id')
+    found = {row[id_index]: converter(row) for row in db.session.execute(query)}
+    
+    # Ids outside the caller's region exist but were filtered out above
+    unmatched = [request_id for request_id in ids if request_id not in found]
+    forbidden = set()
+    if unmatched:
+        forbidden = set(db.session.scalars(
+            select(ReliefRequest.id).where(ReliefRequest.id.in_(unmatched))
+        ))
+    
+    return jsonify({
+        'requests': [found[request_id] for request_id in ids if request_id in found],
+        'missing': [request_id for request_id in unmatched if request_id not in forbidden],
+        'forbidden': [request_id for request_id in unmatched if request_id in forbidden]
+    }), 200
+
+
+def _relief_request_etag(request_id, updated_at, field_set=None):
+    return make_etag('request', request_id, updated_at.isoformat(), field_set)
+
+
+def _load_relief_request(request_id, field_set=None):
+    query = project_fields(ReliefRequest.query, field_set,
+                           ReliefRequest.region_id, ReliefRequest.updated_at)
+    return query.filter(ReliefRequest.id == request_id).first()
+
+
 @api_bp.route('/requests/<int:request_id>', methods=['GET'])
 @jwt_required()
 def get_relief_request(request_id):
-    user = get_current_user()
-    relief_request = ReliefRequest.query.get_or_404(request_id)
+    user = get_current_identity()
+    
+    validated_data, errors = validate_request_data(
+        FieldSetSchema, {'fields': request.args['fields']} if 'fields' in request.args else {}
+    )
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
+    field_set = validated_data.get('field_set')
+    
+    # Revalidations only need the key columns; full rows are loaded on a miss
+    relief_request = None
+    if request.if_none_match or request.if_modified_since:
+        row = (db.session.query(ReliefRequest.region_id, ReliefRequest.updated_at)
+               .filter(ReliefRequest.id == request_id)
+               .first())
+    else:
+        row = relief_request = _load_relief_request(request_id, field_set)
+    if row is None:
+        abort(404)
     
     # Check region access for non-admin users
-    if user.role != UserRole.ADMIN and user.region_id != relief_request.region_id:
+    if user.role != UserRole.ADMIN and user.region_id != row.region_id:
         return jsonify({'message': 'Access denied to this region'}), 403
     
-    return jsonify({'request': relief_request.to_dict()}), 200
+    etag = _relief_request_etag(request_id, row.updated_at, field_set)
+    if is_not_modified(etag, row.updated_at):
+        return not_modified(etag, row.updated_at)
+    
+    if relief_request is None:
+        relief_request = _load_relief_request(request_id, field_set)
+        if relief_request is None:
+            abort(404)
+    return set_validators(jsonify({'request': relief_request.to_dict(field_set)}),
+                          etag, relief_request.updated_at), 200
 
 
 @api_bp.route('/requests/<int:request_id>', methods=['PUT'])
 @jwt_required()
 @field_agent_required
 def update_relief_request(request_id):
-    user = get_current_user()
+    user = get_current_identity()
     relief_request = ReliefRequest.query.get_or_404(request_id)
     
     # Check permissions
@@ -245,13 +481,14 @@ def update_relief_request(request_id):
         db.session.commit()
         
         if changes:
-            log_audit_action('UPDATE', 'RELIEF_REQUEST', relief_request.id,
+            log_audit_action('UPDATE', 'RELIEF_REQUEST', request_id,
                            f'Updated relief request: {", ".join(changes)}')
         
-        return jsonify({
+        return set_validators(jsonify({
             'message': 'Relief request updated successfully',
             'request': relief_request.to_dict()
-        }), 200
+        }), _relief_request_etag(request_id, relief_request.updated_at),
+            relief_request.updated_at), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed', 'error': str(e)}), 500
@@ -276,14 +513,19 @@ def delete_relief_request(request_id):
         return jsonify({'message': 'Deletion failed', 'error': str(e)}), 500
 
 
+def _cached_json_response(body, etag):
+    """Serve pre-serialized JSON, answering 304 when the client's copy is current"""
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return set_validators(Response(body, mimetype='application/json'), etag)
+
+
 # Region endpoints
 @api_bp.route('/regions', methods=['GET'])
 @jwt_required()
 def get_regions():
-    regions = Region.query.filter_by(is_active=True).all()
-    return jsonify({
-        'regions': [region.to_dict() for region in regions]
-    }), 200
+    snapshot = get_reference_cache().snapshot()
+    return _cached_json_response(snapshot.regions_json, f'{snapshot.etag}-regions')
 
 
 @api_bp.route('/regions', methods=['POST'])
@@ -323,10 +565,8 @@ def create_region():
 @api_bp.route('/disaster-types', methods=['GET'])
 @jwt_required()
 def get_disaster_types():
-    disaster_types = DisasterType.query.filter_by(is_active=True).all()
-    return jsonify({
-        'disaster_types': [dt.to_dict() for dt in disaster_types]
-    }), 200
+    snapshot = get_reference_cache().snapshot()
+    return _cached_json_response(snapshot.disaster_types_json, f'{snapshot.etag}-disaster-types')
 
 
 @api_bp.route('/disaster-types', methods=['POST'])
@@ -368,24 +608,13 @@ def create_disaster_type():
 @jwt_required()
 @coordinator_required
 def get_dashboard_analytics():
-    user = get_current_user()
+    user = get_current_identity()
     
     # Base query with region filtering for non-admin users
-    base_query = ReliefRequest.query
-    if user.role != UserRole.ADMIN and user.region_id:
-        base_query = base_query.filter(ReliefRequest.region_id == user.region_id)
-    
-    # Get counts by status
-    status_counts = {}
-    for status in RequestStatus:
-        count = base_query.filter(ReliefRequest.status == status).count()
-        status_counts[status.value] = count
-    
-    # Get counts by severity
-    severity_counts = {}
-    for severity in DisasterSeverity:
-        count = base_query.filter(ReliefRequest.severity == severity).count()
-        severity_counts[severity.value] = count
+    base_query = scope_to_user(ReliefRequest.query, user)
+    
+    # Status, severity, region and total counts from the rollup table
+    breakdown = request_breakdown(visible_region_id(user))
     
     # Get recent requests
     recent_requests = (base_query
@@ -396,17 +625,15 @@ def get_dashboard_analytics():
     # Get requests by region (for admins)
     region_counts = {}
     if user.role == UserRole.ADMIN:
-        regions = Region.query.filter_by(is_active=True).all()
-        for region in regions:
-            count = ReliefRequest.query.filter(ReliefRequest.region_id == region.id).count()
-            region_counts[region.name] = count
+        for region in get_reference_cache().active_regions():
+            region_counts[region.name] = breakdown['region_counts'].get(region.id, 0)
     
     return jsonify({
-        'status_counts': status_counts,
-        'severity_counts': severity_counts,
-        'region_counts': region_counts if user.role == UserRole.ADMIN else {},
+        'status_counts': breakdown['status_counts'],
+        'severity_counts': breakdown['severity_counts'],
+        'region_counts': region_counts,
         'recent_requests': [req.to_dict() for req in recent_requests],
-        'total_requests': base_query.count()
+        'total_requests': breakdown['total']
     }), 200
 
 
@@ -415,9 +642,10 @@ def get_dashboard_analytics():
 @jwt_required()
 @admin_required
 def get_users():
-    users = User.query.all()
+    converter = converter_for(User, native=True)
+    rows = db.session.execute(converter.select().order_by(User.id)).all()
     return jsonify({
-        'users': [user.to_dict() for user in users]
+        'users': converter.convert_all(rows)
     }), 200
 
 
@@ -425,28 +653,57 @@ def get_users():
 @jwt_required()
 @admin_required
 def get_audit_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
-    pagination = (AuditLog.query
-                  .order_by(desc(AuditLog.timestamp))
-                  .paginate(page=page, per_page=per_page, error_out=False))
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 100)
+    
+    converter = converter_for(AuditLog, native=True)
+    query = converter.select()
+    
+    if 'cursor' in request.args:
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        try:
+            keyset_page = keyset_paginate(
+                query, AuditLog.timestamp, AuditLog.id, True, per_page,
+                cursor=request.args['cursor'], include_total=include_total
+            )
+        except InvalidCursor as e:
+            return jsonify({'message': 'Validation failed', 'errors': {'cursor': [str(e)]}}), 400
+        
+        return jsonify({
+            'logs': converter.convert_all(keyset_page.items),
+            'pagination': keyset_page.pagination_dict(per_page)
+        }), 200
     
-    logs = [log.to_dict() for log in pagination.items]
+    rows, pagination = offset_paginate(query.order_by(desc(AuditLog.timestamp)), page, per_page)
     
     return jsonify({
-        'logs': logs,
-        'pagination': {
-            'page': page,
-            'pages': pagination.pages,
-            'per_page': per_page,
-            'total': pagination.total,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        }
+        'logs': converter.convert_all(rows),
+        'pagination': pagination
     }), 200
 
 
+@api_bp.route('/admin/snapshots', methods=['POST'])
+@jwt_required()
+@admin_required
+def create_snapshots():
+    validated_data, errors = validate_request_data(SnapshotSchema, request.get_json(silent=True) or {})
+    if errors:
+        return jsonify({'message': 'Validation failed', 'errors': errors}), 400
+    
+    try:
+        snapshots = [
+            write_snapshot(table_name, format=validated_data['format'], full=validated_data['full'])
+            for table_name in validated_data['tables']
+        ]
+    except SnapshotUnavailable as e:
+        return jsonify({'message': str(e)}), 503
+    
+    log_audit_action('EXPORT', 'SNAPSHOT', details=', '.join(
+        f"{s['table']}: {s['rows']} rows" for s in snapshots))
+    
+    return jsonify({'snapshots': snapshots}), 200
+
+
 # External Data Integration endpoints
 @api_bp.route('/data/import/earthquakes', methods=['POST'])
 @jwt_required()
@@ -454,8 +711,6 @@ def get_audit_logs():
 @limiter.limit("5 per hour")
 def import_earthquake_data():
     """Import recent earthquake data from USGS API"""
-    user = get_current_user()
-    
     # Get parameters
     data = request.get_json() or {}
     min_magnitude = data.get('min_magnitude', 4.0)
@@ -485,8 +740,6 @@ def import_earthquake_data():
 @limiter.limit("5 per hour")
 def import_weather_alerts():
     """Import active weather alerts from NOAA API"""
-    user = get_current_user()
-    
     # Get parameters
     data = request.get_json() or {}
     area = data.get('area', None)  # Optional state code like 'CA'
@@ -516,30 +769,13 @@ def import_weather_alerts():
 @limiter.limit("3 per hour")
 def import_all_disaster_data():
     """Import data from all external disaster APIs"""
-    user = get_current_user()
-    
     # Get parameters
     data = request.get_json() or {}
     min_magnitude = data.get('min_magnitude', 4.0)
     area = data.get('area', None)
     
-    results = {
-        'earthquakes': 0,
-        'weather_alerts': 0,
-        'errors': []
-    }
-    
-    # Import earthquakes
-    try:
-        results['earthquakes'] = DisasterDataIntegrator.import_earthquake_data(min_magnitude)
-    except Exception as e:
-        results['errors'].append(f'Earthquake import failed: {str(e)}')
-    
-    # Import weather alerts
-    try:
-        results['weather_alerts'] = DisasterDataIntegrator.import_weather_alerts(area)
-    except Exception as e:
-        results['errors'].append(f'Weather alerts import failed: {str(e)}')
+    # Sources are fetched concurrently, then imported one after the other
+    results = DisasterDataIntegrator.import_all_data(min_magnitude, area)
     
     total_imported = results['earthquakes'] + results['weather_alerts']
     
@@ -578,4 +814,5 @@ def get_data_sources():
                 'alert_types': ['Severe Weather', 'Floods', 'Tornados', 'Hurricanes', 'Blizzards']
             }
         ]
-    }), 200
\ No newline at end of file
+    }), 200
+
@@ -0,0 +1,74 @@
+"""
+Read-only row conversion for high-volume listings.
+
+Listing endpoints select plain columns with SQLAlchemy Core and turn each
+result tuple straight into its output dict, skipping ORM instance
+construction, identity-map bookkeeping and to_dict(). A RowConverter
+compiles one function per (model, fields) pair whose body is a single dict
+literal indexing into the row, with enum and datetime columns converted
+inline exactly as the models' to_dict() methods do. Native converters leave
+enums and datetimes as they are for the response encoder to write directly.
+"""
+from functools import lru_cache
+from sqlalchemy import DateTime, Enum, select
+from app.models import ReliefRequest, User, AuditLog
+
+USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'region_id',
+    'is_active', 'created_at', 'updated_at'
+)
+
+AUDIT_LOG_FIELDS = (
+    'id', 'user_id', 'action', 'resource_type', 'resource_id', 'details',
+    'ip_address', 'user_agent', 'timestamp'
+)
+
+
+class RowConverter:
+    """Selects `fields` (plus `extra`) from a model's table and converts rows to dicts"""
+
+    def __init__(self, model, fields, extra=(), native=False):
+        table = model.__table__
+        self.fields = tuple(fields)
+        self.native = native
+        self.columns = [table.c[name] for name in self.fields]
+        self.columns += [table.c[name] for name in dict.fromkeys(extra) if name not in self.fields]
+        self.convert = self._compile()
+
+    def select(self):
+        return select(*self.columns)
+
+    def __call__(self, row):
+        return self.convert(row)
+
+    def convert_all(self, rows):
+        convert = self.convert
+        return [convert(row) for row in rows]
+
+    def _compile(self):
+        items = []
+        for index, column in enumerate(self.columns[:len(self.fields)]):
+            value = f'row[{index}]'
+            if self.native:
+                pass  # the JSON provider writes enums and datetimes itself
+            elif isinstance(column.type, Enum) and column.type.enum_class is not None:
+                value = f'(None if {value} is None else {value}.value)'
+            elif isinstance(column.type, DateTime):
+                value = f'(None if {value} is None else {value}.isoformat())'
+            items.append(f'{column.key!r}: {value}')
+        source = 'def convert(row):\n    return {' + ', '.join(items) + '}\n'
+        namespace = {}
+        exec(compile(source, f'<row converter {self.columns[0].table.name}>', 'exec'), namespace)
+        return namespace['convert']
+
+
+@lru_cache(maxsize=128)
+def converter_for(model, fields=None, extra=(), native=False):
+    """Shared converter for a model and an optional sparse fieldset"""
+    if fields is None:
+        fields = {
+            ReliefRequest: ReliefRequest.SERIALIZABLE_FIELDS,
+            User: USER_FIELDS,
+            AuditLog: AUDIT_LOG_FIELDS,
+        }[model]
+    return RowConverter(model, fields, extra, native)
@@ -84,9 +84,12 @@ class DisasterDataScheduler:
         try:
             logger.info("Starting scheduled comprehensive data import")
             
-            earthquake_count = DisasterDataIntegrator.import_earthquake_data(min_magnitude=3.5)
-            weather_count = DisasterDataIntegrator.import_weather_alerts()
+            results = DisasterDataIntegrator.import_all_data(min_magnitude=3.5)
+            earthquake_count = results['earthquakes']
+            weather_count = results['weather_alerts']
             total_count = earthquake_count + weather_count
+            for error in results['errors']:
+                logger.error(error)
             
             logger.info(f"Scheduled comprehensive import completed: {total_count} total alerts imported "
                        f"(earthquakes: {earthquake_count}, weather: {weather_count})")
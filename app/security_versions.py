@@ -0,0 +1,89 @@
+"""
+Per-user security versions for stateless (claims-based) authorization.
+
+Access tokens carry the user's role, region and security version. A user's
+security version is bumped whenever their role, region or active flag
+changes, so a token whose version no longer matches is stale. Each process
+keeps the {user_id: version} map of active users in memory and reloads it
+at most once per SECURITY_VERSION_TTL seconds, so authorizing from the token
+normally costs no user query at all.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, inspect
+from app import db
+from app.models import User
+
+AUTHZ_ATTRIBUTES = ('role', 'region_id', 'is_active')
+
+
+def identity_claims(user):
+    """Additional JWT claims for stateless authorization"""
+    return {
+        'role': user.role.value,
+        'region_id': user.region_id,
+        'sv': user.security_version or 0
+    }
+
+
+class SecurityVersionCache:
+    """Process-local map of active user ids to their security version"""
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._versions = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """The user's current security version, or None if missing or inactive"""
+        versions = self._versions
+        if versions is None or time.monotonic() - self._loaded_at > self.ttl:
+            versions = self._reload()
+        return versions.get(user_id)
+
+    def invalidate(self):
+        self._versions = None
+
+    def _reload(self):
+        with self._lock:
+            if self._versions is not None and time.monotonic() - self._loaded_at <= self.ttl:
+                return self._versions
+            rows = (db.session.query(User.id, User.security_version)
+                    .filter(User.is_active.is_(True))
+                    .all())
+            self._versions = {user_id: version or 0 for user_id, version in rows}
+            self._loaded_at = time.monotonic()
+            return self._versions
+
+
+def init_app(app):
+    app.extensions['security_versions'] = SecurityVersionCache(
+        ttl=app.config.get('SECURITY_VERSION_TTL', 30)
+    )
+
+
+def get_cache():
+    return current_app.extensions['security_versions']
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_security_versions(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in AUTHZ_ATTRIBUTES):
+                obj.security_version = (obj.security_version or 0) + 1
+                session.info['security_versions_changed'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('security_versions_changed', False):
+        get_cache().invalidate()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('security_versions_changed', None)
@@ -0,0 +1,194 @@
+"""
+Columnar snapshots of relief_requests and audit_logs for analytics
+
+Each table is written as a hive-partitioned Parquet (or Arrow IPC) dataset:
+relief requests by creation day and region, audit logs by day. Rows are read
+from a server-side cursor and written as one record batch per cursor
+partition, so memory is bounded by the batch size. Enum columns are
+dictionary-encoded against the full list of enum values.
+
+A snapshot covers rows whose change column (updated_at / timestamp) is at or
+before a cutoff of SNAPSHOT_WATERMARK_LAG seconds ago, which leaves time for
+in-flight transactions and buffered audit entries to land. The cutoff is
+stored as the table's watermark; the next incremental snapshot writes only
+rows changed after it, as new files next to the existing ones. A changed row
+therefore appears once per snapshot it changed in - consumers keep the copy
+with the latest change column per id. Every run writes uniquely named files,
+so runs never overwrite each other. A full snapshot is written to a new
+directory that replaces the table's dataset only once it is complete.
+
+Deleted rows are not captured: an incremental snapshot has no way to record
+them, so a deleted request stays in the dataset until the next full snapshot.
+
+pyarrow is optional; without it snapshots raise SnapshotUnavailable.
+"""
+import os
+import shutil
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models import ReliefRequest, AuditLog, SnapshotWatermark
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+except ImportError:
+    pa = None
+
+SNAPSHOT_FORMATS = {
+    'parquet': ('parquet', 'parquet'),
+    'arrow': ('ipc', 'arrow'),
+}
+
+SnapshotTable = namedtuple('SnapshotTable', 'model changed day partitions')
+
+SNAPSHOT_TABLES = {
+    'relief_requests': SnapshotTable(ReliefRequest, 'updated_at', 'created_at', ('day', 'region_id')),
+    'audit_logs': SnapshotTable(AuditLog, 'timestamp', 'timestamp', ('day',)),
+}
+
+
+class SnapshotUnavailable(RuntimeError):
+    pass
+
+
+def _arrow_type(column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp('us')
+    if python_type is str:
+        return pa.string()
+    if getattr(column.type, 'enum_class', None) is not None:
+        return pa.dictionary(pa.int8(), pa.string())
+    raise TypeError(f"No Arrow type for column {column.key} ({column.type})")
+
+
+class _BatchBuilder:
+    """Turns lists of row tuples into record batches of one table's schema"""
+
+    def __init__(self, spec):
+        self.columns = list(spec.model.__table__.columns)
+        self.day_index = self.columns.index(spec.model.__table__.c[spec.day])
+        fields = [pa.field(column.key, _arrow_type(column)) for column in self.columns]
+        self.schema = pa.schema(fields + [pa.field('day', pa.date32())])
+
+        # Codes are positions in the enum definition, so every batch and
+        # every snapshot shares one dictionary per column
+        self.enums = {}
+        for index, column in enumerate(self.columns):
+            enum_class = getattr(column.type, 'enum_class', None)
+            if enum_class is not None:
+                members = list(enum_class)
+                self.enums[index] = ({member: code for code, member in enumerate(members)},
+                                     pa.array([member.value for member in members], pa.string()))
+
+    def __call__(self, rows):
+        values_by_column = list(zip(*rows))
+        arrays = []
+        for index, (field, values) in enumerate(zip(self.schema, values_by_column)):
+            if index in self.enums:
+                codes, dictionary = self.enums[index]
+                indices = pa.array([None if v is None else codes[v] for v in values], pa.int8())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+            else:
+                arrays.append(pa.array(values, field.type))
+        days = [None if v is None else v.date() for v in values_by_column[self.day_index]]
+        arrays.append(pa.array(days, pa.date32()))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _replace_dir(new_dir, target):
+    """Move new_dir into target's place, then remove the old target"""
+    old_dir = None
+    if os.path.isdir(target):
+        old_dir = f"{new_dir}.old"
+        os.rename(target, old_dir)
+    if os.path.isdir(new_dir):
+        os.rename(new_dir, target)
+    else:
+        # No rows to write: the full snapshot is an empty dataset
+        os.makedirs(target)
+    if old_dir:
+        shutil.rmtree(old_dir)
+
+
+def write_snapshot(table_name, output_dir=None, format='parquet', full=False):
+    """Write one table's full or incremental snapshot and advance its watermark"""
+    if pa is None:
+        raise SnapshotUnavailable("Columnar snapshots need pyarrow installed")
+    spec = SNAPSHOT_TABLES[table_name]
+    dataset_format, extension = SNAPSHOT_FORMATS[format]
+    config = current_app.config
+    base_dir = os.path.join(output_dir or config['SNAPSHOT_DIR'], table_name)
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(seconds=config['SNAPSHOT_WATERMARK_LAG'])
+    mark = db.session.get(SnapshotWatermark, table_name)
+    since = None if full or mark is None else mark.watermark
+
+    table = spec.model.__table__
+    changed = table.c[spec.changed]
+    query = select(*table.columns).where(changed <= cutoff)
+    run_id = uuid.uuid4().hex[:12]
+    if since is not None:
+        query = query.where(changed > since)
+        write_dir = base_dir
+    else:
+        # A full snapshot only replaces the old dataset once it has been written
+        write_dir = f"{base_dir}.tmp-{run_id}"
+
+    build = _BatchBuilder(spec)
+    result = db.session.execute(query.execution_options(yield_per=config['EXPORT_YIELD_PER']))
+    rows_written = 0
+
+    def batches():
+        nonlocal rows_written
+        for rows in result.partitions():
+            rows_written += len(rows)
+            yield build(rows)
+
+    try:
+        pa_dataset.write_dataset(
+            batches(),
+            write_dir,
+            schema=build.schema,
+            format=dataset_format,
+            partitioning=list(spec.partitions),
+            partitioning_flavor='hive',
+            basename_template=f"part-{now:%Y%m%dT%H%M%S}-{run_id}-{{i}}.{extension}",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    except BaseException:
+        if write_dir != base_dir:
+            shutil.rmtree(write_dir, ignore_errors=True)
+        raise
+    finally:
+        result.close()
+
+    if write_dir != base_dir:
+        _replace_dir(write_dir, base_dir)
+
+    if mark is None:
+        mark = SnapshotWatermark(table_name=table_name)
+        db.session.add(mark)
+    mark.watermark = cutoff
+    mark.exported_at = now
+    db.session.commit()
+
+    return {
+        'table': table_name,
+        'format': format,
+        'path': base_dir,
+        'rows': rows_written,
+        'since': since.isoformat() if since else None,
+        'watermark': cutoff.isoformat()
+    }
@@ -1,6 +1,17 @@
 from marshmallow import Schema, fields, validate, ValidationError, validates_schema
 from email_validator import validate_email, EmailNotValidError
-from app.models import UserRole, DisasterSeverity, RequestStatus
+from app.models import UserRole, DisasterSeverity, RequestStatus, ReliefRequest
+
+
+class DelimitedList(fields.List):
+    """A list field read from one comma-separated query string value"""
+    
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError('Must be a comma-separated string.')
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        # Keep the caller's order but drop repeats
+        return super()._deserialize(list(dict.fromkeys(items)), attr, data, **kwargs)
 
 
 class UserRegistrationSchema(Schema):
@@ -52,6 +63,10 @@ class ReliefRequestSchema(Schema):
     contact_email = fields.Email()
 
 
+class BulkReliefRequestItemSchema(ReliefRequestSchema):
+    idempotency_key = fields.Str(validate=validate.Length(min=1, max=64))
+
+
 class ReliefRequestUpdateSchema(Schema):
     title = fields.Str(validate=validate.Length(min=5, max=200))
     description = fields.Str(validate=validate.Length(min=10))
@@ -70,6 +85,30 @@ class ReliefRequestUpdateSchema(Schema):
     contact_email = fields.Email()
 
 
+# SearchSchema fields that narrow the rows matched (the rest sort, page or project)
+SEARCH_CRITERIA = ('query', 'region_id', 'disaster_type_id', 'severity', 'status',
+                   'created_by', 'assigned_to', 'date_from', 'date_to')
+
+
+class BulkUpdateSchema(Schema):
+    """Status, assignment and region changes applied to an id list or a search filter"""
+    ids = fields.List(fields.Int(), validate=validate.Length(min=1))
+    filter = fields.Nested('SearchSchema')
+    status = fields.Str(validate=validate.OneOf([status.value for status in RequestStatus]))
+    assigned_to = fields.Int(allow_none=True)
+    region_id = fields.Int()
+
+    @validates_schema
+    def validate_target_and_changes(self, data, **kwargs):
+        if ('ids' in data) == ('filter' in data):
+            raise ValidationError('Give exactly one of ids or filter')
+        # apply_search_filters skips empty values, so they would match every row
+        if 'filter' in data and not any(data['filter'].get(name) for name in SEARCH_CRITERIA):
+            raise ValidationError({'filter': [f"Give at least one of {', '.join(SEARCH_CRITERIA)}"]})
+        if not {'status', 'assigned_to', 'region_id'} & set(data):
+            raise ValidationError('Give at least one of status, assigned_to or region_id')
+
+
 class RegionSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=2, max=100))
     code = fields.Str(required=True, validate=validate.Length(min=2, max=10))
@@ -85,7 +124,19 @@ class DisasterTypeSchema(Schema):
     is_active = fields.Bool()
 
 
-class SearchSchema(Schema):
+class FieldSetSchema(Schema):
+    """Sparse fieldset: `fields=id,status,...` limits a relief request to those keys"""
+    field_set = DelimitedList(
+        fields.Str(validate=validate.OneOf(ReliefRequest.SERIALIZABLE_FIELDS)),
+        data_key='fields', validate=validate.Length(min=1)
+    )
+
+
+class BatchGetSchema(FieldSetSchema):
+    ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=500))
+
+
+class SearchSchema(FieldSetSchema):
     query = fields.Str()
     region_id = fields.Int()
     disaster_type_id = fields.Int()
@@ -99,6 +150,8 @@ class SearchSchema(Schema):
     per_page = fields.Int(validate=validate.Range(min=1, max=100), missing=20)
     sort_by = fields.Str(validate=validate.OneOf(['created_at', 'updated_at', 'severity', 'status']), missing='created_at')
     sort_order = fields.Str(validate=validate.OneOf(['asc', 'desc']), missing='desc')
+    cursor = fields.Str()
+    include_total = fields.Bool(missing=False)
 
     @validates_schema
     def validate_date_range(self, data, **kwargs):
@@ -107,6 +160,31 @@ class SearchSchema(Schema):
                 raise ValidationError('date_from must be before date_to')
 
 
+class ExportSchema(SearchSchema):
+    format = fields.Str(validate=validate.OneOf(['ndjson', 'csv']), missing='ndjson')
+
+
+class SnapshotSchema(Schema):
+    tables = fields.List(fields.Str(validate=validate.OneOf(['relief_requests', 'audit_logs'])),
+                         validate=validate.Length(min=1), missing=['relief_requests', 'audit_logs'])
+    format = fields.Str(validate=validate.OneOf(['parquet', 'arrow']), missing='parquet')
+    full = fields.Bool(missing=False)
+
+
+class SubRequestSchema(Schema):
+    id = fields.Str()
+    method = fields.Str(validate=validate.OneOf(['GET', 'POST', 'PUT', 'PATCH', 'DELETE']), missing='GET')
+    path = fields.Str(required=True, validate=validate.Regexp(r'^/api/(?!batch\b)',
+                                                              error='Must be an /api/ path other than /api/batch.'))
+    headers = fields.Dict(keys=fields.Str(), values=fields.Str())
+    body = fields.Raw(allow_none=True)
+
+
+class BatchSchema(Schema):
+    requests = fields.List(fields.Nested(SubRequestSchema), required=True,
+                           validate=validate.Length(min=1, max=20))
+
+
 def validate_request_data(schema_class, data):
     schema = schema_class()
     try:
@@ -13,6 +13,29 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600)))
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(seconds=int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 2592000)))
     
+    # Authorize from role/region claims in the access token instead of loading the user
+    JWT_STATELESS_AUTHZ = os.environ.get('JWT_STATELESS_AUTHZ', 'False').lower() == 'true'
+    SECURITY_VERSION_TTL = int(os.environ.get('SECURITY_VERSION_TTL', 30))
+    
+    # Response JSON encoder: auto (orjson when installed), orjson or stdlib
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # Seconds between checks of the shared region/disaster type version
+    REFERENCE_CACHE_CHECK_INTERVAL = float(os.environ.get('REFERENCE_CACHE_CHECK_INTERVAL', 5))
+    
+    # Most relief requests accepted by one POST /api/requests/bulk
+    BULK_CREATE_MAX = int(os.environ.get('BULK_CREATE_MAX', 100))
+    
+    # Threads running the GET sub-requests of one /api/batch call concurrently
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+    
+    # Rows fetched per server-side cursor round trip by the streaming exports
+    EXPORT_YIELD_PER = int(os.environ.get('EXPORT_YIELD_PER', 1000))
+    
+    # Columnar snapshots cover rows changed more than SNAPSHOT_WATERMARK_LAG seconds ago
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+    SNAPSHOT_WATERMARK_LAG = int(os.environ.get('SNAPSHOT_WATERMARK_LAG', 300))
+    
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
@@ -28,6 +51,16 @@ class Config:
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
     
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Revoked tokens are shared through Redis when configured, else kept per process
+    REVOCATION_STORE_URL = os.environ.get('REVOCATION_STORE_URL') or os.environ.get('REDIS_URL')
+    REVOCATION_BLOOM_REFRESH = float(os.environ.get('REVOCATION_BLOOM_REFRESH', 1.0))
+    
+    # Audit entries are buffered and written in batches by a background thread
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'True').lower() == 'true'
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
 
 
 class DevelopmentConfig(Config):
@@ -39,6 +72,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL_TEST') or 'sqlite:///test.db'
     WTF_CSRF_ENABLED = False
+    AUDIT_ASYNC = False
+    REVOCATION_STORE_URL = None
+    # Tests run in one process, where writes invalidate the cache directly
+    REFERENCE_CACHE_CHECK_INTERVAL = 3600
 
 
 class ProductionConfig(Config):
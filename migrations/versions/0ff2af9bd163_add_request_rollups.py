@@ -0,0 +1,56 @@
+"""Add request rollups
+
+Revision ID: 0ff2af9bd163
+Revises: edb85d1a7a67
+Create Date: 2026-10-16 11:26:05.917342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0ff2af9bd163'
+down_revision = 'edb85d1a7a67'
+branch_labels = None
+depends_on = None
+
+
+# The enum types already exist from the initial migration
+request_status = sa.Enum(
+    'PENDING', 'APPROVED', 'IN_PROGRESS', 'COMPLETED', 'REJECTED', name='requeststatus'
+).with_variant(postgresql.ENUM(name='requeststatus', create_type=False), 'postgresql')
+disaster_severity = sa.Enum(
+    'LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='disasterseverity'
+).with_variant(postgresql.ENUM(name='disasterseverity', create_type=False), 'postgresql')
+
+
+def upgrade():
+    op.create_table('request_rollups',
+    sa.Column('region_id', sa.Integer(), nullable=False),
+    sa.Column('disaster_type_id', sa.Integer(), nullable=False),
+    sa.Column('status', request_status, nullable=False),
+    sa.Column('severity', disaster_severity, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('request_count', sa.Integer(), nullable=False),
+    sa.Column('affected_population', sa.BigInteger(), nullable=False),
+    sa.Column('estimated_damage', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['disaster_type_id'], ['disaster_types.id'], ),
+    sa.ForeignKeyConstraint(['region_id'], ['regions.id'], ),
+    sa.PrimaryKeyConstraint('region_id', 'disaster_type_id', 'status', 'severity', 'day')
+    )
+
+    # Backfill from the existing requests
+    op.execute("""
+        INSERT INTO request_rollups (region_id, disaster_type_id, status, severity, day,
+                                     request_count, affected_population, estimated_damage)
+        SELECT region_id, disaster_type_id, status, severity, date(created_at),
+               count(id), coalesce(sum(affected_population), 0), coalesce(sum(estimated_damage), 0)
+        FROM relief_requests
+        GROUP BY region_id, disaster_type_id, status, severity, date(created_at)
+    """)
+
+
+def downgrade():
+    op.drop_table('request_rollups')
@@ -0,0 +1,29 @@
+"""Add data versions
+
+Revision ID: 3b9d61f0c2a4
+Revises: 7e4e7a2a8c3e
+Create Date: 2026-10-16 13:05:17.204388
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d61f0c2a4'
+down_revision = '7e4e7a2a8c3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_versions = op.create_table('data_versions',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.bulk_insert(data_versions, [{'key': 'reference_data', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('data_versions')
@@ -0,0 +1,48 @@
+"""Add relief request search indexes
+
+Revision ID: 472958f59246
+Revises: ad4cbde03745
+Create Date: 2026-10-16 09:12:41.503118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '472958f59246'
+down_revision = 'ad4cbde03745'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_relief_requests_region_status_created', ['region_id', 'status', 'created_at']),
+    ('ix_relief_requests_region_severity_created', ['region_id', 'severity', 'created_at']),
+    ('ix_relief_requests_region_created', ['region_id', 'created_at']),
+    ('ix_relief_requests_status_created', ['status', 'created_at']),
+    ('ix_relief_requests_severity_created', ['severity', 'created_at']),
+    ('ix_relief_requests_disaster_type_created', ['disaster_type_id', 'created_at']),
+    ('ix_relief_requests_created_by_created', ['created_by', 'created_at']),
+    ('ix_relief_requests_assigned_to_created', ['assigned_to', 'created_at']),
+    ('ix_relief_requests_region_updated', ['region_id', 'updated_at']),
+    ('ix_relief_requests_status_updated', ['status', 'updated_at']),
+    ('ix_relief_requests_severity_updated', ['severity', 'updated_at']),
+    ('ix_relief_requests_disaster_type_updated', ['disaster_type_id', 'updated_at']),
+    ('ix_relief_requests_created_at', ['created_at', 'id']),
+    ('ix_relief_requests_updated_at', ['updated_at', 'id']),
+]
+
+
+def upgrade():
+    # Build the indexes without holding a write lock on large PostgreSQL tables
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'relief_requests', columns, unique=False,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='relief_requests',
+                          postgresql_concurrently=True)
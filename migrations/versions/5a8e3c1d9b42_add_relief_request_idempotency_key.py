@@ -0,0 +1,32 @@
+"""Add relief request idempotency key
+
+Revision ID: 5a8e3c1d9b42
+Revises: 9c2d5e7f1a36
+Create Date: 2026-10-16 16:20:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8e3c1d9b42'
+down_revision = '9c2d5e7f1a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('relief_requests', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('uq_relief_requests_created_by_idempotency_key', 'relief_requests',
+                        ['created_by', 'idempotency_key'], unique=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_relief_requests_created_by_idempotency_key', table_name='relief_requests',
+                      postgresql_concurrently=True)
+    with op.batch_alter_table('relief_requests') as batch_op:
+        batch_op.drop_column('idempotency_key')
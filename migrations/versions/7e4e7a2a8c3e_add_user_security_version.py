@@ -0,0 +1,25 @@
+"""Add user security version
+
+Revision ID: 7e4e7a2a8c3e
+Revises: 0ff2af9bd163
+Create Date: 2026-10-16 12:40:52.661904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4e7a2a8c3e'
+down_revision = '0ff2af9bd163'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('security_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('security_version')
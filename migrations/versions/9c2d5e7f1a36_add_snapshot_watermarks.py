@@ -0,0 +1,29 @@
+"""Add snapshot watermarks
+
+Revision ID: 9c2d5e7f1a36
+Revises: 3b9d61f0c2a4
+Create Date: 2026-10-16 15:41:09.772015
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2d5e7f1a36'
+down_revision = '3b9d61f0c2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('snapshot_watermarks',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=False),
+    sa.Column('exported_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('snapshot_watermarks')
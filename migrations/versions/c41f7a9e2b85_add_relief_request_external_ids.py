@@ -0,0 +1,79 @@
+"""Add relief request source and external id
+
+Revision ID: c41f7a9e2b85
+Revises: 5a8e3c1d9b42
+Create Date: 2026-10-16 17:02:31.840517
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a9e2b85'
+down_revision = '5a8e3c1d9b42'
+branch_labels = None
+depends_on = None
+
+# Imported requests carry their feed id in the description text
+WEATHER_ALERT_ID = re.compile(r'^Weather Alert ID: (\S+)')
+USGS_EVENT_URL = re.compile(r'More info: https?://earthquake\.usgs\.gov/earthquakes/eventpage/([A-Za-z0-9]+)')
+
+
+def _external_id(title, description):
+    description = description or ''
+    if title.startswith('Earthquake Alert - '):
+        match = USGS_EVENT_URL.search(description)
+        return ('usgs', match.group(1)) if match else None
+    match = WEATHER_ALERT_ID.match(description)
+    if match:
+        return ('noaa', match.group(1))
+    return None
+
+
+def upgrade():
+    op.add_column('relief_requests', sa.Column('source', sa.String(length=20), nullable=True))
+    op.add_column('relief_requests', sa.Column('external_id', sa.String(length=255), nullable=True))
+
+    relief_requests = sa.table(
+        'relief_requests',
+        sa.column('id', sa.Integer),
+        sa.column('title', sa.String),
+        sa.column('description', sa.Text),
+        sa.column('source', sa.String),
+        sa.column('external_id', sa.String),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(relief_requests.c.id, relief_requests.c.title, relief_requests.c.description)
+        .where(sa.or_(relief_requests.c.title.like('Earthquake Alert - %'),
+                      relief_requests.c.description.like('Weather Alert ID: %')))
+        .order_by(relief_requests.c.id)
+    )
+
+    # The old substring checks let duplicates through; the oldest copy keeps the id
+    seen = set()
+    updates = []
+    for row in rows:
+        key = _external_id(row.title, row.description)
+        if key and key not in seen:
+            seen.add(key)
+            updates.append({'row_id': row.id, 'source': key[0], 'external_id': key[1]})
+    if updates:
+        connection.execute(
+            relief_requests.update()
+            .where(relief_requests.c.id == sa.bindparam('row_id'))
+            .values(source=sa.bindparam('source'), external_id=sa.bindparam('external_id')),
+            updates
+        )
+
+    op.create_index('uq_relief_requests_source_external_id', 'relief_requests',
+                    ['source', 'external_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_relief_requests_source_external_id', table_name='relief_requests')
+    with op.batch_alter_table('relief_requests') as batch_op:
+        batch_op.drop_column('external_id')
+        batch_op.drop_column('source')
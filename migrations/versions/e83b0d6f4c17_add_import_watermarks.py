@@ -0,0 +1,29 @@
+"""Add import watermarks
+
+Revision ID: e83b0d6f4c17
+Revises: c41f7a9e2b85
+Create Date: 2026-10-16 18:14:52.301946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83b0d6f4c17'
+down_revision = 'c41f7a9e2b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_watermarks',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('import_watermarks')
@@ -0,0 +1,28 @@
+"""Add audit log timestamp index
+
+Revision ID: edb85d1a7a67
+Revises: 472958f59246
+Create Date: 2026-10-16 10:03:17.284310
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'edb85d1a7a67'
+down_revision = '472958f59246'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backs the (timestamp, id) keyset seek used by GET /api/audit-logs?cursor=
+    with op.get_context().autocommit_block():
+        op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs',
+                      postgresql_concurrently=True)
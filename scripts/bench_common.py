@@ -0,0 +1,251 @@
+"""
+Shared helpers for the benchmark scripts in this directory
+"""
+import os
+import sys
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEVERITY_WEIGHTS = {'LOW': 40, 'MEDIUM': 35, 'HIGH': 20, 'CRITICAL': 5}
+STATUS_WEIGHTS = {'PENDING': 30, 'APPROVED': 15, 'IN_PROGRESS': 20, 'COMPLETED': 30, 'REJECTED': 5}
+
+
+def create_bench_app(database_url=None):
+    """Create a testing app bound to the benchmark database"""
+    # The config classes read the database URL at import time
+    os.environ['DATABASE_URL_TEST'] = database_url or 'sqlite://'
+    from app import create_app, db
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_reference_data(regions=5, disaster_types=10, users=20):
+    """Create regions, disaster types and users; returns their ids"""
+    from app import db
+    from app.models import Region, DisasterType, User, UserRole
+
+    region_rows = [Region(name=f'Bench Region {i}', code=f'BR{i}') for i in range(regions)]
+    type_rows = [DisasterType(name=f'Bench Disaster {i}', code=f'BD{i}') for i in range(disaster_types)]
+    db.session.add_all(region_rows + type_rows)
+    db.session.flush()
+
+    user_rows = []
+    for i in range(users):
+        user = User(
+            username=f'bench{i}',
+            email=f'bench{i}@example.com',
+            first_name='Bench',
+            last_name=str(i),
+            role=UserRole.FIELD_AGENT,
+            region_id=region_rows[i % regions].id,
+            password_hash='x'
+        )
+        user_rows.append(user)
+    db.session.add_all(user_rows)
+    db.session.commit()
+
+    return {
+        'regions': [r.id for r in region_rows],
+        'disaster_types': [t.id for t in type_rows],
+        'users': [u.id for u in user_rows],
+    }
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_relief_request_rows(count, refs, seed=42, days=365):
+    """Yield plain column dicts for synthetic relief requests"""
+    from app.models import DisasterSeverity, RequestStatus
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        yield {
+            'title': f'Synthetic request {i}',
+            'description': 'Synthetic relief request generated for benchmarking ' * 4,
+            'location': f'Grid square {rng.randint(1, 5000)}',
+            'coordinates': f'{rng.uniform(-90, 90):.5f},{rng.uniform(-180, 180):.5f}',
+            'severity': DisasterSeverity[_weighted(rng, SEVERITY_WEIGHTS)],
+            'status': RequestStatus[_weighted(rng, STATUS_WEIGHTS)],
+            'disaster_type_id': rng.choice(refs['disaster_types']),
+            'region_id': rng.choice(refs['regions']),
+            'created_by': rng.choice(refs['users']),
+            'assigned_to': rng.choice(refs['users']) if rng.random() < 0.3 else None,
+            'affected_population': rng.randint(0, 100000),
+            'estimated_damage': round(rng.uniform(0, 1e7), 2),
+            'required_resources': 'Water, food, shelter',
+            'priority_score': round(rng.uniform(0, 150), 2),
+            'predicted_by_ml': False,
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(seconds=rng.randint(0, 86400)),
+        }
+
+
+def seed_relief_requests(count, refs, batch_size=10000, seed=42):
+    """Bulk insert synthetic relief requests with executemany batches"""
+    from app import db
+    from app.models import ReliefRequest
+
+    table = ReliefRequest.__table__
+    batch = []
+    for row in generate_relief_request_rows(count, refs, seed=seed):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+    db.session.commit()
+
+    # Core inserts bypass the incremental rollup hook
+    from app.rollups import rebuild_rollups
+    rebuild_rollups()
+
+
+def seed_feed_reference_data():
+    """Create the region, disaster types and system user the feed importers need"""
+    from app import db
+    from app.external_apis import DisasterDataIntegrator
+    from app.models import Region, DisasterType
+    from app.reference_data import get_reference_cache
+
+    db.session.add(Region(name='Central Region', code='CR'))
+    db.session.add_all(DisasterType(name=name, code=code) for name, code in (
+        ('Earthquake', 'EQ'), ('Flood', 'FL'), ('Tornado', 'TO'), ('Hurricane', 'HU')
+    ))
+    db.session.commit()
+    DisasterDataIntegrator._get_system_user()
+    get_reference_cache().snapshot()
+
+
+WEATHER_EVENTS = ('Flood Warning', 'Flash Flood Warning', 'Tornado Warning', 'Hurricane Warning',
+                  'Severe Thunderstorm Warning', 'Heat Advisory', 'Winter Storm Watch')
+WEATHER_SEVERITIES = ('Extreme', 'Severe', 'Moderate', 'Minor')
+
+
+def _synthetic_earthquake(i, rng, now_ms):
+    magnitude = round(rng.uniform(2.5, 7.5), 1)
+    place = f'{rng.randint(1, 200)} km {rng.choice("NSEW")} of Synthetic {i % 500}'
+    time_ms = now_ms - rng.randint(0, 30 * 86400 * 1000)
+    return {
+        'type': 'Feature',
+        'properties': {
+            'mag': magnitude, 'place': place, 'time': time_ms,
+            'updated': time_ms + rng.randint(0, 3600 * 1000),
+            'url': f'https://earthquake.usgs.gov/earthquakes/eventpage/sy{i:08d}',
+            'detail': f'https://earthquake.usgs.gov/fdsnws/event/1/query?eventid=sy{i:08d}&format=geojson',
+            'status': 'reviewed', 'tsunami': 0, 'sig': int(magnitude * 100), 'net': 'sy',
+            'code': f'{i:08d}', 'magType': 'mb', 'type': 'earthquake', 'title': f'M {magnitude} - {place}'
+        },
+        'geometry': {'type': 'Point', 'coordinates': [
+            round(rng.uniform(-180, 180), 4), round(rng.uniform(-60, 70), 4), round(rng.uniform(0, 300), 2)
+        ]},
+        'id': f'sy{i:08d}'
+    }
+
+
+def _synthetic_alert(i, rng, polygon_points):
+    event = rng.choice(WEATHER_EVENTS)
+    lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+    ring = [[round(lon + rng.uniform(-0.5, 0.5), 4), round(lat + rng.uniform(-0.5, 0.5), 4)]
+            for _ in range(polygon_points)]
+    alert_id = f'urn:oid:2.49.0.1.840.0.synthetic.{i}'
+    return {
+        'id': f'https://api.weather.gov/alerts/{alert_id}',
+        'type': 'Feature',
+        'geometry': {'type': 'Polygon', 'coordinates': [ring + ring[:1]]},
+        'properties': {
+            'id': alert_id, 'areaDesc': f'Synthetic County {i % 3000}, ST',
+            'onset': '2026-10-16T12:00:00-05:00', 'expires': '2026-10-17T06:00:00-05:00',
+            'severity': rng.choice(WEATHER_SEVERITIES), 'urgency': 'Immediate', 'event': event,
+            'headline': f'{event} issued for Synthetic County {i % 3000}',
+            'description': 'Synthetic alert text generated for benchmarking. ' * 8,
+            'instruction': 'Monitor local media for updates.', 'web': 'https://www.weather.gov'
+        }
+    }
+
+
+def write_synthetic_feed(f, source, count, seed=42, polygon_points=40):
+    """
+    Write a GeoJSON FeatureCollection of `count` synthetic USGS earthquakes
+    or NOAA alerts to the binary file f, one feature at a time
+    """
+    rng = random.Random(seed)
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    f.write(b'{"type": "FeatureCollection", "features": [')
+    for i in range(count):
+        if i:
+            f.write(b',')
+        if source == 'usgs':
+            feature = _synthetic_earthquake(i, rng, now_ms)
+        else:
+            feature = _synthetic_alert(i, rng, polygon_points)
+        f.write(json.dumps(feature).encode())
+    f.write(b']}')
+
+
+class QueryCounter:
+    """Counts SQL statements sent to an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+def peak_rss_mib():
+    """Peak resident set size of this process so far"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def time_call(fn, repeat=5):
+    """Run fn repeatedly and return (median_ms, result of the last call)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+@contextmanager
+def timer():
+    """Context manager yielding a dict whose 'ms' key is filled on exit"""
+    elapsed = {}
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed['ms'] = (time.perf_counter() - start) * 1000
@@ -0,0 +1,79 @@
+"""
+Measure SQL statements and latency of GET /api/analytics/dashboard as the
+number of regions grows.
+
+Usage:
+    python -m scripts.benchmark_dashboard --rows 100000 --regions 5 50 500
+
+Exits with status 1 if the statement count changes with the region count.
+"""
+import argparse
+import sys
+
+from scripts.bench_common import (
+    create_bench_app, seed_reference_data, seed_relief_requests, QueryCounter, timer
+)
+
+
+def _admin_headers():
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.models import User, UserRole
+
+    admin = User(username='bench-admin', email='bench-admin@example.com', first_name='Bench',
+                 last_name='Admin', role=UserRole.ADMIN, password_hash='x')
+    db.session.add(admin)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+
+
+def measure(region_count, rows, database_url, repeat):
+    from app import db
+
+    app = create_bench_app(database_url)
+    with app.app_context():
+        refs = seed_reference_data(regions=region_count)
+        seed_relief_requests(rows, refs)
+        headers = _admin_headers()
+        engine = db.engine
+
+    client = app.test_client()
+    client.get('/api/analytics/dashboard', headers=headers)  # warm up
+
+    timings = []
+    for _ in range(repeat):
+        with QueryCounter(engine) as counter, timer() as elapsed:
+            response = client.get('/api/analytics/dashboard', headers=headers)
+        assert response.status_code == 200, response.data
+        timings.append(elapsed['ms'])
+
+    with app.app_context():
+        db.drop_all()
+
+    return counter.count, min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--regions', type=int, nargs='+', default=[5, 50, 500])
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = []
+    for region_count in args.regions:
+        statements, best_ms = measure(region_count, args.rows, args.database_url, args.repeat)
+        results.append(statements)
+        print(f"regions={region_count:<6} statements={statements:<4} best={best_ms:8.2f} ms")
+
+    if len(set(results)) != 1:
+        print("\nStatement count grows with the number of regions")
+        return 1
+
+    print("\nStatement count is constant across region counts")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Measure peak memory and time of importing a large external feed.
+
+A synthetic USGS earthquake or NOAA alert feed is written to a temporary
+file and served as a streamed response. Each feed is measured two ways:
+  decoded   response.json() decodes the whole body first (the path without ijson)
+  streamed  ijson decodes one feature at a time from the response chunks
+
+For each, "parse" consumes the normalized records in IMPORT_BATCH_SIZE
+batches without touching the database, and "import" runs the full
+DisasterDataIntegrator pipeline into the benchmark database. Peak memory is
+the tracemalloc peak of Python allocations while the step runs.
+
+Usage:
+    python -m scripts.benchmark_feed_parsing --features 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from scripts.bench_common import create_bench_app, seed_feed_reference_data, timer, write_synthetic_feed
+
+
+class FileResponse:
+    """Stands in for a streamed requests.Response reading a feed file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def iter_content(self, chunk_size=1):
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def json(self):
+        with open(self.path, 'rb') as f:
+            return json.load(f)
+
+
+def measure(fn):
+    """Run fn under tracemalloc; returns (result, elapsed ms, peak MiB)"""
+    tracemalloc.start()
+    try:
+        with timer() as elapsed:
+            result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed['ms'], peak / 2 ** 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', type=int, default=100000)
+    parser.add_argument('--source', choices=('usgs', 'noaa', 'both'), default='both')
+    parser.add_argument('--polygon-points', type=int, default=40)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--skip-import', action='store_true', help='only measure parsing')
+    args = parser.parse_args(argv)
+
+    app = create_bench_app(args.database_url)
+    with app.app_context():
+        from app import db, external_apis
+        from app.external_apis import DisasterDataIntegrator, USGSEarthquakeAPI, NOAAWeatherAPI
+        from app.models import ReliefRequest
+
+        seed_feed_reference_data()
+
+        sources = ('usgs', 'noaa') if args.source == 'both' else (args.source,)
+        apis = {'usgs': USGSEarthquakeAPI, 'noaa': NOAAWeatherAPI}
+        importers = {'usgs': DisasterDataIntegrator.import_earthquakes,
+                     'noaa': DisasterDataIntegrator.import_alerts}
+        parsers = ['decoded'] + (['streamed'] if external_apis.ijson is not None else [])
+        ijson = external_apis.ijson
+
+        for source in sources:
+            with tempfile.NamedTemporaryFile(suffix='.geojson', delete=False) as f:
+                write_synthetic_feed(f, source, args.features, polygon_points=args.polygon_points)
+                path = f.name
+            try:
+                print(f"{source}: {args.features} features, {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+                for parser_name in parsers:
+                    external_apis.ijson = ijson if parser_name == 'streamed' else None
+
+                    def parse():
+                        count = 0
+                        records = apis[source].parse_feed(FileResponse(path))
+                        for batch in external_apis._batches(records, external_apis.IMPORT_BATCH_SIZE):
+                            count += len(batch)
+                        return count
+
+                    steps = [('parse', parse)]
+                    if not args.skip_import:
+                        steps.append(('import', lambda: importers[source](
+                            apis[source].parse_feed(FileResponse(path)))))
+                    for step, fn in steps:
+                        count, ms, peak = measure(fn)
+                        print(f"  {parser_name:<9} {step:<7} {count:>8} items  {ms:>9.0f} ms  "
+                              f"peak={peak:>7.1f} MiB")
+                    if not args.skip_import:
+                        db.session.query(ReliefRequest).delete()
+                        db.session.commit()
+            finally:
+                external_apis.ijson = ijson
+                os.unlink(path)
+
+        if ijson is None:
+            print("ijson is not installed; only the decoded path was measured")
+
+        db.drop_all()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
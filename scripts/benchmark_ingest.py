@@ -0,0 +1,158 @@
+"""
+Measure end-to-end ingest of the external feeds against a local stand-in server.
+
+Each importer runs in its own process, against a FeedServer (see
+scripts.feed_server) serving a recording scaled to --features features, or a
+synthetic feed, with the API classes' BASE_URL pointed at it. The importer
+polls --polls times; later polls find every feature already imported, and
+NOAA answers them with a 304. Per poll, the report gives features imported
+per second over the whole fetch-parse-insert path and SQL statements per
+feature, then the importer process's peak RSS.
+
+The features the importer keeps (it skips e.g. minor weather alerts) are
+counted first by importing the feed file directly, without HTTP, into a
+scratch in-memory database.
+
+Usage:
+    python -m scripts.benchmark_ingest --features 10000
+    python -m scripts.benchmark_ingest --features 10000 --latency 0.2 --error-rate 0.5 --error-kind disconnect
+
+Exits with status 1 if the first poll that completed imported fewer features
+than the direct import, or an import that completed used more statements than
+its number of batches allows.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from scripts.bench_common import write_synthetic_feed
+from scripts.feed_server import ERROR_KINDS, scale_feed
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+RECORDINGS = {
+    'usgs': os.path.join(FIXTURES, 'usgs_earthquakes.geojson'),
+    'noaa': os.path.join(FIXTURES, 'noaa_alerts.geojson'),
+}
+# Statements of an import outside its batches, and per batch
+FIXED_STATEMENTS = 6
+STATEMENTS_PER_BATCH = 3
+
+
+def count_importable(source, feed_path):
+    """Import the feed file directly into a scratch database; returns how many features were kept"""
+    from scripts.bench_common import create_bench_app, seed_feed_reference_data
+    from scripts.benchmark_feed_parsing import FileResponse
+
+    app = create_bench_app('sqlite://')
+    with app.app_context():
+        from app.external_apis import DisasterDataIntegrator, USGSEarthquakeAPI, NOAAWeatherAPI
+
+        seed_feed_reference_data()
+        if source == 'usgs':
+            return DisasterDataIntegrator.import_earthquakes(USGSEarthquakeAPI.parse_feed(FileResponse(feed_path)))
+        return DisasterDataIntegrator.import_alerts(NOAAWeatherAPI.parse_feed(FileResponse(feed_path)))
+
+
+def run_importer(source, feed_path, options):
+    """Serve one feed and import it; runs in a fresh process so its peak RSS is its own"""
+    from scripts.bench_common import (
+        create_bench_app, seed_feed_reference_data, peak_rss_mib, QueryCounter, timer
+    )
+    from scripts.feed_server import FeedServer
+
+    app = create_bench_app(options['database_url'])
+    with app.app_context():
+        from app import db
+        from app.external_apis import DisasterDataIntegrator
+
+        seed_feed_reference_data()
+        importer = {'usgs': DisasterDataIntegrator.import_earthquake_data,
+                    'noaa': DisasterDataIntegrator.import_weather_alerts}[source]
+        baseline_rss = peak_rss_mib()
+
+        polls = []
+        server = FeedServer({source: feed_path}, latency=options['latency'], error_rate=options['error_rate'],
+                            error_kind=options['error_kind'], seed=options['seed'])
+        with server, server.pointed_at():
+            for _ in range(options['polls']):
+                errors = server.stats['errors']
+                with QueryCounter(db.engine) as counter, timer() as elapsed:
+                    try:
+                        imported = importer()
+                    except Exception:
+                        imported = 0
+                polls.append({'imported': imported, 'ms': elapsed['ms'], 'statements': counter.count,
+                              'failed': server.stats['errors'] > errors})
+        db.drop_all()
+
+    return {'polls': polls, 'server': dict(server.stats),
+            'baseline_rss': baseline_rss, 'peak_rss': peak_rss_mib()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', type=int, default=10000)
+    parser.add_argument('--source', choices=('usgs', 'noaa', 'both'), default='both')
+    parser.add_argument('--synthetic', action='store_true', help='generate features instead of scaling the recordings')
+    parser.add_argument('--polls', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before each response')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-kind', choices=ERROR_KINDS, default='status')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default='sqlite://')
+    args = parser.parse_args(argv)
+
+    from app.external_apis import IMPORT_BATCH_SIZE
+
+    options = {'database_url': args.database_url, 'polls': args.polls, 'latency': args.latency,
+               'error_rate': args.error_rate, 'error_kind': args.error_kind, 'seed': args.seed}
+    statement_budget = FIXED_STATEMENTS + STATEMENTS_PER_BATCH * math.ceil(args.features / IMPORT_BATCH_SIZE)
+    sources = ('usgs', 'noaa') if args.source == 'both' else (args.source,)
+    over_budget = []
+    short = []
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for source in sources:
+            feed_path = os.path.join(scratch, f'{source}.geojson')
+            with open(feed_path, 'wb') as f:
+                if args.synthetic:
+                    write_synthetic_feed(f, source, args.features, seed=args.seed)
+                else:
+                    scale_feed(RECORDINGS[source], source, args.features, f)
+
+            # A spawned process starts without this one's heap
+            with multiprocessing.get_context('spawn').Pool(1) as pool:
+                expected = pool.apply(count_importable, (source, feed_path))
+            with multiprocessing.get_context('spawn').Pool(1) as pool:
+                report = pool.apply(run_importer, (source, feed_path, options))
+
+            print(f"{source}: {args.features} features ({expected} importable), "
+                  f"{os.path.getsize(feed_path) / 2 ** 20:.1f} MiB, "
+                  f"latency={args.latency * 1000:.0f} ms, error rate={args.error_rate} ({args.error_kind})")
+            completed = [poll for poll in report['polls'] if not poll['failed']]
+            if completed and completed[0]['imported'] < expected:
+                short.append(f"{source} imported {completed[0]['imported']} of {expected}")
+            for number, poll in enumerate(report['polls'], 1):
+                outcome = 'injected error' if poll['failed'] else f"imported={poll['imported']}"
+                print(f"  poll {number}  {outcome:<16} {poll['ms']:>9.0f} ms  "
+                      f"{poll['imported'] / poll['ms'] * 1000:>9.0f} features/s  "
+                      f"statements={poll['statements']:<5} ({poll['statements'] / args.features:.4f}/feature)")
+                if not poll['failed'] and poll['statements'] > statement_budget:
+                    over_budget.append(f"{source} poll {number}")
+            server = report['server']
+            print(f"  peak RSS {report['peak_rss']:.1f} MiB ({report['peak_rss'] - report['baseline_rss']:.1f} MiB "
+                  f"over the loaded app); server requests={server['requests']} "
+                  f"not modified={server['not_modified']} errors={server['errors']}")
+
+    if short:
+        print(f"\nThe first completed poll missed features: {', '.join(short)}")
+    if over_budget:
+        print(f"\nMore than {statement_budget} statements for {args.features} features: {', '.join(over_budget)}")
+    return 1 if short or over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Measure how long it takes to encode a listing of relief requests to a JSON
+response body.
+
+Three encoders are compared over the same rows:
+  baseline  string-converting row dicts + json.dumps, the previous path
+  stdlib    native row dicts + FastJSONProvider on the standard library
+  orjson    native row dicts + FastJSONProvider on orjson (when installed)
+
+A fourth measurement splices the rows in as a cached RawJSON fragment, the
+cost of a response whose body is already encoded.
+
+Usage:
+    python -m scripts.benchmark_json --rows 10000
+"""
+import argparse
+import json
+import sys
+
+from scripts.bench_common import (
+    create_bench_app, seed_reference_data, seed_relief_requests, time_call
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = create_bench_app(args.database_url)
+    with app.app_context():
+        from app import db
+        from app.json_provider import FastJSONProvider, RawJSON, orjson
+        from app.models import ReliefRequest
+        from app.rows import converter_for
+
+        refs = seed_reference_data()
+        seed_relief_requests(args.rows, refs)
+
+        def fetch(native):
+            converter = converter_for(ReliefRequest, native=native)
+            rows = db.session.execute(converter.select().order_by(ReliefRequest.id)).all()
+            return converter.convert_all(rows)
+
+        string_rows = fetch(native=False)
+        native_rows = fetch(native=True)
+
+        encoders = [('baseline', lambda: json.dumps({'requests': string_rows}).encode())]
+        backends = ['stdlib'] + (['orjson'] if orjson is not None else [])
+        for backend in backends:
+            app.config['JSON_BACKEND'] = backend
+            provider = FastJSONProvider(app)
+            encoders.append((backend, lambda p=provider: p.dumps_bytes({'requests': native_rows})))
+
+        expected = json.loads(encoders[0][1]())
+        baseline_ms = None
+        for label, encode in encoders:
+            ms, body = time_call(encode, args.repeat)
+            if json.loads(body) != expected:
+                print(f"{label}: encoded document differs from the baseline")
+                return 1
+            baseline_ms = baseline_ms or ms
+            print(f"{label:<10} {ms:>9.1f} ms  {len(native_rows) / ms * 1000:>10.0f} rows/s  "
+                  f"speedup={baseline_ms / ms:.1f}x")
+
+        if orjson is None:
+            print("orjson is not installed; only the standard library backend was measured")
+
+        provider = FastJSONProvider(app)
+        fragment = RawJSON(provider.dumps_bytes(native_rows))
+        ms, _ = time_call(lambda: provider.dumps_bytes({'requests': fragment}), args.repeat)
+        print(f"{'fragment':<10} {ms:>9.1f} ms  ({provider.backend}, rows pre-encoded)")
+
+        db.drop_all()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Seed a large relief_requests table and record the query plan and latency of
+every GET /api/requests filter/sort combination, built as the endpoint builds
+it for an admin (every region) and for a field agent (scoped to one region).
+
+Usage:
+    python -m scripts.benchmark_query_plans --rows 200000
+    python -m scripts.benchmark_query_plans --database-url postgresql://... --output plans.json
+
+Exits with status 1 when a common filter combination falls back to a full
+table scan.
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+
+from scripts.bench_common import (
+    create_bench_app, seed_reference_data, seed_relief_requests, time_call
+)
+
+from sqlalchemy import desc, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper that keeps the wrapped statement's bind parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = 'EXPLAIN QUERY PLAN ' if compiler.dialect.name == 'sqlite' else 'EXPLAIN '
+    return prefix + compiler.process(element.statement, **kw)
+
+
+SORTS = ['created_at', 'updated_at', 'severity', 'status']
+
+
+def filter_sets(refs):
+    """SearchSchema filter combinations, flagged as common or not"""
+    region = refs['regions'][0]
+    user = refs['users'][0]
+    today = date.today()
+    last_month = {'date_from': (today - timedelta(days=30)).isoformat(), 'date_to': today.isoformat()}
+    base = [
+        ({}, True),
+        ({'region_id': region}, True),
+        ({'status': 'pending'}, True),
+        ({'severity': 'critical'}, True),
+        ({'disaster_type_id': refs['disaster_types'][0]}, True),
+        ({'created_by': user}, True),
+        ({'assigned_to': user}, True),
+        (last_month, True),
+        ({'region_id': region, 'status': 'pending'}, True),
+        ({'region_id': region, 'severity': 'high'}, True),
+        (dict(last_month, region_id=region), True),
+        # Free-text search is an unanchored ILIKE; recorded but never index-backed
+        ({'query': 'flood'}, False),
+    ]
+    for filters, common in base:
+        for sort_by in SORTS:
+            # Sorting by enum columns is allowed but rare; don't gate on it
+            yield filters, sort_by, common and sort_by in ('created_at', 'updated_at')
+
+
+def viewers(refs):
+    """(name, user) pairs the listing is built for"""
+    from app import db
+    from app.models import User, UserRole
+
+    # scope_to_user only reads the role and region, so the admin need not be saved
+    return [('admin', User(role=UserRole.ADMIN)),
+            ('agent', db.session.get(User, refs['users'][0]))]
+
+
+def build_statement(filters, sort_by, user, per_page=20):
+    from app.models import ReliefRequest
+    from app.queries import apply_search_filters, scope_to_user
+    from app.validators import SearchSchema
+
+    validated_data = SearchSchema().load(dict(filters, sort_by=sort_by))
+    query = scope_to_user(select(ReliefRequest), user)
+    query = apply_search_filters(query, validated_data)
+    query = query.order_by(desc(getattr(ReliefRequest, sort_by)))
+    return query.limit(per_page)
+
+
+def is_full_scan(dialect, plan_lines, filters):
+    for line in plan_lines:
+        if dialect == 'sqlite':
+            if line.startswith('SCAN relief_requests'):
+                # An ordered index walk is fine when nothing is being filtered
+                if filters or 'USING' not in line:
+                    return True
+        elif 'Seq Scan on relief_requests' in line:
+            return True
+    return False
+
+
+def explain(statement):
+    from app import db
+
+    rows = db.session.execute(Explain(statement)).fetchall()
+    if db.engine.dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def run(rows, database_url, repeat):
+    from app import db
+
+    app = create_bench_app(database_url)
+    report = []
+    failures = []
+
+    with app.app_context():
+        print(f"Seeding {rows} relief requests...")
+        refs = seed_reference_data()
+        seed_relief_requests(rows, refs)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        dialect = db.engine.dialect.name
+
+        for (viewer, user), (filters, sort_by, common) in (
+                (v, f) for v in viewers(refs) for f in filter_sets(refs)):
+            statement = build_statement(filters, sort_by, user)
+            plan = explain(statement)
+            latency_ms, _ = time_call(lambda: db.session.execute(statement).fetchall(), repeat)
+            # A scoped viewer's query always filters on its region
+            full_scan = is_full_scan(dialect, plan, filters or viewer != 'admin')
+
+            entry = {
+                'viewer': viewer,
+                'filters': filters,
+                'sort_by': sort_by,
+                'common': common,
+                'latency_ms': round(latency_ms, 3),
+                'full_scan': full_scan,
+                'plan': plan,
+            }
+            report.append(entry)
+            if common and full_scan:
+                failures.append(entry)
+
+            marker = 'FULL SCAN' if full_scan else 'index'
+            print(f"{latency_ms:9.2f} ms  {marker:9}  {viewer:<5}  sort={sort_by:<10} {filters}")
+
+    return report, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the full report as JSON to this path')
+    args = parser.parse_args(argv)
+
+    report, failures = run(args.rows, args.database_url, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2, default=str)
+
+    if failures:
+        print(f"\n{len(failures)} common filter combination(s) fell back to a full scan:")
+        for entry in failures:
+            print(f"  {entry['viewer']} sort={entry['sort_by']} {entry['filters']}")
+            for line in entry['plan']:
+                print(f"      {line}")
+        return 1
+
+    print("\nAll common filter combinations are index-backed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Compare rows/sec of the ORM + to_dict() read path with the Core select +
+row converter path used by the list endpoints.
+
+Two shapes are measured: one listing page (--per-page rows, the
+GET /api/requests case) and a bulk read of every row (the export case).
+
+Usage:
+    python -m scripts.benchmark_serialization --rows 50000 --per-page 100
+"""
+import argparse
+import sys
+
+from scripts.bench_common import (
+    create_bench_app, seed_reference_data, seed_relief_requests, time_call
+)
+
+
+def _orm_read(limit):
+    from app import db
+    from app.models import ReliefRequest
+
+    query = ReliefRequest.query.order_by(ReliefRequest.created_at.desc())
+    if limit:
+        query = query.limit(limit)
+    result = [r.to_dict() for r in query.all()]
+    # Do not let the identity map carry instances between runs
+    db.session.expunge_all()
+    return result
+
+
+def _core_read(limit):
+    from app import db
+    from app.models import ReliefRequest
+    from app.rows import converter_for
+
+    converter = converter_for(ReliefRequest)
+    query = converter.select().order_by(ReliefRequest.created_at.desc())
+    if limit:
+        query = query.limit(limit)
+    return converter.convert_all(db.session.execute(query).all())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = create_bench_app(args.database_url)
+    with app.app_context():
+        from app import db
+
+        refs = seed_reference_data()
+        seed_relief_requests(args.rows, refs)
+
+        for label, limit, repeat in [(f'page of {args.per_page}', args.per_page, args.repeat * 20),
+                                     (f'bulk {args.rows}', None, args.repeat)]:
+            orm_ms, orm_rows = time_call(lambda: _orm_read(limit), repeat)
+            core_ms, core_rows = time_call(lambda: _core_read(limit), repeat)
+            if orm_rows != core_rows:
+                print(f"{label}: converter output differs from to_dict()")
+                return 1
+            count = len(core_rows)
+            print(f"{label:<16} orm={count / orm_ms * 1000:>10.0f} rows/s  "
+                  f"core={count / core_ms * 1000:>10.0f} rows/s  "
+                  f"speedup={orm_ms / core_ms:.1f}x")
+
+        db.drop_all()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+A local stand-in for the USGS and NOAA feed APIs
+
+FeedServer serves GeoJSON feed files - recorded responses, or recordings
+scaled up with renumbered copies - on the paths the real APIs use, so
+DisasterDataIntegrator can be run end to end without leaving the machine.
+Each feed is sent with an ETag and answered with a 304 when the client sends
+it back. Latency and errors can be injected per request:
+  latency     seconds to wait before answering
+  error_rate  fraction of feed requests that fail
+  error_kind  "status" answers 503; "disconnect" sends half the body and
+              drops the connection
+
+Usage:
+    # Record the live feeds
+    python -m scripts.feed_server record usgs usgs.geojson
+    python -m scripts.feed_server record noaa noaa.geojson
+
+    # Serve them, scaled to 10k features each, with 200 ms of latency
+    python -m scripts.feed_server serve --usgs usgs.geojson --noaa noaa.geojson --features 10000 --latency 0.2
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEED_PATHS = {
+    'usgs': '/fdsnws/event/1/query',
+    'noaa': '/alerts/active',
+}
+ERROR_KINDS = ('status', 'disconnect')
+CHUNK_SIZE = 64 * 1024
+
+
+def _feed_api(source):
+    from app.external_apis import USGSEarthquakeAPI, NOAAWeatherAPI
+    return {'usgs': USGSEarthquakeAPI, 'noaa': NOAAWeatherAPI}[source]
+
+
+def record_feed(source, path, min_magnitude=2.5, hours=24):
+    """Save the live feed of a source to path, as served"""
+    import requests
+
+    api = _feed_api(source)
+    if source == 'usgs':
+        url = api.BASE_URL
+        start_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        params = {'format': 'geojson', 'minmagnitude': min_magnitude,
+                  'starttime': start_time.isoformat(), 'orderby': 'time-asc'}
+    else:
+        url, params = f'{api.BASE_URL}/alerts/active', {}
+
+    with requests.get(url, params=params, headers=api.HEADERS, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+
+def scale_feed(recorded_path, source, count, f):
+    """
+    Write a feed of `count` features to the binary file f, cycling through the
+    features of a recording. Copies after the first get ids suffixed with the
+    copy number, so every feature is a distinct event.
+    """
+    with open(recorded_path, 'rb') as recorded:
+        features = json.load(recorded).get('features', [])
+    if not features:
+        raise ValueError(f"{recorded_path} has no features to scale")
+
+    f.write(b'{"type": "FeatureCollection", "features": [')
+    for i in range(count):
+        copy, feature = divmod(i, len(features))
+        feature = features[feature]
+        if copy:
+            feature = dict(feature)
+            if source == 'usgs':
+                feature['id'] = f"{feature['id']}-{copy}"
+            else:
+                feature['properties'] = dict(feature['properties'], id=f"{feature['properties']['id']}-{copy}")
+        if i:
+            f.write(b',')
+        f.write(json.dumps(feature).encode())
+    f.write(b']}')
+
+
+class FeedServer:
+    """Serves feed files on a local port from a background thread"""
+
+    def __init__(self, feeds, latency=0.0, error_rate=0.0, error_kind='status', seed=None,
+                 host='127.0.0.1', port=0):
+        if error_kind not in ERROR_KINDS:
+            raise ValueError(f"error_kind must be one of {', '.join(ERROR_KINDS)}")
+        self.feeds = dict(feeds)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0}
+        self.requests = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def root(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def base_url(self, source):
+        """The BASE_URL the source's API class should use to reach this server"""
+        # USGS requests the query URL itself; NOAA appends the path
+        return self.root + FEED_PATHS[source] if source == 'usgs' else self.root
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def pointed_at(self):
+        """Point the feed API classes at this server while active"""
+        apis = {source: _feed_api(source) for source in FEED_PATHS}
+        previous = {source: api.BASE_URL for source, api in apis.items()}
+        for source, api in apis.items():
+            api.BASE_URL = self.base_url(source)
+        try:
+            yield self
+        finally:
+            for source, api in apis.items():
+                api.BASE_URL = previous[source]
+
+    def _etag(self, path):
+        stat = os.stat(path)
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def _inject_error(self):
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                source = next((s for s, path in FEED_PATHS.items() if path == url.path), None)
+                with server._lock:
+                    server.stats['requests'] += 1
+                    server.requests.append((source, url.query))
+                if source is None or source not in server.feeds:
+                    self._send_json(404, {'title': 'Not Found'})
+                    return
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                path = server.feeds[source]
+                etag = server._etag(path)
+                if self.headers.get('If-None-Match') == etag:
+                    with server._lock:
+                        server.stats['not_modified'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                failing = server._inject_error()
+                if failing:
+                    with server._lock:
+                        server.stats['errors'] += 1
+                    if server.error_kind == 'status':
+                        self._send_json(503, {'title': 'Service Unavailable'})
+                        return
+
+                size = os.path.getsize(path)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/geo+json')
+                self.send_header('Content-Length', str(size))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                with open(path, 'rb') as f:
+                    if failing:
+                        self.wfile.write(f.read(size // 2))
+                        self.close_connection = True
+                        return
+                    shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+            def _send_json(self, status, document):
+                body = json.dumps(document).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='save a live feed to a file')
+    record.add_argument('source', choices=sorted(FEED_PATHS))
+    record.add_argument('path')
+    record.add_argument('--min-magnitude', type=float, default=2.5)
+    record.add_argument('--hours', type=int, default=24)
+
+    serve = commands.add_parser('serve', help='serve feed files until interrupted')
+    serve.add_argument('--usgs', help='recorded USGS feed')
+    serve.add_argument('--noaa', help='recorded NOAA feed')
+    serve.add_argument('--features', type=int, help='scale each recording to this many features')
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--error-kind', choices=ERROR_KINDS, default='status')
+    serve.add_argument('--port', type=int, default=8800)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record_feed(args.source, args.path, args.min_magnitude, args.hours)
+        print(f"Recorded the {args.source} feed to {args.path}")
+        return 0
+
+    recordings = {source: path for source, path in (('usgs', args.usgs), ('noaa', args.noaa)) if path}
+    if not recordings:
+        parser.error('serve needs --usgs and/or --noaa')
+
+    with tempfile.TemporaryDirectory() as scratch:
+        feeds = dict(recordings)
+        if args.features:
+            for source, path in recordings.items():
+                feeds[source] = os.path.join(scratch, f'{source}.geojson')
+                with open(feeds[source], 'wb') as f:
+                    scale_feed(path, source, args.features, f)
+
+        server = FeedServer(feeds, latency=args.latency, error_rate=args.error_rate,
+                            error_kind=args.error_kind, port=args.port)
+        with server:
+            for source in feeds:
+                print(f"{source}: {server.base_url(source)}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
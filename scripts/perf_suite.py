@@ -0,0 +1,58 @@
+"""
+Run every benchmark in this directory, each in its own process.
+
+The quick sizes keep a full run to a few minutes for local checks; --full
+uses each benchmark's own defaults. Extra arguments after -- are passed to
+every benchmark (e.g. a --database-url).
+
+Usage:
+    python -m scripts.perf_suite
+    python -m scripts.perf_suite --full --only ingest feed_parsing
+    python -m scripts.perf_suite -- --database-url postgresql://...
+
+Exits with status 1 if any benchmark reports a regression or fails.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmark name -> arguments of a quick run
+BENCHMARKS = {
+    'dashboard': ['--rows', '20000', '--regions', '5', '50'],
+    'query_plans': ['--rows', '20000'],
+    'serialization': ['--rows', '10000'],
+    'json': ['--rows', '5000'],
+    'feed_parsing': ['--features', '20000'],
+    'ingest': ['--features', '5000'],
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--full', action='store_true', help="use each benchmark's default sizes")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('extra', nargs=argparse.REMAINDER, help='arguments passed to every benchmark')
+    args = parser.parse_args(argv)
+    extra = args.extra[1:] if args.extra[:1] == ['--'] else args.extra
+
+    failed = []
+    for name in args.only or BENCHMARKS:
+        command = [sys.executable, '-m', f'scripts.benchmark_{name}']
+        command += ([] if args.full else BENCHMARKS[name]) + extra
+        print(f"== {name}: {' '.join(command[2:])}", flush=True)
+        if subprocess.run(command, cwd=ROOT).returncode != 0:
+            failed.append(name)
+        print(flush=True)
+
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        return 1
+    print(f"All {len(args.only or BENCHMARKS)} benchmarks passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
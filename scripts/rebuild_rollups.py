@@ -0,0 +1,20 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.rollups import rebuild_rollups
+
+
+def main():
+    config_name = os.environ.get('FLASK_ENV', 'development')
+    app = create_app(config_name)
+    
+    with app.app_context():
+        print("Rebuilding request rollups from relief_requests...")
+        groups = rebuild_rollups()
+        print(f"Rebuilt {groups} rollup groups")
+
+
+if __name__ == '__main__':
+    main()
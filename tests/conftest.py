@@ -1,6 +1,8 @@
 import pytest
 import os
 import tempfile
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import create_app, db
 from app.models import User, Region, DisasterType, UserRole
 
@@ -73,4 +75,26 @@ def agent_token(client):
         'username': 'testagent',
         'password': 'testpass'
     })
-    return response.json['access_token']
\ No newline at end of file
+    return response.json['access_token']
+
+
+@pytest.fixture
+def count_queries(client):
+    """Context manager factory collecting the SQL statements run inside it"""
+    with client.application.app_context():
+        engine = db.engine
+    
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    
+    return counter
@@ -0,0 +1,64 @@
+import json
+from app import db
+from app.models import Region, ReliefRequest, DisasterSeverity, RequestStatus
+
+
+def _add_requests(app, specs):
+    with app.app_context():
+        for region_id, status, severity in specs:
+            db.session.add(ReliefRequest(
+                title='Analytics request',
+                description='Request created for analytics tests',
+                location='Test Location',
+                severity=severity,
+                status=status,
+                disaster_type_id=1,
+                region_id=region_id,
+                created_by=1
+            ))
+        db.session.commit()
+
+
+def _add_regions(app, count, offset=0):
+    with app.app_context():
+        for i in range(offset, offset + count):
+            db.session.add(Region(name=f'Extra Region {i}', code=f'EX{i}'))
+        db.session.commit()
+
+
+class TestDashboardAnalytics:
+    
+    def test_dashboard_counts(self, client, admin_token):
+        _add_regions(client.application, 1)
+        _add_requests(client.application, [
+            (1, RequestStatus.PENDING, DisasterSeverity.HIGH),
+            (1, RequestStatus.PENDING, DisasterSeverity.LOW),
+            (1, RequestStatus.COMPLETED, DisasterSeverity.HIGH),
+            (2, RequestStatus.APPROVED, DisasterSeverity.CRITICAL),
+        ])
+        
+        response = client.get('/api/analytics/dashboard',
+                            headers={'Authorization': f'Bearer {admin_token}'})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['total_requests'] == 4
+        assert data['status_counts']['pending'] == 2
+        assert data['status_counts']['completed'] == 1
+        assert data['status_counts']['rejected'] == 0
+        assert data['severity_counts']['high'] == 2
+        assert data['severity_counts']['medium'] == 0
+        assert data['region_counts'] == {'Test Region': 3, 'Extra Region 0': 1}
+    
+    def test_dashboard_query_count_independent_of_regions(self, client, admin_token, count_queries):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        _add_requests(client.application, [(1, RequestStatus.PENDING, DisasterSeverity.HIGH)])
+        
+        _add_regions(client.application, 2)
+        with count_queries() as few_regions:
+            assert client.get('/api/analytics/dashboard', headers=headers).status_code == 200
+        
+        _add_regions(client.application, 20, offset=2)
+        with count_queries() as many_regions:
+            assert client.get('/api/analytics/dashboard', headers=headers).status_code == 200
+        
+        assert len(many_regions) == len(few_regions)
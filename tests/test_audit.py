@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from app.audit import AuditWriter
+from app.models import AuditLog
+
+
+def _entry(i):
+    return {
+        'user_id': 1,
+        'action': 'TEST',
+        'resource_type': 'AUDIT',
+        'resource_id': i,
+        'details': f'Entry {i}',
+        'timestamp': datetime.now(timezone.utc)
+    }
+
+
+class TestAuditWriter:
+    
+    def test_login_is_audited(self, client):
+        client.post('/api/auth/login', json={'username': 'testadmin', 'password': 'testpass'})
+        
+        with client.application.app_context():
+            log = AuditLog.query.filter_by(action='LOGIN').one()
+            assert log.user_id == 1
+    
+    def test_async_writer_batches_and_drains_on_shutdown(self, client, count_queries):
+        app = client.application
+        app.config.update(AUDIT_ASYNC=True, AUDIT_BATCH_SIZE=100, AUDIT_FLUSH_INTERVAL=5.0)
+        writer = AuditWriter()
+        writer.init_app(app)
+        
+        with count_queries() as statements:
+            writer.record_many([_entry(i) for i in range(250)])
+            writer.shutdown()
+        
+        inserts = [s for s in statements if s.startswith('INSERT INTO audit_logs')]
+        assert len(inserts) == 3
+        with app.app_context():
+            assert AuditLog.query.filter_by(action='TEST').count() == 250
+    
+    def test_async_writer_isolates_bad_entries(self, client):
+        app = client.application
+        app.config.update(AUDIT_ASYNC=True, AUDIT_FLUSH_INTERVAL=0.05)
+        writer = AuditWriter()
+        writer.init_app(app)
+        
+        bad_entry = dict(_entry(1), action=None)
+        writer.record_many([_entry(0), bad_entry, _entry(2)])
+        writer.flush()
+        writer.shutdown()
+        
+        with app.app_context():
+            assert AuditLog.query.filter_by(action='TEST').count() == 2
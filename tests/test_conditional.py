@@ -0,0 +1,105 @@
+import pytest
+import json
+from app import db
+from app.models import ReliefRequest
+
+
+class TestConditionalRequests:
+    
+    @pytest.fixture
+    def headers(self, admin_token):
+        return {'Authorization': f'Bearer {admin_token}'}
+    
+    @pytest.fixture
+    def request_id(self, client, headers):
+        response = client.post('/api/requests', headers=headers, json={
+            'title': 'Conditional Emergency',
+            'description': 'This is a test emergency for conditional requests',
+            'location': 'Test Location',
+            'severity': 'medium',
+            'disaster_type_id': 1,
+            'region_id': 1
+        })
+        return json.loads(response.data)['request']['id']
+    
+    def test_detail_etag_round_trip(self, client, headers, request_id, count_queries):
+        response = client.get(f'/api/requests/{request_id}', headers=headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert etag.startswith('W/')
+        assert response.headers['Last-Modified']
+        
+        with count_queries() as statements:
+            response = client.get(f'/api/requests/{request_id}',
+                                headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        # Only the key columns are read for a revalidation
+        assert not [s for s in statements if 'relief_requests.description' in s]
+    
+    def test_detail_etag_changes_on_update(self, client, headers, request_id):
+        etag = client.get(f'/api/requests/{request_id}', headers=headers).headers['ETag']
+        
+        response = client.put(f'/api/requests/{request_id}', headers=headers,
+                            json={'status': 'approved'})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        
+        response = client.get(f'/api/requests/{request_id}',
+                            headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert json.loads(response.data)['request']['status'] == 'approved'
+    
+    def test_detail_if_modified_since(self, client, headers, request_id):
+        last_modified = client.get(f'/api/requests/{request_id}', headers=headers).headers['Last-Modified']
+        
+        response = client.get(f'/api/requests/{request_id}',
+                            headers={**headers, 'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+        
+        response = client.get(f'/api/requests/{request_id}',
+                            headers={**headers, 'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+        assert response.status_code == 200
+    
+    def test_detail_revalidation_checks_access(self, client, headers, agent_token, request_id):
+        etag = client.get(f'/api/requests/{request_id}', headers=headers).headers['ETag']
+        
+        with client.application.app_context():
+            db.session.get(ReliefRequest, request_id).region_id = 99
+            db.session.commit()
+        
+        response = client.get(f'/api/requests/{request_id}',
+                            headers={'Authorization': f'Bearer {agent_token}', 'If-None-Match': etag})
+        assert response.status_code == 403
+    
+    def test_list_etag_tracks_changes(self, client, headers, request_id, count_queries):
+        response = client.get('/api/requests?status=pending', headers=headers)
+        etag = response.headers['ETag']
+        
+        with count_queries() as statements:
+            response = client.get('/api/requests?status=pending', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        # Revalidation reads only the page's keys: no full rows, no count
+        requests_statements = [s for s in statements if 'FROM relief_requests' in s]
+        assert len(requests_statements) == 1
+        assert 'relief_requests.description' not in requests_statements[0]
+        assert 'count(' not in requests_statements[0].lower()
+        
+        # A different filter set is a different representation
+        response = client.get('/api/requests?status=approved', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        
+        # The request leaving the filtered set changes the count
+        client.put(f'/api/requests/{request_id}', headers=headers, json={'status': 'approved'})
+        response = client.get('/api/requests?status=pending', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert json.loads(response.data)['pagination']['total'] == 0
+    
+    def test_list_etag_changes_on_delete(self, client, headers, request_id):
+        etag = client.get('/api/requests?cursor=', headers=headers).headers['ETag']
+        
+        assert client.delete(f'/api/requests/{request_id}', headers=headers).status_code == 200
+        
+        response = client.get('/api/requests?cursor=', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert json.loads(response.data)['requests'] == []
@@ -0,0 +1,330 @@
+import pytest
+import json
+import os
+import requests
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from app import db
+from app.models import Region, DisasterType, ReliefRequest, RequestRollup, ImportWatermark
+from app import external_apis
+from app.external_apis import DisasterDataIntegrator, USGSEarthquakeAPI, NOAAWeatherAPI
+from app.reference_data import get_reference_cache
+from scripts.feed_server import FeedServer
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+RECORDED_FEEDS = {
+    'usgs': os.path.join(FIXTURES, 'usgs_earthquakes.geojson'),
+    'noaa': os.path.join(FIXTURES, 'noaa_alerts.geojson'),
+}
+
+
+class RecordedResponse:
+    """Stands in for a requests.Response serving a recorded feed"""
+    
+    # Odd-sized chunks make the streaming parser resume mid-token
+    CHUNK_SIZE = 997
+    
+    def __init__(self, name, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b''
+        if name:
+            with open(os.path.join(FIXTURES, name), 'rb') as f:
+                self.content = f.read()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+    
+    def raise_for_status(self):
+        pass
+    
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), self.CHUNK_SIZE):
+            yield self.content[start:start + self.CHUNK_SIZE]
+    
+    def json(self):
+        return json.loads(self.content)
+
+
+def _quake(event_id, magnitude=5.2):
+    return {
+        'id': event_id,
+        'title': f'M {magnitude} - 10 km N of Test',
+        'magnitude': magnitude,
+        'location': '10 km N of Test',
+        'latitude': 9.93,
+        'longitude': -84.08,
+        'depth': 10.0,
+        'time': datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc),
+        'updated': datetime(2026, 10, 16, 12, 5, tzinfo=timezone.utc),
+        'url': f'https://earthquake.usgs.gov/earthquakes/eventpage/{event_id}',
+        'significance': 400
+    }
+
+
+def _alert(alert_id, event='Flood Warning', severity='Severe'):
+    return {
+        'id': alert_id,
+        'title': f'{event} issued for Test County',
+        'description': 'River flooding expected',
+        'event': event,
+        'severity': severity,
+        'urgency': 'Immediate',
+        'areas': 'Test County',
+        'coordinates': '35.0,-90.0',
+        'onset': None,
+        'expires': None,
+        'instruction': 'Move to higher ground',
+        'web_url': None
+    }
+
+
+class TestExternalImports:
+    
+    @pytest.fixture(autouse=True)
+    def fresh_validators(self):
+        NOAAWeatherAPI.reset_validators()
+        yield
+        NOAAWeatherAPI.reset_validators()
+    
+    @pytest.fixture
+    def feed_app(self, client):
+        app = client.application
+        with app.app_context():
+            db.session.add_all([
+                Region(name='Central Region', code='CR'),
+                DisasterType(name='Earthquake', code='EQ'),
+                DisasterType(name='Flood', code='FL'),
+                DisasterType(name='Tornado', code='TO'),
+                DisasterType(name='Hurricane', code='HU'),
+            ])
+            db.session.commit()
+        return app
+    
+    def test_earthquakes_dedupe_on_external_id(self, feed_app, monkeypatch):
+        feed = [_quake('us7000aaaa'), _quake('us7000bbbb', 6.1), _quake('us7000aaaa')]
+        monkeypatch.setattr(USGSEarthquakeAPI, 'stream_recent_earthquakes', classmethod(lambda cls, **kw: iter(feed)))
+        
+        with feed_app.app_context():
+            assert DisasterDataIntegrator.import_earthquake_data() == 2
+            assert DisasterDataIntegrator.import_earthquake_data() == 0
+            imported = ReliefRequest.query.filter_by(source='usgs').order_by(ReliefRequest.external_id).all()
+            assert [r.external_id for r in imported] == ['us7000aaaa', 'us7000bbbb']
+    
+    def test_import_logs_no_errors_and_updates_rollups(self, feed_app, monkeypatch, caplog):
+        feed = [_quake('us7000aaaa'), _quake('us7000bbbb', 6.1)]
+        monkeypatch.setattr(USGSEarthquakeAPI, 'stream_recent_earthquakes', classmethod(lambda cls, **kw: iter(feed)))
+        
+        with feed_app.app_context():
+            assert DisasterDataIntegrator.import_earthquake_data() == 2
+            assert db.session.scalar(select(func.sum(RequestRollup.request_count))) == 2
+        assert not [record for record in caplog.records if record.levelname == 'ERROR']
+    
+    def test_weather_alerts_dedupe_on_external_id(self, feed_app, monkeypatch):
+        feed = [_alert('urn:oid:1'), _alert('urn:oid:2', severity='Minor')]
+        monkeypatch.setattr(NOAAWeatherAPI, 'stream_active_alerts', classmethod(lambda cls, area=None: iter(feed)))
+        
+        with feed_app.app_context():
+            assert DisasterDataIntegrator.import_weather_alerts() == 1
+            feed.append(_alert('urn:oid:3', event='Flash Flood Warning'))
+            assert DisasterDataIntegrator.import_weather_alerts() == 1
+            assert {r.external_id for r in ReliefRequest.query.filter_by(source='noaa')} == {'urn:oid:1', 'urn:oid:3'}
+    
+    @pytest.fixture
+    def recorded_feeds(self, monkeypatch):
+        calls = []
+        
+        def get(session, url, params=None, **kwargs):
+            calls.append((url, params))
+            name = 'usgs_earthquakes.geojson' if 'earthquake' in url else 'noaa_alerts.geojson'
+            return RecordedResponse(name)
+        monkeypatch.setattr('requests.Session.get', get)
+        return calls
+    
+    def test_import_statement_count_is_independent_of_feed_size(self, feed_app, recorded_feeds, count_queries):
+        with feed_app.app_context():
+            # Create the system user and load reference data outside the count
+            DisasterDataIntegrator._get_system_user()
+            get_reference_cache().snapshot()
+            
+            with count_queries() as statements:
+                assert DisasterDataIntegrator.import_earthquake_data() == 40
+            # watermark (looked up again before the first write), system user,
+            # already-imported ids, INSERT, rollup upsert, watermark write
+            assert len(statements) <= 7
+            
+            with count_queries() as statements:
+                assert DisasterDataIntegrator.import_weather_alerts() == 36
+            assert len(statements) <= 4
+            
+            with count_queries() as statements:
+                assert DisasterDataIntegrator.import_earthquake_data() == 0
+                assert DisasterDataIntegrator.import_weather_alerts() == 0
+            assert not [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+            
+            assert ReliefRequest.query.count() == 76
+    
+    def test_feed_is_imported_in_batches(self, feed_app, recorded_feeds, monkeypatch):
+        monkeypatch.setattr(external_apis, 'IMPORT_BATCH_SIZE', 7)
+        with feed_app.app_context():
+            # The recorded feed repeats one event in a later batch than the first copy
+            assert DisasterDataIntegrator.import_earthquake_data() == 40
+            assert DisasterDataIntegrator.import_weather_alerts() == 36
+            assert ReliefRequest.query.count() == 76
+    
+    @pytest.mark.parametrize('api, name', [
+        (USGSEarthquakeAPI, 'usgs_earthquakes.geojson'),
+        (NOAAWeatherAPI, 'noaa_alerts.geojson'),
+    ])
+    def test_streamed_parse_matches_full_decode(self, api, name, monkeypatch):
+        pytest.importorskip('ijson')
+        streamed = list(api.parse_feed(RecordedResponse(name)))
+        monkeypatch.setattr(external_apis, 'ijson', None)
+        assert streamed == list(api.parse_feed(RecordedResponse(name)))
+    
+    def test_chunk_reader_returns_at_most_size_bytes(self):
+        reader = external_apis._ChunkReader(RecordedResponse('usgs_earthquakes.geojson'))
+        # A zero-byte probe must not consume the first chunk
+        assert reader.read(0) == b''
+        assert reader.read(5) == RecordedResponse('usgs_earthquakes.geojson').content[:5]
+        assert len(reader.read(10000)) == RecordedResponse.CHUNK_SIZE - 5
+    
+    def test_areas_are_fetched_separately_and_merged(self, recorded_feeds):
+        alerts = NOAAWeatherAPI.fetch_active_alerts('CA, TX,FL')
+        assert sorted(params['area'] for _, params in recorded_feeds) == ['CA', 'FL', 'TX']
+        # Every area serves the same recording, so each alert appears once
+        assert len(alerts) == 60
+    
+    def test_import_all_data(self, feed_app, recorded_feeds):
+        with feed_app.app_context():
+            results = DisasterDataIntegrator.import_all_data()
+        assert results == {'earthquakes': 40, 'weather_alerts': 36, 'errors': []}
+        assert len(recorded_feeds) == 2
+    
+    def test_import_all_data_reads_alerts_a_batch_ahead(self, feed_app, recorded_feeds, monkeypatch):
+        monkeypatch.setattr(external_apis, 'IMPORT_BATCH_SIZE', 5)
+        produced = []
+        stream_active_alerts = NOAAWeatherAPI.stream_active_alerts
+        
+        def counted(cls, area=None):
+            for alert in stream_active_alerts(area):
+                produced.append(alert['id'])
+                yield alert
+        monkeypatch.setattr(NOAAWeatherAPI, 'stream_active_alerts', classmethod(counted))
+        
+        ahead = []
+        import_earthquakes = DisasterDataIntegrator.import_earthquakes
+        
+        def slow_import(earthquakes, watermark_key=None):
+            # Give the alert thread time to run as far ahead as it may
+            time.sleep(0.2)
+            ahead.append(len(produced))
+            return import_earthquakes(earthquakes, watermark_key)
+        monkeypatch.setattr(DisasterDataIntegrator, 'import_earthquakes', slow_import)
+        
+        with feed_app.app_context():
+            results = DisasterDataIntegrator.import_all_data()
+        assert results == {'earthquakes': 40, 'weather_alerts': 36, 'errors': []}
+        # A full read-ahead buffer plus the alert waiting to enter it
+        assert 0 < ahead[0] <= 6
+        assert len(produced) == 60
+    
+    def test_earthquake_watermark_narrows_the_next_poll(self, feed_app, recorded_feeds):
+        with open(os.path.join(FIXTURES, 'usgs_earthquakes.geojson')) as f:
+            newest = max(feature['properties']['updated'] for feature in json.load(f)['features'])
+        newest = datetime.fromtimestamp(newest / 1000, tz=timezone.utc)
+        
+        with feed_app.app_context():
+            DisasterDataIntegrator.import_earthquake_data()
+            assert 'updatedafter' not in recorded_feeds[0][1]
+            mark = db.session.get(ImportWatermark, 'usgs:M4.0')
+            assert mark.watermark == newest.replace(tzinfo=None)
+            
+            DisasterDataIntegrator.import_earthquake_data()
+            params = recorded_feeds[1][1]
+            assert params['updatedafter'] == newest.isoformat()
+    
+    def test_late_reviewed_earthquake_is_imported(self, feed_app, monkeypatch):
+        now = datetime.now(timezone.utc)
+        
+        def feature(event_id, origin, updated):
+            return {'type': 'Feature', 'id': event_id,
+                    'properties': {'mag': 5.0, 'place': 'Test', 'title': f'M 5.0 - {event_id}',
+                                   'time': int(origin.timestamp() * 1000),
+                                   'updated': int(updated.timestamp() * 1000)},
+                    'geometry': {'type': 'Point', 'coordinates': [-84.08, 9.93, 10.0]}}
+        
+        features = [feature('us7000aaaa', now - timedelta(hours=2), now - timedelta(hours=1))]
+        
+        def get(session, url, params=None, **kwargs):
+            # Filter the way the USGS query endpoint does
+            start = datetime.fromisoformat(params['starttime'])
+            updated_after = datetime.fromisoformat(params.get('updatedafter', params['starttime']))
+            response = RecordedResponse(None)
+            response.content = json.dumps({'features': [
+                f for f in features
+                if f['properties']['time'] >= start.timestamp() * 1000
+                and f['properties']['updated'] > updated_after.timestamp() * 1000
+            ]}).encode()
+            return response
+        monkeypatch.setattr('requests.Session.get', get)
+        
+        with feed_app.app_context():
+            assert DisasterDataIntegrator.import_earthquake_data() == 1
+            # Happened 5h ago, reviewed and published only now
+            features.append(feature('us7000bbbb', now - timedelta(hours=5), now))
+            assert DisasterDataIntegrator.import_earthquake_data() == 1
+    
+    def test_unchanged_alert_feed_costs_no_queries(self, feed_app, monkeypatch, count_queries):
+        sent = []
+        
+        def get(session, url, params=None, headers=None, **kwargs):
+            sent.append(headers)
+            if headers and headers.get('If-None-Match') == '"v1"':
+                return RecordedResponse(None, status_code=304)
+            return RecordedResponse('noaa_alerts.geojson', headers={'ETag': '"v1"'})
+        monkeypatch.setattr('requests.Session.get', get)
+        
+        with feed_app.app_context():
+            assert DisasterDataIntegrator.import_weather_alerts() == 36
+            with count_queries() as statements:
+                assert DisasterDataIntegrator.import_weather_alerts() == 0
+            assert statements == []
+        assert sent == [None, {'If-None-Match': '"v1"'}]
+    
+    def test_import_over_http_from_stand_in_server(self, feed_app):
+        with FeedServer(RECORDED_FEEDS) as server, server.pointed_at():
+            with feed_app.app_context():
+                assert DisasterDataIntegrator.import_all_data() == {
+                    'earthquakes': 40, 'weather_alerts': 36, 'errors': []}
+                assert DisasterDataIntegrator.import_all_data() == {
+                    'earthquakes': 0, 'weather_alerts': 0, 'errors': []}
+        assert server.stats == {'requests': 4, 'not_modified': 1, 'errors': 0}
+        usgs_queries = [query for source, query in server.requests if source == 'usgs']
+        assert 'updatedafter=' not in usgs_queries[0] and 'updatedafter=' in usgs_queries[1]
+    
+    @pytest.mark.parametrize('error_kind', ['status', 'disconnect'])
+    def test_failed_feed_imports_nothing(self, feed_app, monkeypatch, error_kind):
+        monkeypatch.setattr(external_apis, 'IMPORT_BATCH_SIZE', 7)
+        with FeedServer(RECORDED_FEEDS, error_rate=1.0, error_kind=error_kind) as server, server.pointed_at():
+            with feed_app.app_context():
+                with pytest.raises(requests.RequestException):
+                    DisasterDataIntegrator.import_earthquake_data()
+                with pytest.raises(requests.RequestException):
+                    DisasterDataIntegrator.import_weather_alerts()
+                assert ReliefRequest.query.count() == 0
+                assert db.session.get(ImportWatermark, 'usgs:M4.0') is None
+        assert server.stats['errors'] == 2
+    
+    def test_import_all_data_reports_failed_sources(self, feed_app):
+        with FeedServer(RECORDED_FEEDS, error_rate=1.0) as server, server.pointed_at():
+            with feed_app.app_context():
+                results = DisasterDataIntegrator.import_all_data()
+        assert results['earthquakes'] == 0 and results['weather_alerts'] == 0
+        assert [error.split(':')[0] for error in results['errors']] == [
+            'Earthquake import failed', 'Weather alerts import failed']
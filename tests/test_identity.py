@@ -0,0 +1,110 @@
+import pytest
+import json
+from app import db
+from app.models import User, UserRole
+
+
+def _user_selects(statements):
+    return [s for s in statements if s.startswith('SELECT') and 'FROM users' in s]
+
+
+class TestRequestIdentity:
+    
+    @pytest.fixture
+    def request_id(self, client, admin_token):
+        response = client.post('/api/requests',
+                             headers={'Authorization': f'Bearer {admin_token}'},
+                             json={
+                                 'title': 'Identity Emergency',
+                                 'description': 'This is a test emergency for identity caching',
+                                 'location': 'Test Location',
+                                 'severity': 'low',
+                                 'disaster_type_id': 1,
+                                 'region_id': 1
+                             })
+        return json.loads(response.data)['request']['id']
+    
+    @pytest.mark.parametrize('method, path, body, expected_statements', [
+        ('get', '/api/requests/{id}', None, 2),
+        ('put', '/api/requests/{id}', {'status': 'approved'}, 6),
+        # user, page keys (enough to answer a revalidation), page rows, count
+        ('get', '/api/requests', None, 4),
+        ('get', '/api/auth/profile', None, 1),
+        ('get', '/api/analytics/dashboard', None, 3),
+    ])
+    def test_statement_count_per_endpoint(self, client, admin_token, count_queries, request_id,
+                                          method, path, body, expected_statements):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        
+        with count_queries() as statements:
+            response = getattr(client, method)(path.format(id=request_id), headers=headers, json=body)
+        
+        assert response.status_code == 200
+        assert len(_user_selects(statements)) == 1
+        assert len(statements) == expected_statements
+    
+    def test_revoked_token_is_rejected(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        assert client.delete('/api/auth/logout', headers=headers).status_code == 200
+        
+        response = client.get('/api/auth/profile', headers=headers)
+        assert response.status_code == 401
+        assert json.loads(response.data)['message'] == 'Token has been revoked'
+
+
+class TestStatelessAuthorization:
+    
+    @pytest.fixture
+    def stateless_client(self, client):
+        client.application.config['JWT_STATELESS_AUTHZ'] = True
+        return client
+    
+    def _create_request(self, client, token):
+        response = client.post('/api/requests',
+                             headers={'Authorization': f'Bearer {token}'},
+                             json={
+                                 'title': 'Stateless Emergency',
+                                 'description': 'This is a test emergency for stateless authz',
+                                 'location': 'Test Location',
+                                 'severity': 'low',
+                                 'disaster_type_id': 1,
+                                 'region_id': 1
+                             })
+        return json.loads(response.data)['request']['id']
+    
+    def test_reads_need_no_user_queries(self, stateless_client, agent_token, count_queries):
+        request_id = self._create_request(stateless_client, agent_token)
+        headers = {'Authorization': f'Bearer {agent_token}'}
+        
+        with count_queries() as statements:
+            response = stateless_client.get(f'/api/requests/{request_id}', headers=headers)
+        
+        assert response.status_code == 200
+        assert _user_selects(statements) == []
+        assert len(statements) == 1
+    
+    def test_deactivation_invalidates_claims(self, stateless_client, agent_token):
+        request_id = self._create_request(stateless_client, agent_token)
+        headers = {'Authorization': f'Bearer {agent_token}'}
+        
+        with stateless_client.application.app_context():
+            agent = User.query.filter_by(username='testagent').one()
+            agent.is_active = False
+            db.session.commit()
+        
+        response = stateless_client.put(f'/api/requests/{request_id}', headers=headers,
+                                      json={'title': 'Updated by inactive user'})
+        assert response.status_code == 404
+    
+    def test_role_change_takes_effect_without_new_token(self, stateless_client, agent_token):
+        request_id = self._create_request(stateless_client, agent_token)
+        headers = {'Authorization': f'Bearer {agent_token}'}
+        
+        with stateless_client.application.app_context():
+            agent = User.query.filter_by(username='testagent').one()
+            agent.role = UserRole.VIEWER
+            db.session.commit()
+        
+        response = stateless_client.put(f'/api/requests/{request_id}', headers=headers,
+                                      json={'title': 'Updated by a viewer'})
+        assert response.status_code == 403
@@ -0,0 +1,55 @@
+import pytest
+import json
+import decimal
+from datetime import datetime
+from app.json_provider import FastJSONProvider, RawJSON, orjson
+from app.models import DisasterSeverity
+
+BACKENDS = ['stdlib', pytest.param('orjson', marks=pytest.mark.skipif(
+    orjson is None, reason='orjson is not installed'))]
+
+
+class TestJSONProvider:
+    
+    @pytest.fixture(params=BACKENDS)
+    def provider(self, request, client):
+        app = client.application
+        app.config['JSON_BACKEND'] = request.param
+        return FastJSONProvider(app)
+    
+    def test_native_types(self, provider):
+        data = {
+            'created_at': datetime(2026, 10, 16, 12, 30, 5, 120000),
+            'severity': DisasterSeverity.HIGH,
+            'damage': decimal.Decimal('12.50'),
+            'counts': {2: 1, 1: 3},
+            'name': 'Región',
+        }
+        assert json.loads(provider.dumps_bytes(data)) == {
+            'created_at': '2026-10-16T12:30:05.120000',
+            'severity': 'high',
+            'damage': '12.50',
+            'counts': {'1': 3, '2': 1},
+            'name': 'Región',
+        }
+    
+    @pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+    def test_backends_agree(self, client):
+        app = client.application
+        data = {'b': [1, 2.5, None, True], 'a': {'nested': 'value', 'when': datetime(2026, 1, 1)},
+                'fragment': RawJSON('{"x":1}')}
+        outputs = []
+        for backend in ('stdlib', 'orjson'):
+            app.config['JSON_BACKEND'] = backend
+            outputs.append(FastJSONProvider(app).dumps_bytes(data))
+        assert outputs[0] == outputs[1]
+    
+    def test_raw_fragments_are_spliced(self, provider):
+        fragment = RawJSON(b'[{"id":1,"code":"TEST"}]')
+        body = provider.dumps_bytes({'regions': fragment, 'count': 1, 'label': 'raw'})
+        assert json.loads(body) == {'regions': [{'id': 1, 'code': 'TEST'}], 'count': 1, 'label': 'raw'}
+    
+    def test_unknown_backend_is_rejected(self, client):
+        client.application.config['JSON_BACKEND'] = 'simplejson'
+        with pytest.raises(ValueError):
+            FastJSONProvider(client.application)
@@ -0,0 +1,93 @@
+import json
+from app import db
+from app.models import Region, DisasterType
+from app.reference_data import ReferenceDataCache, bump_version, current_version
+
+
+class TestReferenceData:
+    
+    def test_regions_etag_and_not_modified(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        
+        response = client.get('/api/regions', headers=headers)
+        assert response.status_code == 200
+        assert [r['code'] for r in json.loads(response.data)['regions']] == ['TEST']
+        etag = response.headers['ETag']
+        assert etag.startswith('W/')
+        
+        response = client.get('/api/regions', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_create_region_invalidates_cache(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        etag = client.get('/api/regions', headers=headers).headers['ETag']
+        
+        response = client.post('/api/regions', headers=headers,
+                             json={'name': 'North Region', 'code': 'NR'})
+        assert response.status_code == 201
+        
+        response = client.get('/api/regions', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert {r['code'] for r in json.loads(response.data)['regions']} == {'TEST', 'NR'}
+    
+    def test_create_disaster_type_invalidates_cache(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        client.get('/api/disaster-types', headers=headers)
+        
+        response = client.post('/api/disaster-types', headers=headers,
+                             json={'name': 'Flood', 'code': 'FL'})
+        assert response.status_code == 201
+        
+        response = client.get('/api/disaster-types', headers=headers)
+        assert {dt['code'] for dt in json.loads(response.data)['disaster_types']} == {'TEST', 'FL'}
+    
+    def test_create_request_uses_cached_lookups(self, client, admin_token, count_queries):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        client.get('/api/regions', headers=headers)
+        
+        with count_queries() as statements:
+            response = client.post('/api/requests', headers=headers, json={
+                'title': 'Cached Lookup Emergency',
+                'description': 'Request created without reference data queries',
+                'location': 'Test Location',
+                'severity': 'low',
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+        
+        assert response.status_code == 201
+        assert not [s for s in statements if 'FROM regions' in s or 'FROM disaster_types' in s]
+    
+    def test_deactivated_disaster_type_is_rejected(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        client.get('/api/disaster-types', headers=headers)
+        
+        with client.application.app_context():
+            db.session.get(DisasterType, 1).is_active = False
+            db.session.commit()
+        
+        response = client.post('/api/requests', headers=headers, json={
+            'title': 'Inactive Type Emergency',
+            'description': 'Request against a deactivated disaster type',
+            'location': 'Test Location',
+            'severity': 'low',
+            'disaster_type_id': 1,
+            'region_id': 1
+        })
+        assert response.status_code == 400
+    
+    def test_other_workers_notice_version_change(self, client):
+        with client.application.app_context():
+            cache = ReferenceDataCache(check_interval=0)
+            assert cache.region_by_code('TEST').name == 'Test Region'
+            version = cache.snapshot().version
+            
+            # Another worker renames the region; only the shared version moves here
+            with db.engine.begin() as connection:
+                connection.execute(Region.__table__.update().values(name='Renamed Region'))
+                bump_version(connection)
+            
+            assert current_version() == version + 1
+            assert cache.region_by_code('TEST').name == 'Renamed Region'
@@ -131,4 +131,311 @@ class TestReliefRequests:
     
     def test_unauthorized_access(self, client):
         response = client.get('/api/requests')
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+    
+    def test_get_relief_requests_cursor_pagination(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        for i in range(3):
+            client.post('/api/requests', headers=headers, json={
+                'title': f'Cursor Emergency {i}',
+                'description': 'This is a test emergency for cursor paging',
+                'location': 'Test Location',
+                'severity': 'medium',
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+        
+        response = client.get('/api/requests?cursor=&per_page=2&include_total=true',
+                            headers=headers)
+        assert response.status_code == 200
+        first_page = json.loads(response.data)
+        assert len(first_page['requests']) == 2
+        assert first_page['pagination']['has_next'] is True
+        assert first_page['pagination']['total'] == 3
+        
+        cursor = first_page['pagination']['next_cursor']
+        response = client.get(f'/api/requests?cursor={cursor}&per_page=2', headers=headers)
+        assert response.status_code == 200
+        second_page = json.loads(response.data)
+        assert len(second_page['requests']) == 1
+        assert second_page['pagination']['has_next'] is False
+        assert 'total' not in second_page['pagination']
+        
+        seen = [r['id'] for r in first_page['requests'] + second_page['requests']]
+        assert sorted(seen, reverse=True) == seen
+        assert len(set(seen)) == 3
+    
+    def test_get_relief_requests_invalid_cursor(self, client, admin_token):
+        response = client.get('/api/requests?cursor=not-a-cursor',
+                            headers={'Authorization': f'Bearer {admin_token}'})
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert 'cursor' in data['errors']
+    
+    def test_get_relief_requests_sparse_fieldset(self, client, admin_token, count_queries):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        for i in range(3):
+            client.post('/api/requests', headers=headers, json={
+                'title': f'Map Emergency {i}',
+                'description': 'This is a test emergency for the map view',
+                'location': 'Test Location',
+                'coordinates': '9.93,-84.08',
+                'severity': 'high',
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+        
+        with count_queries() as statements:
+            response = client.get('/api/requests?fields=id,coordinates,severity,status&cursor=&per_page=2',
+                                headers=headers)
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [set(r) for r in data['requests']] == [{'id', 'coordinates', 'severity', 'status'}] * 2
+        assert data['requests'][0]['severity'] == 'high'
+        assert data['pagination']['next_cursor']
+        # The wide text columns are never selected
+        assert not [s for s in statements if 'relief_requests.description' in s]
+        
+        cursor = data['pagination']['next_cursor']
+        response = client.get(f'/api/requests?fields=id,status&cursor={cursor}&per_page=2', headers=headers)
+        assert len(json.loads(response.data)['requests']) == 1
+    
+    def test_get_relief_request_sparse_fieldset(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        create_response = client.post('/api/requests', headers=headers, json={
+            'title': 'Detail Fieldset Emergency',
+            'description': 'This is a test emergency for detail fieldsets',
+            'location': 'Test Location',
+            'severity': 'low',
+            'disaster_type_id': 1,
+            'region_id': 1
+        })
+        request_id = json.loads(create_response.data)['request']['id']
+        
+        response = client.get(f'/api/requests/{request_id}?fields=title,created_at', headers=headers)
+        assert response.status_code == 200
+        assert set(json.loads(response.data)['request']) == {'title', 'created_at'}
+        
+        full_etag = client.get(f'/api/requests/{request_id}', headers=headers).headers['ETag']
+        assert response.headers['ETag'] != full_etag
+    
+    def test_get_relief_requests_unknown_field(self, client, admin_token):
+        response = client.get('/api/requests?fields=id,password_hash',
+                            headers={'Authorization': f'Bearer {admin_token}'})
+        assert response.status_code == 400
+        assert 'fields' in json.loads(response.data)['errors']
+    
+    def test_export_relief_requests(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        for severity in ('high', 'low', 'high'):
+            client.post('/api/requests', headers=headers, json={
+                'title': f'Export Emergency {severity}',
+                'description': 'This is a test emergency for exports',
+                'location': 'Test Location',
+                'severity': severity,
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+        
+        response = client.get('/api/requests/export?severity=high&sort_order=asc', headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.data.splitlines()]
+        assert [r['severity'] for r in rows] == ['high', 'high']
+        assert rows[0]['id'] < rows[1]['id']
+        assert rows[0]['created_at'] == client.get(
+            f"/api/requests/{rows[0]['id']}", headers=headers).json['request']['created_at']
+        
+        response = client.get('/api/requests/export?format=csv&fields=id,severity,status', headers=headers)
+        assert response.mimetype == 'text/csv'
+        lines = response.data.decode().splitlines()
+        assert lines[0] == 'id,severity,status'
+        assert len(lines) == 4
+        assert lines[1].endswith(',pending')
+    
+    def test_export_relief_requests_requires_coordinator(self, client, agent_token):
+        response = client.get('/api/requests/export',
+                            headers={'Authorization': f'Bearer {agent_token}'})
+        assert response.status_code == 403
+    
+    def test_bulk_create_relief_requests(self, client, agent_token, admin_token):
+        headers = {'Authorization': f'Bearer {agent_token}'}
+        item = {
+            'description': 'This is a queued offline report from the field',
+            'location': 'Test Location',
+            'severity': 'critical',
+            'disaster_type_id': 1,
+            'region_id': 1
+        }
+        payload = {'requests': [
+            dict(item, title='Bulk Emergency One', idempotency_key='device-1'),
+            dict(item, title='Bad'),
+            dict(item, title='Bulk Emergency Two', idempotency_key='device-2', region_id=99),
+            dict(item, title='Bulk Emergency Three', idempotency_key='device-3'),
+        ]}
+        
+        response = client.post('/api/requests/bulk', headers=headers, json=payload)
+        assert response.status_code == 207
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == ['created', 'invalid', 'invalid', 'created']
+        assert 'title' in data['results'][1]['errors']
+        assert data['created'] == 2
+        created_id = data['results'][0]['id']
+        
+        request_data = client.get(f'/api/requests/{created_id}', headers=headers).json['request']
+        assert request_data['title'] == 'Bulk Emergency One'
+        assert request_data['status'] == 'pending'
+        
+        # A retry of the whole upload creates nothing new
+        response = client.post('/api/requests/bulk', headers=headers, json=payload)
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == ['existing', 'invalid', 'invalid', 'existing']
+        assert data['results'][0]['id'] == created_id
+        
+        dashboard = client.get('/api/analytics/dashboard', headers={'Authorization': f'Bearer {admin_token}'})
+        assert dashboard.json['severity_counts']['critical'] == 2
+    
+    def test_bulk_create_rejects_oversized_upload(self, client, agent_token):
+        response = client.post('/api/requests/bulk', headers={'Authorization': f'Bearer {agent_token}'},
+                               json={'requests': [{}] * 101})
+        assert response.status_code == 400
+    
+    def test_bulk_update_relief_requests(self, client, admin_token, agent_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        ids = []
+        for severity in ('low', 'low', 'high'):
+            response = client.post('/api/requests', headers=headers, json={
+                'title': f'Triage Emergency {severity}',
+                'description': 'This is an imported alert waiting for triage',
+                'location': 'Test Location',
+                'severity': severity,
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+            ids.append(json.loads(response.data)['request']['id'])
+        
+        response = client.patch('/api/requests/bulk', headers=headers,
+                                json={'filter': {'severity': 'low'}, 'status': 'rejected'})
+        assert response.status_code == 200
+        assert sorted(json.loads(response.data)['ids']) == ids[:2]
+        
+        rejected = client.get(f'/api/requests/{ids[0]}', headers=headers).json['request']
+        assert rejected['status'] == 'rejected'
+        assert rejected['resolved_at'] is not None
+        assert client.get(f'/api/requests/{ids[2]}', headers=headers).json['request']['status'] == 'pending'
+        
+        # Rows already in the target state are not touched again
+        response = client.patch('/api/requests/bulk', headers=headers,
+                                json={'ids': ids, 'status': 'rejected'})
+        assert json.loads(response.data)['ids'] == [ids[2]]
+        
+        dashboard = client.get('/api/analytics/dashboard', headers=headers).json
+        assert dashboard['status_counts']['rejected'] == 3
+        assert dashboard['status_counts']['pending'] == 0
+        
+        response = client.patch('/api/requests/bulk', headers={'Authorization': f'Bearer {agent_token}'},
+                                json={'ids': ids, 'status': 'approved'})
+        assert response.status_code == 403
+    
+    def test_bulk_update_by_filter_does_not_list_ids(self, client, admin_token, count_queries):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        for i in range(3):
+            client.post('/api/requests', headers=headers, json={
+                'title': f'Flooded Road {i}',
+                'description': 'This is an imported alert waiting for triage',
+                'location': 'Test Location',
+                'severity': 'medium',
+                'disaster_type_id': 1,
+                'region_id': 1
+            })
+
+        with count_queries() as statements:
+            response = client.patch('/api/requests/bulk', headers=headers,
+                                    json={'filter': {'severity': 'medium'}, 'status': 'approved'})
+        assert response.json['updated'] == 3
+        updates = [s for s in statements if s.lstrip().upper().startswith('UPDATE RELIEF_REQUESTS')]
+        assert len(updates) == 1
+        assert ' IN (' not in updates[0]
+
+        dashboard = client.get('/api/analytics/dashboard', headers=headers).json
+        assert dashboard['status_counts']['approved'] == 3
+        assert dashboard['status_counts']['pending'] == 0
+
+    @pytest.mark.parametrize('search', [{}, {'query': '', 'sort_by': 'updated_at'}])
+    def test_bulk_update_rejects_a_filter_without_criteria(self, client, admin_token, search):
+        response = client.patch('/api/requests/bulk', headers={'Authorization': f'Bearer {admin_token}'},
+                                json={'filter': search, 'status': 'approved'})
+        assert response.status_code == 400
+        assert 'filter' in response.json['errors']
+    
+    def test_bulk_update_requires_one_target(self, client, admin_token):
+        response = client.patch('/api/requests/bulk', headers={'Authorization': f'Bearer {admin_token}'},
+                                json={'status': 'approved'})
+        assert response.status_code == 400
+    
+    def test_batch_get_relief_requests(self, client, admin_token, agent_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        region_id = client.post('/api/regions', headers=headers,
+                                json={'name': 'Other Region', 'code': 'OTHER'}).json['region']['id']
+        ids = []
+        for region in (1, region_id):
+            response = client.post('/api/requests', headers=headers, json={
+                'title': f'Batch Emergency {region}',
+                'description': 'This is a test emergency for batch reads',
+                'location': 'Test Location',
+                'severity': 'medium',
+                'disaster_type_id': 1,
+                'region_id': region
+            })
+            ids.append(json.loads(response.data)['request']['id'])
+        
+        response = client.post('/api/requests/batch-get', headers={'Authorization': f'Bearer {agent_token}'},
+                               json={'ids': [9999] + ids, 'fields': 'title,status'})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['requests'] == [{'title': 'Batch Emergency 1', 'status': 'pending'}]
+        assert data['missing'] == [9999]
+        assert data['forbidden'] == [ids[1]]
+        
+        response = client.post('/api/requests/batch-get', headers=headers, json={'ids': ids[::-1]})
+        assert [r['id'] for r in json.loads(response.data)['requests']] == ids[::-1]
+    
+    def test_batch_endpoint(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        response = client.post('/api/batch', headers=headers, json={'requests': [
+            {'id': 'profile', 'path': '/api/auth/profile'},
+            {'id': 'regions', 'path': '/api/regions'},
+            {'id': 'create', 'method': 'POST', 'path': '/api/requests', 'body': {
+                'title': 'Batched Emergency',
+                'description': 'This is a test emergency sent through /api/batch',
+                'location': 'Test Location',
+                'severity': 'high',
+                'disaster_type_id': 1,
+                'region_id': 1
+            }},
+            {'id': 'list', 'path': '/api/requests?fields=title'},
+            {'id': 'missing', 'path': '/api/requests/9999'},
+        ]})
+        assert response.status_code == 200
+        responses = json.loads(response.data)['responses']
+        assert [r['id'] for r in responses] == ['profile', 'regions', 'create', 'list', 'missing']
+        assert [r['status'] for r in responses] == [200, 200, 201, 200, 404]
+        assert responses[0]['body']['user']['username'] == 'testadmin'
+        # The read after the write sees it
+        assert responses[3]['body']['requests'] == [{'title': 'Batched Emergency'}]
+        assert 'ETag' in responses[3]['headers']
+    
+    def test_batch_endpoint_rejects_nesting(self, client, admin_token):
+        response = client.post('/api/batch', headers={'Authorization': f'Bearer {admin_token}'},
+                               json={'requests': [{'path': '/api/batch'}]})
+        assert response.status_code == 400
+    
+    @pytest.mark.parametrize('path', ['/api/%62atch', '/api//batch'])
+    def test_batch_endpoint_rejects_disguised_nesting(self, client, admin_token, path):
+        response = client.post('/api/batch', headers={'Authorization': f'Bearer {admin_token}'},
+                               json={'requests': [{'method': 'POST', 'path': path,
+                                                   'body': {'requests': [{'path': '/api/regions'}]}}]})
+        assert response.status_code == 200
+        nested = response.json['responses'][0]
+        assert nested['status'] == 400
+        assert 'responses' not in nested['body']
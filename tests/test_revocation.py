@@ -0,0 +1,49 @@
+import pytest
+import time
+from app.revocation import BloomFilter, MemoryRevocationStore, RedisRevocationStore
+
+
+class TestRevocationStores:
+    
+    def test_bloom_filter_membership(self):
+        bloom = BloomFilter(1 << 12, 3)
+        bloom.add('revoked-jti')
+        assert 'revoked-jti' in bloom
+        assert sum('other-%d' % i in bloom for i in range(200)) < 5
+    
+    def test_memory_store_forgets_expired_tokens(self):
+        store = MemoryRevocationStore()
+        now = time.time()
+        store.revoke('expired', now - 1)
+        store.revoke('live', now + 60)
+        
+        assert not store.is_revoked('expired')
+        assert store.is_revoked('live')
+        assert len(store) == 1
+    
+    def test_redis_store_is_shared_between_workers(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        server = fakeredis.FakeServer()
+        worker_a = RedisRevocationStore(fakeredis.FakeRedis(server=server), refresh_interval=0)
+        worker_b = RedisRevocationStore(fakeredis.FakeRedis(server=server), refresh_interval=0)
+        expires_at = time.time() + 600
+        
+        worker_a.revoke('shared-jti', expires_at)
+        
+        assert worker_b.is_revoked('shared-jti', expires_at)
+        ttl = worker_b.client.ttl('cdrp:revoked:jti:shared-jti')
+        assert 0 < ttl <= 601
+    
+    def test_redis_store_answers_not_revoked_locally(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        client = fakeredis.FakeRedis()
+        store = RedisRevocationStore(client, refresh_interval=60)
+        expires_at = time.time() + 600
+        store.revoke('some-jti', expires_at)
+        store.is_revoked('some-jti', expires_at)  # loads the local bloom copy
+        
+        def fail(*args, **kwargs):
+            raise AssertionError('unexpected Redis round trip')
+        client.get = client.exists = fail
+        
+        assert not store.is_revoked('fresh-jti', expires_at)
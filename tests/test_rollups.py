@@ -0,0 +1,66 @@
+import json
+from app import db
+from app.models import RequestRollup, RequestStatus, DisasterSeverity
+from app.rollups import rebuild_rollups
+
+
+def _rollup_rows(app):
+    with app.app_context():
+        return {
+            (r.region_id, r.status, r.severity): (r.request_count, r.affected_population)
+            for r in RequestRollup.query.all() if r.request_count
+        }
+
+
+def _create_request(client, headers, **overrides):
+    payload = {
+        'title': 'Rollup Emergency',
+        'description': 'This is a test emergency for rollups',
+        'location': 'Test Location',
+        'severity': 'high',
+        'disaster_type_id': 1,
+        'region_id': 1,
+        'affected_population': 40
+    }
+    payload.update(overrides)
+    response = client.post('/api/requests', headers=headers, json=payload)
+    return json.loads(response.data)['request']['id']
+
+
+class TestRequestRollups:
+    
+    def test_rollups_follow_create_update_delete(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        app = client.application
+        
+        first_id = _create_request(client, headers)
+        _create_request(client, headers, affected_population=10)
+        assert _rollup_rows(app) == {
+            (1, RequestStatus.PENDING, DisasterSeverity.HIGH): (2, 50)
+        }
+        
+        client.put(f'/api/requests/{first_id}', headers=headers,
+                   json={'status': 'approved', 'severity': 'critical'})
+        assert _rollup_rows(app) == {
+            (1, RequestStatus.PENDING, DisasterSeverity.HIGH): (1, 10),
+            (1, RequestStatus.APPROVED, DisasterSeverity.CRITICAL): (1, 40)
+        }
+        
+        client.delete(f'/api/requests/{first_id}', headers=headers)
+        assert _rollup_rows(app) == {
+            (1, RequestStatus.PENDING, DisasterSeverity.HIGH): (1, 10)
+        }
+    
+    def test_rebuild_repairs_drift(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        app = client.application
+        _create_request(client, headers)
+        _create_request(client, headers, severity='low')
+        expected = _rollup_rows(app)
+        
+        with app.app_context():
+            RequestRollup.query.update({RequestRollup.request_count: 99})
+            db.session.commit()
+            assert rebuild_rollups() == 2
+        
+        assert _rollup_rows(app) == expected
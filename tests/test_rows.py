@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timezone
+from app import db
+from app.models import ReliefRequest, User, AuditLog, DisasterSeverity, RequestStatus
+from app.rows import converter_for
+
+
+class TestRowConverters:
+    
+    @pytest.fixture
+    def rows_app(self, client):
+        app = client.application
+        with app.app_context():
+            db.session.add_all([
+                ReliefRequest(
+                    title='Parity request',
+                    description='Every column populated',
+                    location='Test Location',
+                    coordinates='9.93,-84.08',
+                    severity=DisasterSeverity.CRITICAL,
+                    status=RequestStatus.COMPLETED,
+                    disaster_type_id=1,
+                    region_id=1,
+                    created_by=1,
+                    assigned_to=2,
+                    affected_population=1200,
+                    estimated_damage=2.5e6,
+                    required_resources='Water',
+                    contact_person='Contact',
+                    contact_phone='+1-555-0100',
+                    contact_email='contact@example.com',
+                    priority_score=88.5,
+                    predicted_by_ml=True,
+                    ml_confidence=0.9,
+                    documents='[]',
+                    resolved_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+                ),
+                ReliefRequest(
+                    title='Sparse request',
+                    description='Nullable columns left empty',
+                    location='Test Location',
+                    severity=DisasterSeverity.LOW,
+                    disaster_type_id=1,
+                    region_id=1,
+                    created_by=2
+                ),
+                AuditLog(user_id=1, action='CREATE', resource_type='REGION', resource_id=1),
+            ])
+            db.session.commit()
+        return app
+    
+    @pytest.mark.parametrize('model', [ReliefRequest, User, AuditLog])
+    def test_matches_to_dict(self, rows_app, model):
+        with rows_app.app_context():
+            converter = converter_for(model)
+            rows = db.session.execute(converter.select().order_by(model.id)).all()
+            expected = [obj.to_dict() for obj in model.query.order_by(model.id).all()]
+            assert rows
+            assert converter.convert_all(rows) == expected
+    
+    def test_sparse_fieldset_matches_to_dict(self, rows_app):
+        fields = ('id', 'severity', 'status', 'resolved_at')
+        with rows_app.app_context():
+            converter = converter_for(ReliefRequest, fields, extra=('created_at',))
+            rows = db.session.execute(converter.select().order_by(ReliefRequest.id)).all()
+            expected = [r.to_dict(fields) for r in ReliefRequest.query.order_by(ReliefRequest.id).all()]
+            assert converter.convert_all(rows) == expected
+            # Extra columns are selected for the caller but not emitted
+            assert len(rows[0]) == len(fields) + 1
+    
+    def test_native_converter_encodes_like_to_dict(self, rows_app):
+        with rows_app.app_context():
+            converter = converter_for(ReliefRequest, native=True)
+            rows = db.session.execute(converter.select().order_by(ReliefRequest.id)).all()
+            expected = [r.to_dict() for r in ReliefRequest.query.order_by(ReliefRequest.id).all()]
+            assert rows_app.json.loads(rows_app.json.dumps(converter.convert_all(rows))) == expected
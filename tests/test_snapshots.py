@@ -0,0 +1,97 @@
+import os
+import pytest
+from app import db
+from app.models import ReliefRequest, SnapshotWatermark
+
+pa = pytest.importorskip('pyarrow')
+pa_dataset = pytest.importorskip('pyarrow.dataset')
+
+from app.snapshots import write_snapshot
+
+
+def _create_request(client, token, title, severity='high'):
+    return client.post('/api/requests', headers={'Authorization': f'Bearer {token}'}, json={
+        'title': title,
+        'description': 'This is a test emergency for snapshots',
+        'location': 'Test Location',
+        'severity': severity,
+        'disaster_type_id': 1,
+        'region_id': 1
+    }).json['request']['id']
+
+
+class TestSnapshots:
+    
+    @pytest.fixture
+    def snapshot_app(self, client, tmp_path):
+        app = client.application
+        app.config['SNAPSHOT_DIR'] = str(tmp_path)
+        app.config['SNAPSHOT_WATERMARK_LAG'] = 0
+        return app
+    
+    def test_full_then_incremental(self, snapshot_app, client, admin_token, tmp_path):
+        first = _create_request(client, admin_token, 'Snapshot Emergency One')
+        _create_request(client, admin_token, 'Snapshot Emergency Two', severity='low')
+        
+        with snapshot_app.app_context():
+            snapshot = write_snapshot('relief_requests')
+            assert snapshot['rows'] == 2 and snapshot['since'] is None
+            
+            dataset = pa_dataset.dataset(tmp_path / 'relief_requests', format='parquet', partitioning='hive')
+            table = dataset.to_table()
+            assert sorted(table.column('severity').to_pylist()) == ['high', 'low']
+            assert pa.types.is_dictionary(dataset.schema.field('status').type)
+            assert set(table.column('region_id').to_pylist()) == {1}
+            assert list((tmp_path / 'relief_requests').iterdir())[0].name.startswith('day=')
+            
+            assert write_snapshot('relief_requests')['rows'] == 0
+            
+            db.session.get(ReliefRequest, first).title = 'Snapshot Emergency Edited'
+            db.session.commit()
+            snapshot = write_snapshot('relief_requests')
+            assert snapshot['rows'] == 1
+            assert snapshot['since'] is not None
+            assert db.session.get(SnapshotWatermark, 'relief_requests').watermark.isoformat() == snapshot['watermark']
+            
+            # Both runs' files are kept: the original row and its edited copy
+            titles = pa_dataset.dataset(tmp_path / 'relief_requests', format='parquet',
+                                        partitioning='hive').to_table().column('title').to_pylist()
+            assert sorted(titles) == ['Snapshot Emergency Edited', 'Snapshot Emergency One',
+                                      'Snapshot Emergency Two']
+    
+    def test_failed_full_snapshot_keeps_previous_dataset(self, snapshot_app, client, admin_token, tmp_path,
+                                                         monkeypatch):
+        _create_request(client, admin_token, 'Snapshot Emergency Kept')
+        
+        with snapshot_app.app_context():
+            write_snapshot('relief_requests')
+            
+            def failing_write(batches, base_dir, **kwargs):
+                os.makedirs(base_dir)
+                raise OSError('disk full')
+            monkeypatch.setattr(pa_dataset, 'write_dataset', failing_write)
+            with pytest.raises(OSError):
+                write_snapshot('relief_requests', full=True)
+        
+        monkeypatch.undo()
+        table = pa_dataset.dataset(tmp_path / 'relief_requests', format='parquet', partitioning='hive').to_table()
+        assert table.column('title').to_pylist() == ['Snapshot Emergency Kept']
+        assert [path.name for path in tmp_path.iterdir()] == ['relief_requests']
+    
+    def test_arrow_audit_log_snapshot(self, snapshot_app, client, admin_token, tmp_path):
+        _create_request(client, admin_token, 'Snapshot Audit Emergency')
+        
+        with snapshot_app.app_context():
+            snapshot = write_snapshot('audit_logs', format='arrow')
+            assert snapshot['rows'] >= 1
+            table = pa_dataset.dataset(tmp_path / 'audit_logs', format='ipc', partitioning='hive').to_table()
+            assert 'CREATE' in table.column('action').to_pylist()
+    
+    def test_snapshot_endpoint(self, snapshot_app, client, admin_token, agent_token):
+        response = client.post('/api/admin/snapshots', headers={'Authorization': f'Bearer {agent_token}'})
+        assert response.status_code == 403
+        
+        response = client.post('/api/admin/snapshots', headers={'Authorization': f'Bearer {admin_token}'},
+                               json={'tables': ['relief_requests'], 'format': 'arrow'})
+        assert response.status_code == 200
+        assert [s['table'] for s in response.json['snapshots']] == ['relief_requests']